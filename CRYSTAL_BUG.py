@@ -24,10 +24,30 @@
 ╚══════════════════════════════════════════════════════════════════════╝
 """
 
-import os, sys, json, time, math, re, random, sqlite3, hashlib
-from collections import Counter, defaultdict
+import os, sys, json, time, math, re, random, threading, importlib, hashlib, itertools
+from collections import Counter, OrderedDict, defaultdict, deque
+from contextlib import contextmanager
 from datetime import datetime
 
+
+class _LazyModule:
+    """Placeholder that imports the real module on first attribute access.
+
+    NumPy alone costs more than the whole cold-start budget, and only the
+    lattice/trust engines need it, so `np` starts as one of these and is
+    rebound to the real module the first time it is touched.
+    """
+
+    def __init__(self, name, alias):
+        self._name, self._alias = name, alias
+
+    def __getattr__(self, attr):
+        mod = importlib.import_module(self._name)
+        globals()[self._alias] = mod
+        return getattr(mod, attr)
+
+np = _LazyModule("numpy", "np")
+
 # Import semantic brain
 try:
     from OLLIE_BRAIN import ollie_respond_v2 as brain_respond, detect_intent, detect_topic, MEMORY as BRAIN_MEMORY, test_semantic_brain
@@ -148,6 +168,24 @@ def tri_sentence(text):
 def tri_chart():
     return {ch: tri_letter(ch) for ch in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}
 
+def tri_cube():
+    """All 27 states in B/D/C order, with the letters that map to each."""
+    letters_at = defaultdict(list)
+    for ch, lt in LETTERS.items():
+        letters_at[lt].append(ch)
+    cube = []
+    for a in [B,D,C]:
+        for b in [B,D,C]:
+            for c in [B,D,C]:
+                t = (a,b,c)
+                tig = _to_tig(t)
+                cube.append({
+                    "triple":t,"sym":tri_sym(t),"glyph":tri_glyph(t),
+                    "desc":DESC_27[t],"tig_op":tig,"tig_name":TIG_OPS[tig],
+                    "letters":letters_at[t],
+                })
+    return cube
+
 
 # ══════════════════════════════════════════════════════════════════════
 # ██  6-SCALE PARSER
@@ -282,94 +320,592 @@ def parse_6scale(text):
 
 SIGMA = 0.991
 T_STAR = 0.714  # 5/7
+COLLAPSE_LEVEL = T_STAR * 0.5   # health below this = collapsed
+
+GENESIS_LOG_CAP = int(os.environ.get("GENESIS_LOG_CAP", "1024"))
+GENESIS_SPILL_PATH = os.environ.get("GENESIS_SPILL_PATH", "")  # append-only JSONL, off if empty
+MAX_STEP_BATCH = 10000  # ticks per /api/lattice/step call or "step N" command
+LATTICE_PATH = os.environ.get("LATTICE_PATH", "")  # store directory, in-memory if empty
+LATTICE_SNAPSHOT_TIMEOUT = 2.0  # s a reader waits on a live writer before giving up
+
+# ── On-disk layout (LATTICE_PATH/) ──
+#   units.bin    128-byte header + fixed-width unit records
+#   bonds.bin    int32 (new_id, old_id) pairs in bonding order
+#   events.jsonl append-only genesis log, one JSON event per line
+# The header `seq` is a seqlock: odd while a writer is mid-update. A writer
+# killed mid-update leaves it odd; the next writer to take the lock rounds
+# it back up to even, and readers stop waiting once the lock is free.
+LATTICE_MAGIC = b"CBLATT01"
+LATTICE_HEADER_FIELDS = [
+    ("magic", "S8"), ("version", "<u4"), ("_r0", "<u4"),
+    ("seq", "<u8"), ("n", "<u8"), ("capacity", "<u8"),
+    ("bond_capacity", "<u8"), ("n_bonds", "<u8"), ("next_id", "<u8"),
+    ("tick", "<i8"), ("n_events", "<u8"), ("_r1", "V48"),
+]  # 128 bytes
+UNIT_FIELDS = [
+    ("health", "<f8"), ("coherence", "<f8"), ("born", "<i8"),
+    ("nbonds", "<i4"), ("shell", "<i2"), ("operator", "i1"), ("collapsed", "?"),
+    ("tri", "i1", (3,)), ("_pad", "V5"), ("name", "S32"),
+]  # 72 bytes
+UNIT_NAME_BYTES = 32  # UTF-8 bytes; birth() rejects longer names rather than cut them
+
+
+def _read_jsonl_tail(path, n):
+    """Last n parseable JSON lines of a file, reading backwards from the end."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return []
+    chunk = 256 * max(1, n)
+    with open(path, "rb") as f:
+        while True:
+            start = max(0, size - chunk)
+            f.seek(start)
+            lines = f.read(size - start).splitlines()
+            if start > 0:
+                lines = lines[1:]  # first line may be cut
+            if len(lines) >= n or start == 0:
+                break
+            chunk *= 2
+    out = []
+    for ln in lines[-n:]:
+        try:
+            out.append(json.loads(ln))
+        except ValueError:
+            pass  # torn write at the tail
+    return out
+
+
+class GenesisLog:
+    """Fixed-capacity ring of lattice events, optionally spilled to disk.
+
+    Only the newest `capacity` events stay in memory. If `spill_path` is set,
+    every event is also appended to that file as one JSON line, so the full
+    history survives without the in-memory log growing.
+    """
+
+    def __init__(self, capacity=GENESIS_LOG_CAP, spill_path=GENESIS_SPILL_PATH):
+        self.capacity = max(1, int(capacity))
+        self._ring = deque(maxlen=self.capacity)
+        self.total = 0          # events ever appended, including evicted ones
+        self.spill_path = spill_path or None
+        self._spill = None
+
+    @classmethod
+    def from_spill(cls, spill_path, total, capacity=GENESIS_LOG_CAP):
+        """Reopen a spilled log, priming the ring from the file's tail."""
+        log = cls(capacity, spill_path)
+        log._ring.extend(_read_jsonl_tail(spill_path, log.capacity))
+        log.total = total
+        return log
+
+    def append(self, event):
+        self._ring.append(event)
+        self.total += 1
+        if self.spill_path:
+            if self._spill is None:
+                self._spill = open(self.spill_path, "a", encoding="utf-8", buffering=1)
+            self._spill.write(json.dumps(event) + "\n")
+
+    def catch_up(self, total):
+        """Adopt events other writer processes appended to the spill file."""
+        n = total - self.total
+        if n > 0 and self.spill_path:
+            if self._spill is not None:
+                self._spill.flush()
+            self._ring.extend(_read_jsonl_tail(self.spill_path, min(n, self.capacity)))
+        self.total = total
+
+    def recent(self, n=20):
+        """Newest n events, oldest first."""
+        if n <= 0:
+            return []
+        if n >= len(self._ring):
+            return list(self._ring)
+        return list(self._ring)[-n:]
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+    def __len__(self):
+        return len(self._ring)
+
+    def __iter__(self):
+        return iter(self._ring)
+
+    def __getitem__(self, key):
+        return list(self._ring)[key]
 
-class Lattice:
-    def __init__(self):
-        self.units = []
-        self.next_id = 1
-        self.genesis_log = []
-        self.tick = 0
 
-    def birth(self, name=None, shell=5):
-        """Birth a new unit into the lattice."""
-        uid = self.next_id
-        self.next_id += 1
-        unit = {
+class Lattice:
+    """Unit lattice stored as fixed-width records so a tick is a handful of array ops.
+
+    Each unit is one UNIT_FIELDS record indexed by position (id = index+1);
+    bonds are (new_id, old_id) pairs in bonding order. `units` hands out plain
+    dict snapshots — mutate through `collapse()` / `birth()` / `step()`.
+
+    With `path`, records and bonds are np.memmap views of files in that
+    directory, so a restart maps the existing lattice instead of reseeding.
+    Writers serialize on a file lock and bracket every mutation with the
+    header seqlock; `readonly=True` instances (other API workers) copy a
+    consistent snapshot whenever the seq moves.
+
+    Aggregates (alive count, health/coherence sums, units above T*) are kept
+    up to date by the mutators, and `version` bumps on each of them, so
+    `summary()` is O(1) and `state()` is rebuilt only after a change.
+    """
+
+    def __init__(self, capacity=64, path=None, readonly=False, rng=None):
+        self.path = path
+        self.readonly = readonly
+        self._rng = rng or random
+        self._H = np.dtype(LATTICE_HEADER_FIELDS)
+        self._U = np.dtype(UNIT_FIELDS)
+        self.version = 0
+        self._state_cache = None   # (version, state dict)
+        self._lock = threading.RLock()
+        self._lockf = None
+        self._seen_seq = None
+        self._in_write = False
+        if path:
+            self._open_store(capacity)
+        else:
+            self._hdr = np.zeros(1, dtype=self._H)
+            self._hdr["capacity"] = capacity
+            self._hdr["bond_capacity"] = capacity
+            self._hdr["next_id"] = 1
+            self._rec = np.zeros(capacity, dtype=self._U)
+            self._pairs = np.zeros((capacity, 2), dtype=np.int32)
+            self.genesis_log = GenesisLog()
+        self._load_header()
+        self._bind()
+        self._recount()
+
+    # ── storage ──
+
+    def _open_store(self, capacity):
+        os.makedirs(self.path, exist_ok=True)
+        self._units_path = os.path.join(self.path, "units.bin")
+        self._bonds_path = os.path.join(self.path, "bonds.bin")
+        self._events_path = os.path.join(self.path, "events.jsonl")
+        if not self.readonly:
+            import fcntl
+            self._lockf = open(os.path.join(self.path, "lock"), "a+")
+            fcntl.flock(self._lockf, fcntl.LOCK_EX)
+            try:
+                if not os.path.exists(self._units_path):
+                    hdr = np.zeros(1, dtype=self._H)
+                    hdr["magic"] = LATTICE_MAGIC
+                    hdr["version"] = 1
+                    hdr["capacity"] = capacity
+                    hdr["bond_capacity"] = capacity
+                    hdr["next_id"] = 1
+                    with open(self._units_path, "wb") as f:
+                        f.write(hdr.tobytes())
+                        f.truncate(self._H.itemsize + capacity * self._U.itemsize)
+                    with open(self._bonds_path, "wb") as f:
+                        f.truncate(capacity * 8)
+                else:
+                    self._repair_seq(np.memmap(self._units_path, dtype=self._H, mode="r+", shape=(1,)))
+            finally:
+                fcntl.flock(self._lockf, fcntl.LOCK_UN)
+        mode = "r" if self.readonly else "r+"
+        self._hdr = np.memmap(self._units_path, dtype=self._H, mode=mode, shape=(1,))
+        if self._hdr["magic"][0] != LATTICE_MAGIC:
+            raise ValueError(f"{self._units_path}: not a lattice store")
+        self._map_records()
+        self.genesis_log = GenesisLog.from_spill(
+            self._events_path, int(self._hdr["n_events"][0]))
+        if self.readonly:
+            self.genesis_log.spill_path = None
+            self._snapshot()
+        else:
+            self._seen_seq = int(self._hdr["seq"][0])
+
+    def _map_records(self):
+        mode = "r" if self.readonly else "r+"
+        cap = int(self._hdr["capacity"][0])
+        bcap = int(self._hdr["bond_capacity"][0])
+        self._map = np.memmap(self._units_path, dtype=self._U, mode=mode,
+                              offset=self._H.itemsize, shape=(cap,))
+        self._pmap = np.memmap(self._bonds_path, dtype=np.int32, mode=mode,
+                               shape=(bcap, 2))
+        if not self.readonly:
+            self._rec, self._pairs = self._map, self._pmap
+
+    @staticmethod
+    def _repair_seq(hdr):
+        """Round an odd seq left by a writer that died mid-update up to even.
+        Caller holds the exclusive file lock, so no live writer is mid-update."""
+        if int(hdr["seq"][0]) & 1:
+            hdr["seq"] += 1
+            print("  ⚠ Lattice store: a writer died mid-update; reopened at its last state")
+
+    def _writer_gone(self):
+        """True if no writer holds the store lock (an odd seq is then a crash's leftover)."""
+        import fcntl
+        try:
+            with open(os.path.join(self.path, "lock"), "rb") as f:
+                fcntl.flock(f, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                return True
+        except OSError:   # held by a writer, or no lock file to check
+            return False
+
+    def _snapshot(self):
+        """Reader side of the seqlock: copy records until no writer interfered.
+        TimeoutError if a live writer keeps the seq odd past LATTICE_SNAPSHOT_TIMEOUT."""
+        hdr = self._hdr
+        odd_since = None
+        while True:
+            seq = int(hdr["seq"][0])
+            if seq & 1:
+                now = time.monotonic()
+                if odd_since is None:
+                    odd_since = now
+                elif now - odd_since > 0.01 and self._writer_gone():
+                    pass   # crashed writer: nothing will move seq, read as-is
+                elif now - odd_since > LATTICE_SNAPSHOT_TIMEOUT:
+                    raise TimeoutError(f"{self.path}: lattice writer held the seqlock "
+                                       f"for over {LATTICE_SNAPSHOT_TIMEOUT}s")
+                else:
+                    time.sleep(0 if now - odd_since < 0.001 else 0.001)
+                    continue
+            if int(hdr["capacity"][0]) > len(self._map) or \
+               int(hdr["bond_capacity"][0]) > len(self._pmap):
+                self._map_records()
+            h = hdr.copy()
+            rec = np.array(self._map[:int(h["n"][0])])
+            pairs = np.array(self._pmap[:int(h["n_bonds"][0])])
+            if int(hdr["seq"][0]) == seq:
+                break
+        self._rec, self._pairs = rec, pairs
+        self._hdr_copy = h
+        self._seen_seq = seq
+
+    def _sync(self):
+        """Pick up another process's latest committed state if the seq moved."""
+        if self.readonly:
+            if int(self._hdr["seq"][0]) != self._seen_seq:
+                try:
+                    self._snapshot()
+                except TimeoutError as e:
+                    print(f"  ⚠ {e}; serving the previous snapshot")
+                    return
+                self._load_header()
+                self._bind()
+                self._recount()
+                self.genesis_log = GenesisLog.from_spill(
+                    self._events_path, int(self._hdr_copy["n_events"][0]))
+                self.genesis_log.spill_path = None
+                self.version += 1
+            return
+        seq = int(self._hdr["seq"][0])
+        # Writers sharing the store (pre-fork API workers). An odd seq is a
+        # write in progress, possibly our own, so keep what we have unless
+        # the lock is free: then its writer died and we repair and adopt
+        if self._lockf is not None and seq != self._seen_seq:
+            import fcntl
+            with self._lock:
+                if self._in_write:
+                    return
+                if seq & 1:
+                    try:
+                        fcntl.flock(self._lockf, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        return   # another writer is mid-update
+                    self._repair_seq(self._hdr)
+                else:
+                    fcntl.flock(self._lockf, fcntl.LOCK_SH)
+                try:
+                    if int(self._hdr["seq"][0]) != self._seen_seq:
+                        self._adopt_store()
+                finally:
+                    fcntl.flock(self._lockf, fcntl.LOCK_UN)
+
+    def _adopt_store(self):
+        """Writers: reload what another writer process committed. Caller holds the file lock."""
+        hdr = self._hdr
+        if int(hdr["capacity"][0]) != len(self._map) or int(hdr["bond_capacity"][0]) != len(self._pmap):
+            self._map_records()  # it grew the files
+        self._load_header()
+        self._bind()
+        self._recount()
+        self.genesis_log.catch_up(int(self._hdr["n_events"][0]))
+        self._seen_seq = int(self._hdr["seq"][0])
+        self.version += 1
+
+    def _load_header(self):
+        h = self._hdr_copy if self.readonly else self._hdr
+        self._n = int(h["n"][0])
+        self._n_bonds = int(h["n_bonds"][0])
+        self.next_id = int(h["next_id"][0])
+        self.tick = int(h["tick"][0])
+
+    def _bind(self):
+        rec = self._rec
+        self._health = rec["health"]
+        self._coherence = rec["coherence"]
+        self._shell = rec["shell"]
+        self._operator = rec["operator"]
+        self._tri = rec["tri"]
+        self._born = rec["born"]
+        self._nbonds = rec["nbonds"]
+        self._collapsed = rec["collapsed"]
+
+    def _grow(self, units=False, bonds=False):
+        hdr = self._hdr
+        if self.path:
+            self._map.flush()
+            self._pmap.flush()
+            if units:
+                cap = 2 * int(hdr["capacity"][0])
+                with open(self._units_path, "r+b") as f:
+                    f.truncate(self._H.itemsize + cap * self._U.itemsize)
+                hdr["capacity"] = cap
+            if bonds:
+                bcap = 2 * int(hdr["bond_capacity"][0])
+                with open(self._bonds_path, "r+b") as f:
+                    f.truncate(bcap * 8)
+                hdr["bond_capacity"] = bcap
+            self._map_records()
+        else:
+            if units:
+                cap = 2 * len(self._rec)
+                rec = np.zeros(cap, dtype=self._U)
+                rec[:self._n] = self._rec[:self._n]
+                self._rec = rec
+                hdr["capacity"] = cap
+            if bonds:
+                pairs = np.zeros((2 * len(self._pairs), 2), dtype=np.int32)
+                pairs[:self._n_bonds] = self._pairs[:self._n_bonds]
+                self._pairs = pairs
+                hdr["bond_capacity"] = len(pairs)
+        self._bind()
+
+    @contextmanager
+    def _writing(self):
+        """Writer side of the seqlock; also serializes writer processes."""
+        if self.readonly:
+            raise RuntimeError("lattice opened read-only")
+        with self._lock:
+            if self._lockf is not None:
+                import fcntl
+                fcntl.flock(self._lockf, fcntl.LOCK_EX)
+            hdr = self._hdr
+            try:
+                if self._lockf is not None:
+                    self._repair_seq(hdr)
+                    if int(hdr["seq"][0]) != self._seen_seq:
+                        self._adopt_store()  # another writer process committed since our last write
+                hdr["seq"] += 1   # odd: write in progress
+                self._in_write = True
+                try:
+                    yield
+                finally:
+                    self._in_write = False
+                    hdr["n"] = self._n
+                    hdr["n_bonds"] = self._n_bonds
+                    hdr["next_id"] = self.next_id
+                    hdr["tick"] = self.tick
+                    hdr["n_events"] = self.genesis_log.total
+                    hdr["seq"] += 1
+                    self._seen_seq = int(hdr["seq"][0])
+            finally:
+                if self._lockf is not None:
+                    import fcntl
+                    fcntl.flock(self._lockf, fcntl.LOCK_UN)
+            self.version += 1
+
+    def _recount(self):
+        k = self._n
+        health = self._health[:k]
+        coherence = self._coherence[:k]
+        # Dead units have zero health, and step() zeroes their coherence, so
+        # whole-array health sums equal the alive-only ones.
+        alive = health > 0
+        self._alive = int(np.count_nonzero(alive))
+        self._sum_health = float(health.sum())
+        self._sum_coherence = float(coherence[alive].sum())
+        self._above = int(np.count_nonzero(alive & (coherence >= T_STAR)))
+
+    def flush(self):
+        """Push dirty mapped pages to disk (the OS does this lazily otherwise)."""
+        if self.path and not self.readonly:
+            self._map.flush()
+            self._pmap.flush()
+
+    def close(self):
+        self.flush()
+        self.genesis_log.close()
+        if self._lockf is not None:
+            self._lockf.close()
+            self._lockf = None
+
+    # ── units ──
+
+    def _name(self, i):
+        return self._rec["name"][i].decode("utf-8", "ignore")
+
+    def unit(self, i):
+        uid = i + 1
+        pairs = self._pairs[:self._n_bonds]
+        rows = np.flatnonzero((pairs == uid).any(axis=1))
+        others = np.where(pairs[rows, 0] == uid, pairs[rows, 1], pairs[rows, 0])
+        return {
             "id": uid,
-            "name": name or f"unit_{uid:04d}",
-            "shell": shell,
-            "health": 1.0,
-            "coherence": SIGMA,
-            "bonds": [],
-            "born_tick": self.tick,
-            "operator": random.randint(0, 9),
-            "tri_state": (random.randint(0,2), random.randint(0,2), random.randint(0,2)),
+            "name": self._name(i),
+            "shell": int(self._shell[i]),
+            "health": float(self._health[i]),
+            "coherence": float(self._coherence[i]),
+            "bonds": [int(b) for b in others],
+            "born_tick": int(self._born[i]),
+            "operator": int(self._operator[i]),
+            "tri_state": tuple(int(p) for p in self._tri[i]),
         }
-        self.units.append(unit)
-        self.genesis_log.append({
-            "tick": self.tick,
-            "event": "birth",
-            "unit_id": uid,
-            "name": unit["name"],
-            "shell": shell,
-        })
-        # Auto-bond to nearest compatible unit
-        if len(self.units) > 1:
-            best = None
-            best_score = -1
-            for other in self.units[:-1]:
-                if other["id"] == uid: continue
-                score = SIGMA if abs(other["shell"] - shell) <= 1 else SIGMA * 0.5
-                if score > best_score:
-                    best_score = score
-                    best = other
-            if best:
-                unit["bonds"].append(best["id"])
-                best["bonds"].append(uid)
-
-        return unit
-
-    def step(self):
-        """Advance lattice by one tick."""
-        self.tick += 1
-        for unit in self.units:
-            # Health decays slightly, bonds restore
-            bond_count = len(unit["bonds"])
-            restore = min(0.1, bond_count * 0.02)
-            decay = 0.01
-            unit["health"] = min(1.0, max(0.0, unit["health"] - decay + restore))
-            unit["coherence"] = SIGMA * unit["health"]
-
-            # Check for collapse
-            if unit["health"] < T_STAR * 0.5:
-                unit["operator"] = 4  # collapse
-                self.genesis_log.append({
-                    "tick": self.tick, "event": "collapse",
-                    "unit_id": unit["id"], "name": unit["name"],
-                })
 
-    def state(self):
-        """Return full lattice state."""
-        alive = [u for u in self.units if u["health"] > 0]
-        avg_health = sum(u["health"] for u in alive) / max(1, len(alive))
-        avg_coherence = sum(u["coherence"] for u in alive) / max(1, len(alive))
+    @property
+    def units(self):
+        """Snapshot of every unit as a dict (read-only view of the records)."""
+        self._sync()
+        return [self.unit(i) for i in range(self._n)]
+
+    def __len__(self):
+        self._sync()
+        return self._n
+
+    def find(self, name):
+        """Index of the first unit whose name matches (case-insensitive), or None."""
+        self._sync()
+        names = np.char.lower(self._rec["name"][:self._n])
+        hit = np.flatnonzero(names == name.lower().encode("utf-8"))
+        return int(hit[0]) if len(hit) else None
+
+    def birth(self, name=None, shell=5):
+        """Birth a new unit into the lattice. ValueError if `name` is over UNIT_NAME_BYTES."""
+        if name and len(name.encode("utf-8")) > UNIT_NAME_BYTES:
+            raise ValueError(f"unit name longer than {UNIT_NAME_BYTES} bytes: {name[:40]!r}")
+        with self._writing():
+            uid = self.next_id
+            self.next_id += 1
+            i = self._n
+            if i == len(self._rec):
+                self._grow(units=True)
+            self._n += 1
+            name = name or f"unit_{uid:04d}"
+            self._rec["name"][i] = name.encode("utf-8")
+            self._shell[i] = shell
+            self._health[i] = 1.0
+            self._coherence[i] = SIGMA
+            self._born[i] = self.tick
+            rng = self._rng
+            self._operator[i] = rng.randint(0, 9)
+            self._tri[i] = (rng.randint(0,2), rng.randint(0,2), rng.randint(0,2))
+            self.genesis_log.append({
+                "tick": self.tick,
+                "event": "birth",
+                "unit_id": uid,
+                "name": self._name(i),
+                "shell": shell,
+            })
+            # Auto-bond to nearest compatible unit: first within one shell, else the oldest
+            if i > 0:
+                near = np.flatnonzero(np.abs(self._shell[:i] - shell) <= 1)
+                j = int(near[0]) if len(near) else 0
+                if self._n_bonds == len(self._pairs):
+                    self._grow(bonds=True)
+                self._pairs[self._n_bonds] = (uid, j + 1)
+                self._n_bonds += 1
+                self._nbonds[i] += 1
+                self._nbonds[j] += 1
+
+            self._alive += 1
+            self._sum_health += 1.0
+            self._sum_coherence += SIGMA
+            self._above += SIGMA >= T_STAR
+        return self.unit(i)
+
+    def collapse(self, i, event="manual_collapse"):
+        """Force unit at index i to zero health and log it."""
+        with self._writing():
+            if self._health[i] > 0:
+                self._alive -= 1
+                self._sum_health -= float(self._health[i])
+                self._sum_coherence -= float(self._coherence[i])
+                self._above -= bool(self._coherence[i] >= T_STAR)
+            self._health[i] = 0
+            self._operator[i] = 4
+            self._collapsed[i] = True
+            self.genesis_log.append({"tick": self.tick, "event": event,
+                                     "unit_id": i + 1, "name": self._name(i)})
+
+    def step(self, n=1):
+        """Advance lattice by n ticks.
+
+        Health decays slightly and bonds restore; every unit is updated in one
+        array op per tick. A "collapse" event is logged only when a unit first
+        drops below COLLAPSE_LEVEL, not on every tick it stays there.
+        """
+        with self._writing():
+            k = self._n
+            health = self._health[:k]
+            collapsed = self._collapsed[:k]
+            # Bond count is fixed during a step, so the per-tick delta is too
+            delta = np.minimum(0.1, self._nbonds[:k] * 0.02) - 0.01
+            for _ in range(n):
+                self.tick += 1
+                np.clip(health + delta, 0.0, 1.0, out=health)
+                below = health < COLLAPSE_LEVEL
+                fresh = below & ~collapsed
+                if fresh.any():
+                    for i in np.flatnonzero(fresh):
+                        self._operator[i] = 4  # collapse
+                        self.genesis_log.append({
+                            "tick": self.tick, "event": "collapse",
+                            "unit_id": int(i) + 1, "name": self._name(i),
+                        })
+                collapsed[:] = below
+            np.multiply(health, SIGMA, out=self._coherence[:k])
+            self._recount()   # also flushes any incremental drift
+
+    def summary(self):
+        """O(1) aggregate view: tick, counts and averages, no unit list."""
+        self._sync()
+        n_alive = self._alive
         return {
             "tick": self.tick,
-            "total_units": len(self.units),
-            "alive": len(alive),
-            "avg_health": round(avg_health, 4),
-            "avg_coherence": round(avg_coherence, 4),
-            "above_threshold": sum(1 for u in alive if u["coherence"] >= T_STAR),
-            "units": [{
-                "id":u["id"],"name":u["name"],"shell":u["shell"],
-                "health":round(u["health"],4),"coherence":round(u["coherence"],4),
-                "bonds":len(u["bonds"]),"operator":u["operator"],
-                "op_name":TIG_OPS[u["operator"]],
-                "tri_state":tri_sym(u["tri_state"]),
-            } for u in alive[:50]],  # cap at 50 for API response
-            "recent_events": self.genesis_log[-20:],
+            "total_units": self._n,
+            "alive": n_alive,
+            "avg_health": round(self._sum_health / max(1, n_alive), 4),
+            "avg_coherence": round(self._sum_coherence / max(1, n_alive), 4),
+            "above_threshold": self._above,
         }
 
+    def state(self):
+        """Return full lattice state (cached until the next mutation — don't modify it)."""
+        self._sync()
+        cached = self._state_cache
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        units = []
+        alive = np.flatnonzero(self._health[:self._n] > 0)
+        for i in alive[:50]:  # cap at 50 for API response
+            op = int(self._operator[i])
+            units.append({
+                "id":int(i)+1,"name":self._name(i),"shell":int(self._shell[i]),
+                "health":round(float(self._health[i]),4),
+                "coherence":round(float(self._coherence[i]),4),
+                "bonds":int(self._nbonds[i]),"operator":op,
+                "op_name":TIG_OPS[op],
+                "tri_state":tri_sym(tuple(int(p) for p in self._tri[i])),
+            })
+        state = self.summary()
+        state["units"] = units
+        state["recent_events"] = self.genesis_log.recent(20)
+        self._state_cache = (self.version, state)
+        return state
+
 
 # ══════════════════════════════════════════════════════════════════════
 # ██  TRUST COUNCIL
@@ -433,30 +969,904 @@ def run_trust_council(scenario="asymmetric_failure", rounds=10):
     }
 
 
+TRUST_SCENARIOS = ("asymmetric_failure", "cascade", "random_shock")
+
+def simulate_trust_councils(scenarios, sizes, rounds, seed=None, log=False, checkpoints=()):
+    """Run many trust councils at once as (councils, members) arrays.
+
+    `scenarios` and `sizes` are broadcast to one entry per council; a council
+    of size k uses the first k member slots and the rest are masked out.
+    Dynamics match run_trust_council() round for round; random_shock draws
+    from one np.random.Generator seeded by `seed`.
+
+    Per-round avg_trust/alive arrays (councils × rounds) are only kept when
+    `log` is true. `checkpoints` records all-survived and mean trust after
+    those rounds without keeping a full log.
+    """
+    scen = np.array([TRUST_SCENARIOS.index(s) if s in TRUST_SCENARIOS else -1
+                     for s in np.atleast_1d(scenarios)])
+    sizes = np.atleast_1d(np.asarray(sizes, dtype=np.int64))
+    scen, sizes = np.broadcast_arrays(scen, sizes)
+    n, width = len(sizes), int(sizes.max())
+    rng = np.random.default_rng(seed)
+    rows = np.arange(n)
+    mask = np.arange(width) < sizes[:, None]
+    trust = np.where(mask, 0.8, 0.0)
+    asym, casc, shock = scen == 0, scen == 1, scen == 2
+    marks = {int(r): j for j, r in enumerate(checkpoints)}
+    surv_at = np.zeros((n, len(marks)), dtype=bool)
+    trust_at = np.zeros((n, len(marks)))
+    if log:
+        avg_log = np.empty((n, rounds))
+        alive_log = np.empty((n, rounds), dtype=np.int64)
+
+    for r in range(rounds):
+        # Apply scenario pressure
+        if asym.any():
+            trust[rows[asym], r % sizes[asym]] *= 0.7
+        if casc.any():
+            trust[casc] *= 0.95
+        if shock.any():
+            trust[rows[shock], rng.integers(0, sizes[shock])] *= 0.5
+
+        # Council responds — mutual repair
+        avg = (trust * mask).sum(axis=1) / sizes
+        repair = SIGMA * (1 - np.abs(trust - avg[:, None]))
+        np.minimum(1.0, trust + repair * 0.3, out=trust)
+        trust[~mask] = 0.0
+
+        if log or (r + 1) in marks:
+            alive = ((trust >= T_STAR) & mask).sum(axis=1)
+            if log:
+                avg_log[:, r] = avg
+                alive_log[:, r] = alive
+            if (r + 1) in marks:
+                j = marks[r + 1]
+                surv_at[:, j] = alive == sizes
+                trust_at[:, j] = (trust * mask).sum(axis=1) / sizes
+
+    survived = ((trust >= T_STAR) & mask).sum(axis=1)
+    out = {
+        "scenario": scen, "size": sizes, "rounds": rounds,
+        "trust": trust, "resilience": trust * SIGMA, "mask": mask,
+        "final_trust": (trust * mask).sum(axis=1) / sizes,
+        "survived": survived, "all_survived": survived == sizes,
+    }
+    if marks:
+        out["survived_at"] = surv_at
+        out["trust_at"] = trust_at
+    if log:
+        out["avg_trust"] = avg_log
+        out["alive"] = alive_log
+    return out
+
+
+TRUST_SWEEP_BUDGET = int(os.environ.get("TRUST_SWEEP_BUDGET", str(32_000_000)))  # member-rounds per sweep
+TRUST_SWEEP_MEMBERS = 1_000_000   # councils × width held in each (councils, members) array
+
+def trust_sweep_cost(scenarios, rounds, sizes, trials):
+    """(member slots, member-rounds) a trust_sweep() call would simulate."""
+    members = len(scenarios) * len(sizes) * trials * max(sizes)
+    return members, members * max(rounds)
+
+def trust_sweep(scenarios=TRUST_SCENARIOS, rounds=(10, 25, 50, 100), sizes=(3, 5, 7, 9),
+                trials=256, seed=7714):
+    """Survival-probability surface over (scenario, rounds, council size).
+
+    Every (scenario, size) pair gets `trials` councils; all of them run in one
+    batch to max(rounds) and are sampled at each requested round count.
+    """
+    rounds = sorted(set(int(r) for r in rounds))
+    grid = [(s, z) for s in scenarios for z in sizes]
+    scen = np.repeat([s for s, _ in grid], trials)
+    size = np.repeat([z for _, z in grid], trials)
+    res = simulate_trust_councils(scen, size, rounds[-1], seed=seed, checkpoints=rounds)
+    # (scenario, size, trial, round) → average over trials
+    shape = (len(scenarios), len(sizes), trials, len(rounds))
+    p = res["survived_at"].reshape(shape).mean(axis=2)
+    mt = res["trust_at"].reshape(shape).mean(axis=2)
+    return {
+        "scenarios": list(scenarios),
+        "rounds": rounds,
+        "sizes": [int(z) for z in sizes],
+        "trials": trials,
+        "seed": seed,
+        "threshold": T_STAR,
+        # indexed [scenario][round][size]
+        "survival": np.round(p.transpose(0, 2, 1), 4).tolist(),
+        "mean_trust": np.round(mt.transpose(0, 2, 1), 4).tolist(),
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════
+# ██  HTTP CLIENT — pooled keep-alive connections for the AI backends
+# ══════════════════════════════════════════════════════════════════════
+
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "4"))  # connections per host
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_RETRIES = 2
+BACKEND_TIMEOUTS = {"claude": 30.0, "ollama": 60.0, "probe": 5.0}  # seconds per read
+
+class HTTPStatusError(Exception):
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body[:200]!r}")
+        self.status = status
+        self.body = body
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    """Lets another thread abort an in-flight HTTPPool request: cancel()
+    shuts the request's socket down, so a blocked send/read fails at once
+    and the connection is discarded instead of returned to the pool."""
+
+    def __init__(self):
+        self.cancelled = False
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def bind(self, conn):
+        with self._lock:
+            if self.cancelled:
+                raise RequestCancelled()
+            self._conn = conn
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            conn, self._conn = self._conn, None
+        if conn is not None and conn.sock is not None:
+            import socket
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class HTTPPool:
+    """Persistent HTTP/1.1 connections, pooled per (scheme, host, port).
+
+    At most `maxsize` connections per host are in use at once; idle ones are
+    kept for reuse so a chat turn skips the TCP (and TLS) handshake.
+
+    Retries only where resending cannot double-apply a request:
+    - connect failures (nothing was sent) — with exponential backoff
+    - a reused keep-alive socket the server already closed — immediately
+    - 429/503 (server says it did not process it) — with backoff
+    - any other network error or 502/504 — only for idempotent methods
+    """
+
+    IDEMPOTENT = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+    def __init__(self, maxsize=HTTP_POOL_SIZE, retries=HTTP_RETRIES, backoff=0.25):
+        self.maxsize = maxsize
+        self.retries = retries
+        self.backoff = backoff
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._ssl = None
+        self.stats = {"attempts": 0, "connections": 0, "reused": 0, "retries": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _slot(self, key):
+        with self._lock:
+            slot = self._hosts.get(key)
+            if slot is None:
+                slot = self._hosts[key] = (deque(), threading.BoundedSemaphore(self.maxsize))
+            return slot
+
+    def _connect(self, scheme, host, port, timeout):
+        import http.client
+        if scheme == "https":
+            if self._ssl is None:
+                import ssl
+                self._ssl = ssl.create_default_context()
+            conn = http.client.HTTPSConnection(host, port, timeout=HTTP_CONNECT_TIMEOUT,
+                                               context=self._ssl)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=HTTP_CONNECT_TIMEOUT)
+        conn.connect()
+        conn.sock.settimeout(timeout)
+        import socket
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._count("connections")
+        return conn
+
+    def _release(self, idle, conn, resp):
+        if resp.will_close or len(idle) >= self.maxsize:
+            conn.close()
+        else:
+            idle.append(conn)
+
+    @contextmanager
+    def _exchange(self, method, url, body=None, headers=None, timeout=30.0, cancel=None):
+        """Send with the retry rules above and yield the response once its
+        status line and headers are in; the body is the caller's to read.
+        The connection goes back to the pool only if the body was fully read.
+        A `cancel` CancelToken aborts the request from another thread."""
+        import http.client
+        from urllib.parse import urlsplit
+        u = urlsplit(url)
+        port = u.port or (443 if u.scheme == "https" else 80)
+        path = (u.path or "/") + (f"?{u.query}" if u.query else "")
+        idle, sem = self._slot((u.scheme, u.hostname, port))
+        safe_method = method in self.IDEMPOTENT
+        if not sem.acquire(timeout=timeout):
+            raise TimeoutError(f"HTTP pool for {u.hostname}:{port} exhausted")
+        conn = None
+        try:
+            attempt = 0
+            while True:
+                if cancel is not None and cancel.cancelled:
+                    raise RequestCancelled()
+                self._count("attempts")
+                try:
+                    conn, reused = idle.pop(), True
+                    conn.sock.settimeout(timeout)
+                    self._count("reused")
+                except IndexError:
+                    reused = False
+                    try:
+                        conn = self._connect(u.scheme, u.hostname, port, timeout)
+                    except OSError:
+                        if attempt >= self.retries:
+                            raise
+                        attempt += 1
+                        self._count("retries")
+                        time.sleep(self.backoff * 2 ** (attempt - 1))
+                        continue
+                try:
+                    if cancel is not None:
+                        cancel.bind(conn)
+                    conn.request(method, path, body=body, headers=headers or {})
+                    resp = conn.getresponse()
+                except (http.client.HTTPException, OSError) as e:
+                    conn.close()
+                    conn = None
+                    if cancel is not None and cancel.cancelled:
+                        raise RequestCancelled() from e
+                    stale = reused and isinstance(e, (http.client.RemoteDisconnected,
+                                                      ConnectionResetError, BrokenPipeError))
+                    if stale:
+                        continue  # keep-alive race: server closed it while idle
+                    if safe_method and attempt < self.retries:
+                        attempt += 1
+                        self._count("retries")
+                        time.sleep(self.backoff * 2 ** (attempt - 1))
+                        continue
+                    raise
+                if resp.status < 400:
+                    break
+                data = resp.read()
+                self._release(idle, conn, resp)
+                conn = None
+                retry_ok = resp.status in (429, 503) or (safe_method and resp.status in (502, 504))
+                if retry_ok and attempt < self.retries:
+                    attempt += 1
+                    self._count("retries")
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+                    continue
+                raise HTTPStatusError(resp.status, data)
+
+            yield resp
+            if resp.isclosed():  # body fully consumed
+                self._release(idle, conn, resp)
+                conn = None
+        finally:
+            if conn is not None:
+                conn.close()
+            sem.release()
+
+    def request(self, method, url, body=None, headers=None, timeout=30.0, cancel=None):
+        """Send one request; returns (status, body bytes) or raises."""
+        with self._exchange(method, url, body, headers, timeout, cancel) as resp:
+            data = resp.read()
+        return resp.status, data
+
+    def stream_lines(self, method, url, body=None, headers=None, timeout=30.0):
+        """Send one request and yield the response body line by line as it arrives."""
+        with self._exchange(method, url, body, headers, timeout) as resp:
+            while True:
+                line = resp.readline()
+                if not line:
+                    break
+                yield line
+
+    def get_json(self, url, timeout=30.0):
+        return json.loads(self.request("GET", url, timeout=timeout)[1].decode("utf-8"))
+
+    def post_json(self, url, payload, headers=None, timeout=30.0, cancel=None):
+        hdrs = {"Content-Type": "application/json"}
+        hdrs.update(headers or {})
+        body = json.dumps(payload).encode("utf-8")
+        return json.loads(self.request("POST", url, body, hdrs, timeout, cancel)[1].decode("utf-8"))
+
+    def close(self):
+        with self._lock:
+            for idle, _ in self._hosts.values():
+                while idle:
+                    idle.pop().close()
+
+HTTP_POOL = HTTPPool()
+
+
+# ══════════════════════════════════════════════════════════════════════
+# ██  RESPONSE CACHE — replies that depend only on their input
+# ══════════════════════════════════════════════════════════════════════
+
+REPLY_CACHE_SIZE = int(os.environ.get("REPLY_CACHE_SIZE", "2048"))  # entries per cache
+
+class LRUCache:
+    """Thread-safe least-recently-used map with hit/miss counters.
+
+    Values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, maxsize=REPLY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._data[key]
+
+    def peek(self, key):
+        """The value for `key` (or None) without counting it or refreshing it."""
+        return self._data.get(key)
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            size, hits, misses = len(self._data), self.hits, self.misses
+        looked = hits + misses
+        return {"size": size, "hits": hits, "misses": misses,
+                "hit_rate": round(hits / looked, 4) if looked else 0.0}
+
+COMMAND_CACHE = LRUCache()   # text-only command replies (help, chart, analyze …)
+PARSE_CACHE = LRUCache()     # message → (tri_sentence, parse_6scale, tri_word list)
+REPLY_CACHE = LRUCache()     # message → geometry-only reply text
+STATIC_HITS = {"etag_hits": 0, "served": 0}  # /api/tri/chart, /api/tri/cube
+_static_lock = threading.Lock()              # worker threads serve them concurrently
+
+def _static_hit(etag_hit):
+    with _static_lock:
+        STATIC_HITS["served"] += 1
+        if etag_hit:
+            STATIC_HITS["etag_hits"] += 1
+
+def _static_counts():
+    with _static_lock:
+        return dict(STATIC_HITS)
+
+def cache_stats():
+    return {
+        "commands": COMMAND_CACHE.stats(),
+        "parse": PARSE_CACHE.stats(),
+        "geometry_replies": REPLY_CACHE.stats(),
+        "static": _static_counts(),
+    }
+
+
+# ══════════════════════════════════════════════════════════════════════
+# ██  TRACING — per-stage timings for chat turns, /api/debug/traces
+# ══════════════════════════════════════════════════════════════════════
+#
+# A sampled chat turn (CRYSTAL_TRACE_SAMPLE, 0 = off) records how long each
+# stage took — command routing, tri-prime decoding, parse_6scale, the
+# lattice summary, the backend call, the semantic/geometry fallback — into
+# a ring of the last CRYSTAL_TRACE_RING turns. While no turn is being
+# traced, @traced and trace_span() cost one attribute check each (2–3
+# µs per turn here, see BENCHMARKS.md). Each worker process keeps its
+# own ring.
+
+TRACE_SAMPLE = float(os.environ.get("CRYSTAL_TRACE_SAMPLE", "0"))  # fraction of turns traced
+TRACE_RING = int(os.environ.get("CRYSTAL_TRACE_RING", "512"))      # turns kept
+
+class _NoSpan:
+    __slots__ = ()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+class _Span:
+    __slots__ = ("trace", "stage", "t0")
+
+    def __init__(self, trace, stage):
+        self.trace, self.stage = trace, stage
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.spans.append((self.stage, time.perf_counter() - self.t0))
+        return False
+
+
+class Trace:
+    """One traced call: its stages in the order they finished."""
+    __slots__ = ("op", "at", "t0", "total", "spans", "mode")
+
+    def __init__(self, op):
+        self.op, self.at, self.t0 = op, time.time(), time.perf_counter()
+        self.total, self.spans, self.mode = None, [], None
+
+    def record(self):
+        return {"op": self.op, "at": round(self.at, 3), "mode": self.mode,
+                "total_ms": round(self.total * 1000, 3),
+                "spans": [(s, round(d * 1000, 3)) for s, d in self.spans]}
+
+
+class Tracer:
+    """Sampling decision, the per-thread current trace and the ring of finished ones."""
+
+    def __init__(self, sample=TRACE_SAMPLE, size=TRACE_RING):
+        self.sample = sample
+        self.ring = deque(maxlen=size)
+        self.sampled = 0
+        self.active = 0               # traces in flight, any thread
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._rng = random.Random()   # own RNG: sampling must not move the global one
+
+    def start(self, op):
+        """A new current Trace, or None when this call is not sampled (or nested)."""
+        if getattr(self._local, "trace", None) is not None:
+            return None
+        if self.sample < 1 and self._rng.random() >= self.sample:
+            return None
+        tr = self._local.trace = Trace(op)
+        with self._lock:
+            self.sampled += 1
+            self.active += 1
+        return tr
+
+    def finish(self, tr):
+        tr.total = time.perf_counter() - tr.t0
+        self._local.trace = None
+        with self._lock:
+            self.active -= 1
+        self.ring.append(tr)   # turned into dicts only when read
+
+    def span(self, stage):
+        tr = getattr(self._local, "trace", None)
+        return _NO_SPAN if tr is None else _Span(tr, stage)
+
+    def clear(self):
+        self.ring.clear()
+        self.sampled = 0
+
+    def stats(self):
+        """Percentiles per stage (and "total") over the traces in the ring."""
+        by_stage = defaultdict(list)
+        for tr in list(self.ring):
+            by_stage["total"].append(tr.total)
+            for stage, d in tr.spans:
+                by_stage[stage].append(d)
+        out = {}
+        for stage, xs in by_stage.items():
+            xs.sort()
+            pct = lambda q: round(xs[min(len(xs) - 1, int(q * len(xs)))] * 1000, 3)
+            out[stage] = {"n": len(xs), "mean_ms": round(sum(xs) / len(xs) * 1000, 3),
+                          "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99)}
+        return out
+
+    def recent(self, n=20):
+        return [tr.record() for tr in list(self.ring)[-n:]] if n > 0 else []
+
+TRACER = Tracer()
+
+def trace_span(stage):
+    """with trace_span("stage"): … — timed into the current trace, if any."""
+    if not TRACER.active:
+        return _NO_SPAN
+    return TRACER.span(stage)
+
+def _trace_mode(tr, result):
+    if isinstance(result, dict):
+        tr.mode = result.get("mode")
+
+def traced(op):
+    """Trace calls of the decorated function (a sampled fraction of them).
+    Generator functions are traced from first to last item, with the trace
+    current only while the generator itself is running."""
+    def deco(fn):
+        if fn.__code__.co_flags & 0x20:   # CO_GENERATOR; `inspect` costs cold-start time
+            def wrapper(*a, **kw):
+                tr = TRACER.start(op) if TRACER.sample > 0 else None
+                if tr is None:
+                    yield from fn(*a, **kw)
+                    return
+                TRACER._local.trace = None
+                it = fn(*a, **kw)
+                try:
+                    while True:
+                        TRACER._local.trace = tr
+                        try:
+                            item = next(it)
+                        except StopIteration:
+                            return
+                        finally:
+                            TRACER._local.trace = None
+                        if item[0] == "done":
+                            _trace_mode(tr, item[1])
+                        yield item
+                finally:
+                    it.close()
+                    TRACER.finish(tr)
+        else:
+            def wrapper(*a, **kw):
+                if TRACER.sample <= 0:
+                    return fn(*a, **kw)
+                tr = TRACER.start(op)
+                if tr is None:
+                    return fn(*a, **kw)
+                try:
+                    res = fn(*a, **kw)
+                    _trace_mode(tr, res)
+                    return res
+                finally:
+                    TRACER.finish(tr)
+        wrapper.__name__, wrapper.__doc__, wrapper.__wrapped__ = fn.__name__, fn.__doc__, fn
+        return wrapper
+    return deco
+
+
 # ══════════════════════════════════════════════════════════════════════
 # ██  OLLIE — AI-Powered TIG Chat Engine
 # ══════════════════════════════════════════════════════════════════════
 
-# Load semantic brain
+# Semantic brain — loaded on first use, not at import
 _semantics_loaded = False
-try:
-    _sem_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ollie_semantics.py")
-    if os.path.exists(_sem_path):
-        import importlib.util
-        _sem_spec = importlib.util.spec_from_file_location("ollie_semantics", _sem_path)
-        _sem_mod = importlib.util.module_from_spec(_sem_spec)
-        _sem_spec.loader.exec_module(_sem_mod)
-        CONV_MEMORY = _sem_mod.ConversationMemory()
-        _semantics_loaded = True
-        print("  ◉ Semantic brain loaded")
-    else:
-        CONV_MEMORY = None
-except Exception as e:
-    print(f"  ⚠ Semantic brain failed: {e}")
-    CONV_MEMORY = None
-
-CHAT_HISTORY = []   # conversation memory for Claude API
-MAX_HISTORY = 40    # rolling window
+_sem_mod = None
+_sem_tried = False
+_sem_lock = threading.Lock()
+REPLY_SEED = os.environ.get("CRYSTAL_REPLY_SEED") or None  # set → reproducible template picks
+
+def _semantics():
+    """Load ollie_semantics once, on first call. Returns the module or None."""
+    global _semantics_loaded, _sem_mod, _sem_tried
+    if _sem_tried:
+        return _sem_mod
+    with _sem_lock:
+        if _sem_tried:
+            return _sem_mod
+        try:
+            _sem_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ollie_semantics.py")
+            if os.path.exists(_sem_path):
+                import importlib.util
+                _sem_spec = importlib.util.spec_from_file_location("ollie_semantics", _sem_path)
+                mod = importlib.util.module_from_spec(_sem_spec)
+                _sem_spec.loader.exec_module(mod)
+                _sem_mod = mod
+                _semantics_loaded = True
+                print("  ◉ Semantic brain loaded")
+        except Exception as e:
+            print(f"  ⚠ Semantic brain failed: {e}")
+        _sem_tried = True
+    return _sem_mod
+
+MAX_HISTORY = 40    # rolling window, per session
+CHAT_MAX_SESSIONS = int(os.environ.get("CHAT_MAX_SESSIONS", "1024"))  # idle ones are evicted LRU
+CHAT_HISTORY_DIR = os.environ.get("CHAT_HISTORY_DIR", "")  # one JSON file per session, off if empty
+DEFAULT_SESSION = "default"
+
+def _session_file(path, session):
+    """<path>/<blake2b of the session id>.json — fixed length, so any id
+    the API accepts stays well inside NAME_MAX (with a .tmp suffix too)."""
+    digest = hashlib.blake2b(session.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(path, digest + ".json")
+
+def _adopt_legacy_session_file(path, session):
+    """Rename a session file saved under the old <hex session id>.json name."""
+    fn = _session_file(path, session)
+    legacy = os.path.join(path, session.encode("utf-8").hex() + ".json")
+    try:
+        if not os.path.exists(fn):
+            os.rename(legacy, fn)
+    except OSError:
+        pass   # none, or a name too long to have been written
+
+class SessionHistory:
+    """Conversation memory for the AI backends, one ring per chat session.
+
+    Sessions hash onto `stripes` independent locks, each guarding an LRU
+    (OrderedDict) of session → deque(maxlen=MAX_HISTORY), so requests from
+    different users rarely touch the same lock. A stripe holds at most
+    max_sessions // stripes rings; the least recently used one is dropped
+    when it is full. With a directory set, every change is also written to
+    <dir>/<hashed session id>.json and an evicted (or pre-restart) session
+    is read back on its next turn.
+    """
+
+    def __init__(self, maxlen=MAX_HISTORY, max_sessions=CHAT_MAX_SESSIONS,
+                 path=CHAT_HISTORY_DIR, stripes=16):
+        self.maxlen = maxlen
+        self.path = path or None
+        self._stripes = [(threading.Lock(), OrderedDict()) for _ in range(stripes)]
+        self._per_stripe = max(1, max_sessions // stripes)
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0}
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+
+    def _stripe(self, session):
+        return self._stripes[hash(session) % len(self._stripes)]
+
+    def _file(self, session):
+        return _session_file(self.path, session)
+
+    def _ring(self, session, rings):
+        """The session's ring, moved to most-recent. Caller holds the stripe lock."""
+        ring = rings.get(session)
+        if ring is not None:
+            rings.move_to_end(session)
+            self.stats["hits"] += 1
+            return ring
+        ring = deque(maxlen=self.maxlen)
+        if self.path:
+            _adopt_legacy_session_file(self.path, session)
+            try:
+                with open(self._file(session), encoding="utf-8") as fh:
+                    ring.extend(json.load(fh))
+                self.stats["loads"] += 1
+            except (OSError, ValueError):
+                pass
+        rings[session] = ring
+        while len(rings) > self._per_stripe:
+            rings.popitem(last=False)
+            self.stats["evictions"] += 1
+        return ring
+
+    def _save(self, session, ring):
+        if not self.path:
+            return
+        fn = self._file(session)
+        tmp = f"{fn}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(list(ring), fh)
+            os.replace(tmp, fn)
+        except OSError as e:
+            print(f"  ⚠ Chat history not saved ({e})")
+
+    def get(self, session=DEFAULT_SESSION):
+        """A snapshot list of the session's messages, oldest first."""
+        lock, rings = self._stripe(session)
+        with lock:
+            return list(self._ring(session, rings))
+
+    def extend(self, session, *messages):
+        """Append messages to the session as one step (e.g. a user turn and its reply)."""
+        lock, rings = self._stripe(session)
+        with lock:
+            ring = self._ring(session, rings)
+            ring.extend(messages)
+            self._save(session, ring)
+
+    def clear(self, session=DEFAULT_SESSION):
+        lock, rings = self._stripe(session)
+        with lock:
+            rings.pop(session, None)
+            if self.path:
+                try:
+                    os.remove(self._file(session))
+                except OSError:
+                    pass
+
+    def clear_all(self):
+        for lock, rings in self._stripes:
+            with lock:
+                for session in list(rings):
+                    rings.pop(session)
+        if self.path:
+            for fn in os.listdir(self.path):
+                if fn.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.path, fn))
+                    except OSError:
+                        pass
+
+    def __len__(self):
+        return sum(len(rings) for _, rings in self._stripes)
+
+CHAT_HISTORY = SessionHistory()
+
+CONV_MEMORY_DIR = os.environ.get("CONV_MEMORY_DIR", "")  # semantic memory per session, off if empty
+CONV_MEMORY_MAX_FILES = int(os.environ.get("CONV_MEMORY_MAX_FILES", str(4 * CHAT_MAX_SESSIONS)))
+CONV_MEMORY_TTL = float(os.environ.get("CONV_MEMORY_TTL", str(7 * 86400)))  # s since a session's last turn
+
+class ConversationStore:
+    """Semantic-brain memory (ollie_semantics.ConversationMemory), one per
+    chat session, in the same striped LRU as SessionHistory.
+
+    With a directory set, a session's memory is <dir>/<hashed session id>.json
+    and every turn runs under an flock on that file: the memory is re-read
+    if another worker wrote it since this one last did (mtime and size),
+    and written back before the lock is released. Workers then see one
+    conversation per session, not one per process.
+
+    Clients pick their own session ids, so the directory is bounded too:
+    files idle for longer than `ttl` seconds are removed, then the least
+    recently written beyond `max_files`. That sweep runs when the path is
+    set and after every PRUNE_EVERY new sessions.
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, max_sessions=CHAT_MAX_SESSIONS, path=CONV_MEMORY_DIR, stripes=16,
+                 max_files=CONV_MEMORY_MAX_FILES, ttl=CONV_MEMORY_TTL):
+        self._stripes = [(threading.Lock(), OrderedDict()) for _ in range(stripes)]
+        self._per_stripe = max(1, max_sessions // stripes)
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0, "pruned": 0}
+        self.max_files = max_files
+        self.ttl = ttl
+        self._created = itertools.count(1)   # next() is atomic under the GIL
+        self._prune_lock = threading.Lock()
+        self.path = None
+        self.set_path(path)
+
+    def set_path(self, path):
+        """Move to another directory (or memory only); cached sessions are dropped."""
+        self.clear_all(files=False)
+        self.path = path or None
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            self.prune()
+
+    def prune(self):
+        """Drop session files idle past the TTL, then the oldest beyond max_files.
+        A file some worker holds locked mid-turn is skipped. Returns files removed."""
+        import fcntl
+        path = self.path
+        if not path or not self._prune_lock.acquire(blocking=False):
+            return 0
+        try:
+            files = []
+            for entry in os.scandir(path):
+                if entry.name.endswith(".json"):
+                    try:
+                        files.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        pass
+            files.sort()
+            cutoff = time.time() - self.ttl
+            excess = len(files) - self.max_files
+            removed = 0
+            for i, (mtime, fn) in enumerate(files):
+                if mtime >= cutoff and i >= excess:
+                    break
+                try:
+                    with open(fn, "rb") as fh:
+                        fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        os.remove(fn)   # turn() sees st_nlink == 0 and reopens
+                    removed += 1
+                except OSError:
+                    pass   # in use right now, or already gone
+            self.stats["pruned"] += removed
+            return removed
+        finally:
+            self._prune_lock.release()
+
+    def _stripe(self, session):
+        return self._stripes[hash(session) % len(self._stripes)]
+
+    def _file(self, session):
+        return _session_file(self.path, session)
+
+    def _keep(self, session, mems, mem, stamp):
+        mems[session] = (mem, stamp)
+        mems.move_to_end(session)
+        while len(mems) > self._per_stripe:
+            mems.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    @contextmanager
+    def turn(self, session, memory_cls):
+        """The session's memory for one turn, created from memory_cls if new."""
+        lock, mems = self._stripe(session)
+        with lock:
+            cached = mems.get(session)
+            if not self.path:
+                if cached is None:
+                    cached = (memory_cls(), None)
+                else:
+                    self.stats["hits"] += 1
+                self._keep(session, mems, *cached)
+                yield cached[0]
+                return
+            import fcntl
+            fn = self._file(session)
+            if cached is None:
+                _adopt_legacy_session_file(self.path, session)
+            while True:
+                fh = open(fn, "a+", encoding="utf-8")
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                st = os.fstat(fh.fileno())
+                if st.st_nlink:
+                    break
+                fh.close()      # pruned while we waited for the lock
+            created = st.st_size == 0
+            with fh:
+                if cached is not None and cached[1] == (st.st_mtime_ns, st.st_size):
+                    mem = cached[0]
+                    self.stats["hits"] += 1
+                else:
+                    mem = None
+                    fh.seek(0)
+                    data = fh.read()
+                    if data:
+                        try:
+                            mem = memory_cls.from_state(json.loads(data))
+                            self.stats["loads"] += 1
+                        except (ValueError, KeyError, TypeError) as e:
+                            print(f"  ⚠ Semantic memory for {session!r} unreadable ({e}), starting fresh")
+                    if mem is None:
+                        mem = memory_cls()
+                yield mem
+                fh.seek(0)
+                fh.truncate()
+                fh.write(json.dumps(mem.to_state()))
+                fh.flush()
+                st = os.fstat(fh.fileno())
+                self._keep(session, mems, mem, (st.st_mtime_ns, st.st_size))
+        if created and next(self._created) % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def clear(self, session=DEFAULT_SESSION):
+        lock, mems = self._stripe(session)
+        with lock:
+            mems.pop(session, None)
+            if self.path:
+                try:
+                    os.remove(self._file(session))
+                except OSError:
+                    pass
+
+    def clear_all(self, files=True):
+        for lock, mems in self._stripes:
+            with lock:
+                mems.clear()
+        if files and self.path:
+            for fn in os.listdir(self.path):
+                if fn.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.path, fn))
+                    except OSError:
+                        pass
+
+    def __len__(self):
+        return sum(len(mems) for _, mems in self._stripes)
+
+CONV_STORE = ConversationStore()
 
 OLLIE_SYSTEM = """You are Ollie, the TIG-native AI assistant built by 7Site LLC.
 
@@ -499,74 +1909,118 @@ NEVER:
 - Refuse reasonable requests
 """
 
-def _call_claude(messages, api_key):
+def _call_claude(messages, api_key, cancel=None):
     """Call Claude API. Returns text or None."""
     try:
-        import urllib.request
-        payload = json.dumps({
-            "model": "claude-sonnet-4-20250514",
-            "max_tokens": 1500,
-            "system": OLLIE_SYSTEM,
-            "messages": messages,
-        }).encode("utf-8")
-        req = urllib.request.Request(
+        data = HTTP_POOL.post_json(
             "https://api.anthropic.com/v1/messages",
-            data=payload,
+            {
+                "model": "claude-sonnet-4-20250514",
+                "max_tokens": 1500,
+                "system": OLLIE_SYSTEM,
+                "messages": messages,
+            },
             headers={
-                "Content-Type": "application/json",
                 "x-api-key": api_key,
                 "anthropic-version": "2023-06-01",
             },
-            method="POST",
+            timeout=BACKEND_TIMEOUTS["claude"],
+            cancel=cancel,
         )
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-            parts = [b["text"] for b in data.get("content", []) if b.get("type") == "text"]
-            return "\n".join(parts) if parts else None
+        parts = [b["text"] for b in data.get("content", []) if b.get("type") == "text"]
+        return "\n".join(parts) if parts else None
     except Exception as e:
-        print(f"  [Ollie] Claude API error: {e}")
+        if cancel is None or not cancel.cancelled:
+            print(f"  [Ollie] Claude API error: {e}")
         return None
 
 
-def _call_ollama(messages):
+def _call_ollama(messages, cancel=None):
     """Call local Ollama. Returns text or None."""
     if not OLLAMA_AVAILABLE or not OLLAMA_MODEL:
         return None
     try:
-        import urllib.request
         # Convert to Ollama format (system prompt as first message)
         ollama_msgs = [{"role": "system", "content": OLLIE_SYSTEM}]
         for m in messages:
             ollama_msgs.append({"role": m["role"], "content": m["content"]})
 
-        payload = json.dumps({
-            "model": OLLAMA_MODEL,
-            "messages": ollama_msgs,
-            "stream": False,
-            "options": {"num_predict": 1500, "temperature": 0.7},
-        }).encode("utf-8")
-        req = urllib.request.Request(
+        data = HTTP_POOL.post_json(
             f"{OLLAMA_URL}/api/chat",
-            data=payload,
-            headers={"Content-Type": "application/json"},
-            method="POST",
+            {
+                "model": OLLAMA_MODEL,
+                "messages": ollama_msgs,
+                "stream": False,
+                "options": {"num_predict": 1500, "temperature": 0.7},
+            },
+            timeout=BACKEND_TIMEOUTS["ollama"],
+            cancel=cancel,
         )
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-            return data.get("message", {}).get("content")
+        return data.get("message", {}).get("content")
     except Exception as e:
-        print(f"  [Ollie] Ollama error: {e}")
+        if cancel is None or not cancel.cancelled:
+            print(f"  [Ollie] Ollama error: {e}")
         return None
 
 
-def _geometry_only(user_input, tri, scales, words, ls):
+def _stream_claude(messages, api_key):
+    """Yield text deltas from the Claude Messages API event stream."""
+    body = json.dumps({
+        "model": "claude-sonnet-4-20250514",
+        "max_tokens": 1500,
+        "system": OLLIE_SYSTEM,
+        "messages": messages,
+        "stream": True,
+    }).encode("utf-8")
+    headers = {"Content-Type": "application/json", "x-api-key": api_key,
+               "anthropic-version": "2023-06-01"}
+    for line in HTTP_POOL.stream_lines("POST", "https://api.anthropic.com/v1/messages",
+                                       body, headers, timeout=BACKEND_TIMEOUTS["claude"]):
+        if not line.startswith(b"data:"):
+            continue
+        ev = json.loads(line[5:])
+        if ev.get("type") == "content_block_delta" and ev["delta"].get("type") == "text_delta":
+            yield ev["delta"]["text"]
+
+
+def _stream_ollama(messages):
+    """Yield content pieces from Ollama's streaming /api/chat (NDJSON)."""
+    if not OLLAMA_AVAILABLE or not OLLAMA_MODEL:
+        return
+    ollama_msgs = [{"role": "system", "content": OLLIE_SYSTEM}]
+    for m in messages:
+        ollama_msgs.append({"role": m["role"], "content": m["content"]})
+    body = json.dumps({
+        "model": OLLAMA_MODEL,
+        "messages": ollama_msgs,
+        "stream": True,
+        "options": {"num_predict": 1500, "temperature": 0.7},
+    }).encode("utf-8")
+    for line in HTTP_POOL.stream_lines("POST", f"{OLLAMA_URL}/api/chat", body,
+                                       {"Content-Type": "application/json"},
+                                       timeout=BACKEND_TIMEOUTS["ollama"]):
+        if not line.strip():
+            continue
+        ev = json.loads(line)
+        piece = ev.get("message", {}).get("content")
+        if piece:
+            yield piece
+
+
+def _geometry_only(user_input, tri, scales, words, ls, session=DEFAULT_SESSION):
     """Fallback: semantic brain (if loaded) or bare geometry."""
-    if _semantics_loaded and CONV_MEMORY is not None:
-        # Use full semantic response
-        sem = _sem_mod.build_semantic_response(user_input, tri, scales, ls, CONV_MEMORY)
+    sem_mod = _semantics()
+    if sem_mod is not None:
+        # Use full semantic response, with this session's memory
+        with CONV_STORE.turn(session, sem_mod.ConversationMemory) as memory:
+            sem = sem_mod.build_semantic_response(user_input, tri, scales, ls, memory,
+                                                 seed=REPLY_SEED)
         return sem["response"]
     
-    # Bare minimum fallback (no semantics module)
+    # Bare minimum fallback (no semantics module) — a pure function of the input
+    hit = REPLY_CACHE.get(user_input)
+    if hit is not None:
+        return hit
     op = scales["scales"]["operator"]
     pol = scales["scales"]["polarity"]
     subj = scales["scales"]["subject"]
@@ -592,7 +2046,486 @@ def _geometry_only(user_input, tri, scales, words, ls):
         if flow["word"] != force["word"]:
             parts.append(f"Flow: {flow['word']}({flow['glyph']}) | Force: {force['word']}({force['glyph']})")
 
-    return "\n".join(parts)
+    reply = "\n".join(parts)
+    REPLY_CACHE.put(user_input, reply)
+    return reply
+
+
+# ══════════════════════════════════════════════════════════════════════
+# ██  BACKEND ORCHESTRATOR — hedged fan-out across the AI backends
+# ══════════════════════════════════════════════════════════════════════
+#
+# Instead of "Claude, then Ollama once Claude has failed or timed out",
+# the first backend gets a head start of about its own p95 latency; if it
+# has not answered by then the next one is started alongside it, and the
+# first good answer wins while the rest are cancelled. A backend that
+# fails fast hands over at once. Failing or being overtaken lowers a
+# backend's success EWMA; below BACKEND_HEALTHY it moves to the back of
+# the order until BACKEND_RETRY_S after its last miss.
+#
+# Each backend also sits behind a circuit breaker: BREAKER_FAILURES
+# consecutive failures open it and the backend is left out of chat turns
+# entirely. While open, a background probe checks the backend every
+# BREAKER_COOLDOWN_S; a good probe (or the cooldown running out) moves the
+# breaker to half-open, where exactly one real call is let through — its
+# success closes the breaker, its failure opens it again.
+
+HEDGE_MIN_S = float(os.environ.get("HEDGE_MIN_S", "0.5"))     # never hedge sooner than this
+HEDGE_MAX_S = float(os.environ.get("HEDGE_MAX_S", "12"))      # nor later than this
+HEDGE_DEFAULT_S = float(os.environ.get("HEDGE_DEFAULT_S", "4"))  # until a backend has history
+BACKEND_EWMA_ALPHA = 0.2
+BACKEND_HEALTHY = 0.5      # success-rate EWMA below this → tried last
+BACKEND_RETRY_S = 30.0     # … for this long after its last miss
+BACKEND_THREADS = int(os.environ.get("BACKEND_THREADS", "16"))
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", "3"))         # consecutive, to open
+BREAKER_COOLDOWN_S = float(os.environ.get("BREAKER_COOLDOWN_S", "30"))  # open → half-open
+
+class BackendStats:
+    """Latency/success history for one backend."""
+
+    def __init__(self, name):
+        self.name = name
+        self.latency_ewma = None   # seconds, successful calls only
+        self.success_ewma = 1.0
+        self.recent = deque(maxlen=64)   # latencies of successful calls
+        self.calls = self.ok = self.failed = 0
+        self.hedged = 0            # times a later backend was started alongside this one
+        self.lost = 0              # times it was cancelled because another answered first
+        self.last_miss = 0.0
+
+    def record(self, latency, ok):
+        a = BACKEND_EWMA_ALPHA
+        self.calls += 1
+        if ok:
+            self.ok += 1
+            self.recent.append(latency)
+            self.latency_ewma = latency if self.latency_ewma is None else \
+                (1 - a) * self.latency_ewma + a * latency
+        else:
+            self.failed += 1
+        self._health(ok)
+
+    def overtaken(self):
+        self.lost += 1
+        self._health(False)
+
+    def _health(self, ok):
+        a = BACKEND_EWMA_ALPHA
+        self.success_ewma = (1 - a) * self.success_ewma + a * (1.0 if ok else 0.0)
+        if not ok:
+            self.last_miss = time.time()
+
+    def healthy(self):
+        return self.success_ewma >= BACKEND_HEALTHY or time.time() - self.last_miss >= BACKEND_RETRY_S
+
+    def p95(self):
+        if not self.recent:
+            return None
+        lat = sorted(self.recent)
+        return lat[min(len(lat) - 1, int(0.95 * len(lat)))]
+
+    def hedge_delay(self):
+        p = self.p95()
+        return HEDGE_DEFAULT_S if p is None else min(HEDGE_MAX_S, max(HEDGE_MIN_S, p))
+
+    def snapshot(self):
+        p = self.p95()
+        return {
+            "calls": self.calls, "ok": self.ok, "failed": self.failed,
+            "latency_ewma_ms": None if self.latency_ewma is None else round(self.latency_ewma * 1000, 1),
+            "p95_ms": None if p is None else round(p * 1000, 1),
+            "success_ewma": round(self.success_ewma, 3), "healthy": self.healthy(),
+            "hedged": self.hedged, "lost": self.lost,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+        }
+
+
+class CircuitBreaker:
+    """closed → open after BREAKER_FAILURES consecutive failures → half-open
+    after the cooldown or a good background probe → closed on one success.
+
+    probe() is an optional zero-argument health check returning a bool; it
+    runs on its own daemon thread, never on a caller's.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name, probe=None, failures=None, cooldown=None):
+        self.name = name
+        self.probe = probe
+        self.threshold = failures or BREAKER_FAILURES
+        self.cooldown = cooldown or BREAKER_COOLDOWN_S
+        self.state = self.CLOSED
+        self.failures = 0          # consecutive
+        self.opened_at = 0.0
+        self.trial = False         # a half-open trial call is in flight
+        self.trips = self.rejected = self.probes = 0
+        self._lock = threading.Lock()
+        self._prober = None
+
+    def _tick(self):
+        # Lock held: an open breaker whose cooldown has run out goes half-open
+        if self.state == self.OPEN and time.time() - self.opened_at >= self.cooldown:
+            self.state, self.trial = self.HALF_OPEN, False
+
+    def available(self):
+        """Could a call go through right now? (Does not claim the half-open slot.)"""
+        with self._lock:
+            self._tick()
+            return self.state == self.CLOSED or (self.state == self.HALF_OPEN and not self.trial)
+
+    def begin(self):
+        """Claim permission for one call; False means skip this backend."""
+        with self._lock:
+            self._tick()
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self.trial:
+                self.trial = True
+                return True
+            self.rejected += 1
+            return False
+
+    def success(self):
+        with self._lock:
+            self.state, self.failures, self.trial = self.CLOSED, 0, False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.threshold):
+                self._open()
+
+    def release(self):
+        """The call ended without a verdict (cancelled): free the half-open slot."""
+        with self._lock:
+            self.trial = False
+
+    def reset(self):
+        """Forget everything, e.g. after the backend's configuration changed."""
+        with self._lock:
+            self.state, self.failures, self.trial = self.CLOSED, 0, False
+
+    def _open(self):
+        # Lock held
+        if self.state != self.OPEN:
+            self.trips += 1
+        self.state, self.opened_at, self.trial = self.OPEN, time.time(), False
+        if self.probe is not None and (self._prober is None or not self._prober.is_alive()):
+            self._prober = threading.Thread(target=self._watch, name=f"breaker-{self.name}", daemon=True)
+            self._prober.start()
+
+    def _watch(self):
+        # Probe every cooldown while open; a good probe half-opens at once
+        while True:
+            time.sleep(self.cooldown)
+            with self._lock:
+                if self.state != self.OPEN:
+                    return
+            try:
+                ok = bool(self.probe())
+            except Exception:
+                ok = False
+            with self._lock:
+                self.probes += 1
+                if self.state != self.OPEN:
+                    return
+                if ok:
+                    self.state, self.trial = self.HALF_OPEN, False
+                    return
+                self.opened_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            self._tick()
+            return {
+                "state": self.state, "failures": self.failures,
+                "trips": self.trips, "rejected": self.rejected, "probes": self.probes,
+                "open_for_s": round(time.time() - self.opened_at, 1) if self.state == self.OPEN else 0,
+            }
+
+
+def _probe_claude():
+    """Cheap Claude health check: list models with the last key seen."""
+    key = BACKENDS.api_key or API_KEY
+    if not key:
+        return False
+    status, _ = HTTP_POOL.request("GET", "https://api.anthropic.com/v1/models?limit=1",
+                                  headers={"x-api-key": key, "anthropic-version": "2023-06-01"},
+                                  timeout=BACKEND_TIMEOUTS["probe"])
+    return status == 200
+
+
+def _probe_ollama_health():
+    _detect_ollama()
+    return OLLAMA_AVAILABLE
+
+
+class BackendOrchestrator:
+    """Runs one chat turn across the configured backends (see banner)."""
+
+    def __init__(self):
+        self.stats = {}
+        self.breakers = {"ai": CircuitBreaker("ai", _probe_claude),
+                         "ollama": CircuitBreaker("ollama", _probe_ollama_health)}
+        self.api_key = ""          # last key a turn ran with, for the Claude probe
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._pool = ThreadPoolExecutor(BACKEND_THREADS, thread_name_prefix="backend")
+        return self._pool
+
+    def _stats(self, name):
+        st = self.stats.get(name)
+        if st is None:
+            with self._lock:
+                st = self.stats.setdefault(name, BackendStats(name))
+        return st
+
+    def _breaker(self, name):
+        br = self.breakers.get(name)
+        if br is None:
+            with self._lock:
+                br = self.breakers.setdefault(name, CircuitBreaker(name))
+        return br
+
+    def backends(self, api_key):
+        """[(mode, call(messages, cancel))] for what is configured, healthy first."""
+        cands = []
+        if api_key:
+            self.api_key = api_key
+            cands.append(("ai", lambda msgs, tok: _call_claude(msgs, api_key, cancel=tok)))
+        if OLLAMA_AVAILABLE:
+            cands.append(("ollama", lambda msgs, tok: _call_ollama(msgs, cancel=tok)))
+        return self.order(cands)
+
+    def order(self, cands):
+        """(name, …) pairs whose breaker is not open, in configured order with
+        unhealthy ones last."""
+        cands = [c for c in cands if self._breaker(c[0]).available()]
+        return sorted(cands, key=lambda c: not self._stats(c[0]).healthy())
+
+    def begin(self, name):
+        """Ask the breaker right before calling; False → skip the backend."""
+        return self._breaker(name).begin()
+
+    def record(self, name, latency, ok):
+        st = self._stats(name)
+        with self._lock:
+            st.record(latency, ok)
+        br = self._breaker(name)
+        br.success() if ok else br.failure()
+
+    def call(self, messages, api_key):
+        """First good reply across the configured backends: (text, mode), or (None, None)."""
+        return self.run(messages, self.backends(api_key))
+
+    def run(self, messages, cands):
+        """Hedged run over [(name, fn(messages, cancel_token))], tried in the given order."""
+        from concurrent.futures import wait, FIRST_COMPLETED
+        pending = list(cands)
+        if not pending:
+            return None, None
+        pool = self._executor()
+        running = {}   # future → (name, token, started)
+
+        def launch():
+            while pending:
+                name, fn = pending.pop(0)
+                if self.begin(name):
+                    tok = CancelToken()
+                    running[pool.submit(fn, messages, tok)] = (name, tok, time.perf_counter())
+                    return name
+            return None
+
+        last = launch()
+        try:
+            while running:
+                timeout = self._stats(last).hedge_delay() if pending else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Hedge: the newest backend is past its p95, start the next one too
+                    for name, _, _ in running.values():
+                        self._stats(name).hedged += 1
+                    last = launch() or last
+                    continue
+                for fut in done:
+                    name, _, t0 = running.pop(fut)
+                    try:
+                        text = fut.result()
+                    except Exception as e:
+                        print(f"  [Ollie] {name} backend error: {e}")
+                        text = None
+                    self.record(name, time.perf_counter() - t0, bool(text))
+                    if text:
+                        return text, name
+                if not running and pending:
+                    last = launch()
+            return None, None
+        finally:
+            for name, tok, _ in running.values():   # losers
+                st = self._stats(name)
+                with self._lock:
+                    st.overtaken()
+                self._breaker(name).release()
+                tok.cancel()
+
+    def snapshot(self):
+        out = {name: st.snapshot() for name, st in list(self.stats.items())}
+        for name, br in list(self.breakers.items()):
+            out.setdefault(name, {})["breaker"] = br.snapshot()
+        return out
+
+BACKENDS = BackendOrchestrator()
+
+
+# ══════════════════════════════════════════════════════════════════════
+# ██  CHAT LANE — bounded executor for backend-bound chat turns
+# ══════════════════════════════════════════════════════════════════════
+#
+# A chat turn that will call an AI backend can take up to the backend's
+# timeout, so those turns run on CHAT_WORKERS dedicated threads with at
+# most CHAT_QUEUE more waiting. Past that the API answers 503 with a
+# Retry-After instead of queueing without bound. Commands, geometry and
+# turns with no backend available skip the lane and answer inline, as do
+# the /api/tri/* and lattice endpoints — with the production server, the
+# CRYSTAL_THREADS beyond CHAT_WORKERS + CHAT_QUEUE stay free for them.
+
+CHAT_WORKERS = int(os.environ.get("CHAT_WORKERS", "4"))
+CHAT_QUEUE = int(os.environ.get("CHAT_QUEUE", "4"))
+CHAT_RETRY_AFTER = 5   # seconds, until the lane has timed a few turns
+
+class LaneFull(Exception):
+    """The chat lane has no room; retry_after is a hint in seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"chat lane full, retry in {retry_after} s")
+        self.retry_after = retry_after
+
+
+class ChatLane:
+    """ThreadPoolExecutor with admission control and queue/wait metrics."""
+
+    def __init__(self, workers=None, queue=None):
+        self.workers = workers or CHAT_WORKERS
+        self.queue = CHAT_QUEUE if queue is None else queue
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue)
+        self._lock = threading.Lock()
+        self._pool = None
+        self.admitted = self.rejected = 0
+        self.running = self.queued = self.peak = 0
+        self.waits = deque(maxlen=256)   # seconds from admission to start
+        self.service_ewma = None         # seconds per turn
+
+    def _executor(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="chat")
+        return self._pool
+
+    def retry_after(self):
+        """Seconds until a slot is likely free: the queue ahead, drained by all workers."""
+        if self.service_ewma is None:
+            return CHAT_RETRY_AFTER
+        return max(1, min(60, math.ceil((self.queued + 1) * self.service_ewma / self.workers)))
+
+    def _admit(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise LaneFull(self.retry_after())
+        with self._lock:
+            self.admitted += 1
+
+    def _done(self, elapsed):
+        with self._lock:
+            a = BACKEND_EWMA_ALPHA
+            self.service_ewma = elapsed if self.service_ewma is None else \
+                (1 - a) * self.service_ewma + a * elapsed
+        self._slots.release()
+
+    def submit(self, fn, *args, **kw):
+        """Future for fn(*args, **kw) on a lane thread; raises LaneFull when full."""
+        self._admit()
+        with self._lock:
+            self.queued += 1
+            self.peak = max(self.peak, self.queued + self.running)
+        t_in = time.perf_counter()
+
+        def job():
+            t0 = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.waits.append(t0 - t_in)
+            try:
+                return fn(*args, **kw)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                self._done(time.perf_counter() - t0)
+
+        try:
+            return self._executor().submit(job)
+        except Exception:
+            with self._lock:
+                self.queued -= 1
+            self._slots.release()
+            raise
+
+    def run(self, fn, *args, **kw):
+        return self.submit(fn, *args, **kw).result()
+
+    def hold(self):
+        """Take a lane slot on the caller's thread; returns the release()
+        to call (once or more) when done. Streams use this: they are written
+        out by the server thread but count against the same limit."""
+        self._admit()
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.queued + self.running)
+            self.waits.append(0.0)
+        t0 = time.perf_counter()
+        held = [True]
+
+        def release():
+            with self._lock:
+                if not held[0]:
+                    return
+                held[0] = False
+                self.running -= 1
+            self._done(time.perf_counter() - t0)
+        return release
+
+    def snapshot(self):
+        with self._lock:
+            w = sorted(self.waits)
+        pct = lambda q: round(w[min(len(w) - 1, int(q * len(w)))] * 1000, 2) if w else None
+        return {
+            "workers": self.workers, "queue_limit": self.queue,
+            "running": self.running, "queued": self.queued, "peak": self.peak,
+            "admitted": self.admitted, "rejected": self.rejected,
+            "wait_p50_ms": pct(0.5), "wait_p95_ms": pct(0.95),
+            "service_ewma_ms": None if self.service_ewma is None else round(self.service_ewma * 1000, 1),
+            "retry_after_s": self.retry_after(),
+        }
+
+CHAT_LANE = ChatLane()
+
+def _backend_bound(text, api_key):
+    """Will this chat turn call an AI backend? (Commands and geometry won't.)"""
+    if not (api_key or OLLAMA_AVAILABLE):
+        return False
+    raw = text.strip()
+    hit = COMMAND_CACHE.peek(raw) is not None or _match_command(raw.lower()) is not None
+    return not hit and bool(BACKENDS.backends(api_key))
 
 
 # ══════════════════════════════════════════════════════════════════════
@@ -601,7 +2534,7 @@ def _geometry_only(user_input, tri, scales, words, ls):
 
 def _cmd_result(text, lattice, tri_override=None, scales_override=None):
     """Build a response dict for a command result."""
-    ls = lattice.state()
+    ls = lattice.summary()
     tri = tri_override or {"glyph":"□▶○","sym":"BDC","desc":"command","tig_op":1,"tig_name":"lattice"}
     scales = scales_override or parse_6scale(text[:50])
     return {
@@ -613,389 +2546,431 @@ def _cmd_result(text, lattice, tri_override=None, scales_override=None):
         "mode": "command",
     }
 
-def _route_command(text, lattice):
-    """Check if text is a system command. Returns response dict or None."""
-    low = text.strip().lower()
-    raw = text.strip()
-
-    # ── HELP ──
-    if low in ("help","commands","what can you do","?"):
-        return _cmd_result(
-            "◇ CRYSTAL BUG — COMMAND INTERFACE\n"
-            "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-            "\n"
-            "ANALYZE:\n"
-            "  analyze [word]        tri-prime decode a word\n"
-            "  analyze: [sentence]   decode a full sentence\n"
-            "  letter [X]            single letter geometry\n"
-            "  batch: w1, w2, w3     batch analyze words\n"
-            "  compare X and Y       compose two words\n"
-            "  parse: [text]         full 6-scale reading\n"
-            "  chart                 all 26 letter mappings\n"
-            "  cube                  all 27 tri-prime states\n"
-            "\n"
-            "LATTICE:\n"
-            "  birth [name]          birth a new unit\n"
-            "  step / tick [N]       advance N ticks (default 1)\n"
-            "  lattice / status      show lattice state\n"
-            "  kill [name]           collapse a unit\n"
-            "\n"
-            "TRUST:\n"
-            "  trust [N]             run N rounds (default 10)\n"
-            "  trust cascade         cascade failure scenario\n"
-            "  trust random          random shock scenario\n"
-            "\n"
-            "SYSTEM:\n"
-            "  engines               show all engine status\n"
-            "  history               lattice event log\n"
-            "  help                  this list\n"
-            "\n"
-            "Or just talk naturally — Ollie handles both.",
-            lattice)
-
-    # ── ANALYZE WORD ──
-    m = re.match(r'(?:analyze|decode|triprime|tri-prime|tri prime|read)\s+([a-zA-Z]+)$', low)
-    if m:
-        word = m.group(1).upper()
-        w = tri_word(word)
-        lines = [
-            f"◇ ANALYZE: {word}",
-            f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"  Glyph:    {w['glyph']}",
-            f"  State:    [{w['sym']}] — {w['desc']}",
-            f"  TIG Op:   {w['tig_op']} ({w['tig_name']})",
-            f"  Ratio:    □ Being {w['ratio']['Being']:.0%}  ▶ Doing {w['ratio']['Doing']:.0%}  ○ Becoming {w['ratio']['Becoming']:.0%}",
-            f"",
-            f"  LETTER DECOMPOSITION:",
-        ]
-        for lt in w['letters']:
-            ldata = tri_letter(lt['ch'])
-            lines.append(f"    {lt['ch']}  {lt['glyph']}  [{lt['sym']}]  {ldata['desc'] if ldata else ''}")
-        if w.get('trace') and len(w['trace']) > 1:
-            lines.append(f"")
-            lines.append(f"  COMPOSITION TRACE:")
-            chars = [c for c in word if c in LETTERS]
-            for i, t in enumerate(w['trace']):
-                prefix = chars[0] if i == 0 else f"{'→'.join(chars[:i+1])}"
-                lines.append(f"    {prefix:16s}  {t['glyph']}  [{t['sym']}]")
-        return _cmd_result("\n".join(lines), lattice, tri_override=w)
-
-    # ── ANALYZE SENTENCE ──
-    m = re.match(r'(?:analyze|decode|read|parse)[\s:]+(.{5,})$', low)
-    if m:
-        start_idx = low.index(m.group(1)[:3])
-        sentence = raw[start_idx:]
-        s = tri_sentence(sentence)
-        sc = parse_6scale(sentence)
+# Each command is one handler below plus one row in COMMANDS. A handler
+# takes (lattice, low, raw, **groups) — the lowercased and raw stripped
+# text and the named groups of its pattern — and returns a response dict,
+# or None to let the text fall through to the chat cascade.
+
+def _cmd_help(lattice, low, raw):
+    return _cmd_result(
+        "◇ CRYSTAL BUG — COMMAND INTERFACE\n"
+        "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        "\n"
+        "ANALYZE:\n"
+        "  analyze [word]        tri-prime decode a word\n"
+        "  analyze: [sentence]   decode a full sentence\n"
+        "  letter [X]            single letter geometry\n"
+        "  batch: w1, w2, w3     batch analyze words\n"
+        "  compare X and Y       compose two words\n"
+        "  parse: [text]         full 6-scale reading\n"
+        "  chart                 all 26 letter mappings\n"
+        "  cube                  all 27 tri-prime states\n"
+        "\n"
+        "LATTICE:\n"
+        "  birth [name]          birth a new unit\n"
+        "  step / tick [N]       advance N ticks (default 1)\n"
+        "  lattice / status      show lattice state\n"
+        "  kill [name]           collapse a unit\n"
+        "\n"
+        "TRUST:\n"
+        "  trust [N]             run N rounds (default 10)\n"
+        "  trust cascade         cascade failure scenario\n"
+        "  trust random          random shock scenario\n"
+        "\n"
+        "SYSTEM:\n"
+        "  engines               show all engine status\n"
+        "  history               lattice event log\n"
+        "  help                  this list\n"
+        "\n"
+        "Or just talk naturally — Ollie handles both.",
+        lattice)
+
+def _cmd_analyze_word(lattice, low, raw, word):
+    word = word.upper()
+    w = tri_word(word)
+    lines = [
+        f"◇ ANALYZE: {word}",
+        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"  Glyph:    {w['glyph']}",
+        f"  State:    [{w['sym']}] — {w['desc']}",
+        f"  TIG Op:   {w['tig_op']} ({w['tig_name']})",
+        f"  Ratio:    □ Being {w['ratio']['Being']:.0%}  ▶ Doing {w['ratio']['Doing']:.0%}  ○ Becoming {w['ratio']['Becoming']:.0%}",
+        f"",
+        f"  LETTER DECOMPOSITION:",
+    ]
+    for lt in w['letters']:
+        ldata = tri_letter(lt['ch'])
+        lines.append(f"    {lt['ch']}  {lt['glyph']}  [{lt['sym']}]  {ldata['desc'] if ldata else ''}")
+    if w.get('trace') and len(w['trace']) > 1:
+        lines.append(f"")
+        lines.append(f"  COMPOSITION TRACE:")
+        chars = [c for c in word if c in LETTERS]
+        for i, t in enumerate(w['trace']):
+            prefix = chars[0] if i == 0 else f"{'→'.join(chars[:i+1])}"
+            lines.append(f"    {prefix:16s}  {t['glyph']}  [{t['sym']}]")
+    return _cmd_result("\n".join(lines), lattice, tri_override=w)
+
+def _cmd_analyze_sentence(lattice, low, raw, text):
+    start_idx = low.index(text[:3])
+    sentence = raw[start_idx:]
+    s = tri_sentence(sentence)
+    sc = parse_6scale(sentence)
+    lines = [
+        f"◇ SENTENCE ANALYSIS",
+        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"  Input:    \"{sentence}\"",
+        f"  Glyph:    {s['glyph']}",
+        f"  State:    [{s['sym']}] — {s['desc']}",
+        f"  TIG Op:   {s['tig_op']} ({s['tig_name']})",
+        f"",
+        f"  6-SCALE READING:",
+        f"    Polarity:  {sc['scales']['polarity']:+.2f}",
+        f"    Subject:   {sc['scales']['subject']}",
+        f"    Time:      {sc['scales']['time']}",
+        f"    Operator:  {sc['scales']['operator']} ({sc['scales']['operator_name']})",
+        f"    Depth:     {sc['scales']['depth']}",
+        f"",
+        f"  WORD MAP:",
+    ]
+    for w in (s.get('words') or []):
+        lines.append(f"    {w['word']:14s}  {w['glyph']}  [{w['sym']}]  {w['desc']:20s}  op:{w['tig']}")
+    return _cmd_result("\n".join(lines), lattice, tri_override=s, scales_override=sc)
+
+def _cmd_letter(lattice, low, raw, ch):
+    ch = ch.upper()
+    lt = tri_letter(ch)
+    if lt:
         lines = [
-            f"◇ SENTENCE ANALYSIS",
+            f"◇ LETTER: {ch}",
             f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"  Input:    \"{sentence}\"",
-            f"  Glyph:    {s['glyph']}",
-            f"  State:    [{s['sym']}] — {s['desc']}",
-            f"  TIG Op:   {s['tig_op']} ({s['tig_name']})",
-            f"",
-            f"  6-SCALE READING:",
-            f"    Polarity:  {sc['scales']['polarity']:+.2f}",
-            f"    Subject:   {sc['scales']['subject']}",
-            f"    Time:      {sc['scales']['time']}",
-            f"    Operator:  {sc['scales']['operator']} ({sc['scales']['operator_name']})",
-            f"    Depth:     {sc['scales']['depth']}",
-            f"",
-            f"  WORD MAP:",
+            f"  Glyph:     {lt['glyph']}",
+            f"  State:     [{lt['sym']}] — {lt['desc']}",
+            f"  TIG Op:    {lt['tig_op']} ({lt['tig_name']})",
+            f"  Dominant:  {lt['dominant']}",
         ]
-        for w in (s.get('words') or []):
-            lines.append(f"    {w['word']:14s}  {w['glyph']}  [{w['sym']}]  {w['desc']:20s}  op:{w['tig']}")
-        return _cmd_result("\n".join(lines), lattice, tri_override=s, scales_override=sc)
-
-    # ── SINGLE LETTER ──
-    m = re.match(r'(?:letter|char)\s+([a-zA-Z])$', low)
-    if m:
-        ch = m.group(1).upper()
-        lt = tri_letter(ch)
-        if lt:
-            lines = [
-                f"◇ LETTER: {ch}",
-                f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-                f"  Glyph:     {lt['glyph']}",
-                f"  State:     [{lt['sym']}] — {lt['desc']}",
-                f"  TIG Op:    {lt['tig_op']} ({lt['tig_name']})",
-                f"  Dominant:  {lt['dominant']}",
-            ]
-            return _cmd_result("\n".join(lines), lattice)
-        return _cmd_result(f"Unknown letter: {ch}", lattice)
-
-    # ── BATCH ──
-    m = re.match(r'batch[\s:]+(.+)$', low)
-    if m:
-        batch_words = re.findall(r'[a-zA-Z]+', m.group(1))
-        if batch_words:
-            lines = [f"◇ BATCH ANALYSIS ({len(batch_words)} words)",
-                     f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-                     f"  {'WORD':14s} {'GLYPH':6s} {'STATE':4s} {'DESCRIPTION':22s} {'OP':12s} {'□':4s} {'▶':4s} {'○':4s}"]
-            for bw in batch_words[:50]:
-                w = tri_word(bw.upper())
-                lines.append(f"  {w['word']:14s} {w['glyph']:6s} {w['sym']:4s} {w['desc']:22s} {w['tig_name']:12s} {w['ratio']['Being']:.0%} {w['ratio']['Doing']:.0%} {w['ratio']['Becoming']:.0%}")
-            return _cmd_result("\n".join(lines), lattice)
-
-    # ── COMPARE / COMPOSE ──
-    m = re.match(r'compare\s+([a-zA-Z]+)\s+(?:and|vs|to|with|&|\+)\s+([a-zA-Z]+)$', low)
-    if m:
-        w1 = tri_word(m.group(1).upper())
-        w2 = tri_word(m.group(2).upper())
-        composed = tri_compose(w1['triple'], w2['triple'])
-        c_sym = tri_sym(composed)
-        c_glyph = tri_glyph(composed)
-        c_desc = DESC_27.get(composed, "unknown")
-        c_tig = _to_tig(composed)
-        lines = [
-            f"◇ COMPOSITION",
-            f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"  {w1['word']:14s}  {w1['glyph']}  [{w1['sym']}]  {w1['desc']}  ({w1['tig_name']})",
-            f"  {w2['word']:14s}  {w2['glyph']}  [{w2['sym']}]  {w2['desc']}  ({w2['tig_name']})",
-            f"",
-            f"  ◉ COMPOSED:     {c_glyph}  [{c_sym}]  {c_desc}  ({TIG_OPS[c_tig]})",
-            f"",
-            f"  When {w1['word']} meets {w2['word']}, the geometry resolves to {c_desc}.",
-        ]
-        return _cmd_result("\n".join(lines), lattice)
-
-    # ── CHART ──
-    if low in ("chart","alphabet","show chart","letters","all letters","show letters"):
-        chart = tri_chart()
-        lines = [f"◇ TRI-PRIME ALPHABET",
-                 f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-                 f"  {'LTR':3s}  {'GLYPH':6s}  {'STATE':4s}  {'DESCRIPTION':22s}  {'OP':12s}  {'DOMINANT':10s}"]
-        for ch, lt in chart.items():
-            if lt:
-                lines.append(f"  {ch:3s}  {lt['glyph']:6s}  {lt['sym']:4s}  {lt['desc']:22s}  {lt['tig_name']:12s}  {lt['dominant']:10s}")
         return _cmd_result("\n".join(lines), lattice)
+    return _cmd_result(f"Unknown letter: {ch}", lattice)
 
-    # ── CUBE (27 states) ──
-    if low in ("cube","27 states","show cube","all states","states","27"):
-        lines = [f"◇ 27 TRI-PRIME STATES",
-                 f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-                 f"  {'GLYPH':6s}  {'STATE':4s}  {'DESCRIPTION':22s}  {'OP':4s}  {'OP NAME':12s}  LETTERS"]
-        for a in [B,D,C]:
-            for b in [B,D,C]:
-                for c in [B,D,C]:
-                    t = (a,b,c)
-                    tig = _to_tig(t)
-                    letters_here = [ch for ch,lt in LETTERS.items() if lt==t]
-                    lines.append(f"  {tri_glyph(t):6s}  {tri_sym(t):4s}  {DESC_27[t]:22s}  {tig:4d}  {TIG_OPS[tig]:12s}  {','.join(letters_here) if letters_here else '—'}")
-        return _cmd_result("\n".join(lines), lattice)
-
-    # ── PARSE (6-scale only) ──
-    m = re.match(r'parse[\s:]+(.+)$', low)
-    if m:
-        start_idx = low.index(m.group(1)[:3])
-        txt = raw[start_idx:]
-        sc = parse_6scale(txt)
-        s = sc["scales"]
-        lines = [
-            f"◇ 6-SCALE PARSE",
-            f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"  Input:     \"{txt}\"",
-            f"  Scale 0 — Void:      {s['void']}",
-            f"  Scale 1 — Polarity:  {s['polarity']:+.2f}",
-            f"  Scale 2 — Subject:   {s['subject']}",
-            f"  Scale 3 — Time:      {s['time']}",
-            f"  Scale 4 — Operator:  {s['operator']} ({s['operator_name']})",
-            f"  Scale 5 — Depth:     {s['depth']}",
-        ]
-        return _cmd_result("\n".join(lines), lattice, scales_override=sc)
-
-    # ── BIRTH ──
-    m = re.match(r'(?:birth|create|spawn|new unit|add unit)(?:\s+(\w+))?(?:\s+(?:shell\s*)?(\d+))?$', low)
-    if m:
-        name = m.group(1)
-        if name and name in ("a","new","unit"): name = None  # strip noise words
-        shell = int(m.group(2)) if m.group(2) else 5
+def _cmd_batch(lattice, low, raw, words):
+    batch_words = re.findall(r'[a-zA-Z]+', words)
+    if not batch_words:
+        return None
+    lines = [f"◇ BATCH ANALYSIS ({len(batch_words)} words)",
+             f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+             f"  {'WORD':14s} {'GLYPH':6s} {'STATE':4s} {'DESCRIPTION':22s} {'OP':12s} {'□':4s} {'▶':4s} {'○':4s}"]
+    for bw in batch_words[:50]:
+        w = tri_word(bw.upper())
+        lines.append(f"  {w['word']:14s} {w['glyph']:6s} {w['sym']:4s} {w['desc']:22s} {w['tig_name']:12s} {w['ratio']['Being']:.0%} {w['ratio']['Doing']:.0%} {w['ratio']['Becoming']:.0%}")
+    return _cmd_result("\n".join(lines), lattice)
+
+def _cmd_compare(lattice, low, raw, a, b):
+    w1 = tri_word(a.upper())
+    w2 = tri_word(b.upper())
+    composed = tri_compose(w1['triple'], w2['triple'])
+    c_sym = tri_sym(composed)
+    c_glyph = tri_glyph(composed)
+    c_desc = DESC_27.get(composed, "unknown")
+    c_tig = _to_tig(composed)
+    lines = [
+        f"◇ COMPOSITION",
+        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"  {w1['word']:14s}  {w1['glyph']}  [{w1['sym']}]  {w1['desc']}  ({w1['tig_name']})",
+        f"  {w2['word']:14s}  {w2['glyph']}  [{w2['sym']}]  {w2['desc']}  ({w2['tig_name']})",
+        f"",
+        f"  ◉ COMPOSED:     {c_glyph}  [{c_sym}]  {c_desc}  ({TIG_OPS[c_tig]})",
+        f"",
+        f"  When {w1['word']} meets {w2['word']}, the geometry resolves to {c_desc}.",
+    ]
+    return _cmd_result("\n".join(lines), lattice)
+
+def _cmd_chart(lattice, low, raw):
+    chart = tri_chart()
+    lines = [f"◇ TRI-PRIME ALPHABET",
+             f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+             f"  {'LTR':3s}  {'GLYPH':6s}  {'STATE':4s}  {'DESCRIPTION':22s}  {'OP':12s}  {'DOMINANT':10s}"]
+    for ch, lt in chart.items():
+        if lt:
+            lines.append(f"  {ch:3s}  {lt['glyph']:6s}  {lt['sym']:4s}  {lt['desc']:22s}  {lt['tig_name']:12s}  {lt['dominant']:10s}")
+    return _cmd_result("\n".join(lines), lattice)
+
+def _cmd_cube(lattice, low, raw):
+    lines = [f"◇ 27 TRI-PRIME STATES",
+             f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+             f"  {'GLYPH':6s}  {'STATE':4s}  {'DESCRIPTION':22s}  {'OP':4s}  {'OP NAME':12s}  LETTERS"]
+    for st in tri_cube():
+        lines.append(f"  {st['glyph']:6s}  {st['sym']:4s}  {st['desc']:22s}  {st['tig_op']:4d}  {st['tig_name']:12s}  {','.join(st['letters']) if st['letters'] else '—'}")
+    return _cmd_result("\n".join(lines), lattice)
+
+def _cmd_parse(lattice, low, raw, text):
+    start_idx = low.index(text[:3])
+    txt = raw[start_idx:]
+    sc = parse_6scale(txt)
+    s = sc["scales"]
+    lines = [
+        f"◇ 6-SCALE PARSE",
+        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"  Input:     \"{txt}\"",
+        f"  Scale 0 — Void:      {s['void']}",
+        f"  Scale 1 — Polarity:  {s['polarity']:+.2f}",
+        f"  Scale 2 — Subject:   {s['subject']}",
+        f"  Scale 3 — Time:      {s['time']}",
+        f"  Scale 4 — Operator:  {s['operator']} ({s['operator_name']})",
+        f"  Scale 5 — Depth:     {s['depth']}",
+    ]
+    return _cmd_result("\n".join(lines), lattice, scales_override=sc)
+
+def _cmd_birth(lattice, low, raw, name, shell):
+    if name and name in ("a","new","unit"): name = None  # strip noise words
+    shell = int(shell) if shell else 5
+    try:
         unit = lattice.birth(name=name, shell=shell)
-        ls = lattice.state()
-        lines = [
-            f"◇ UNIT BORN",
-            f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"  ID:         {unit['id']}",
-            f"  Name:       {unit['name']}",
-            f"  Shell:      {unit['shell']}",
-            f"  Health:     {unit['health']:.0%}",
-            f"  Coherence:  {unit['coherence']:.3f}",
-            f"  Tri-State:  {tri_glyph(unit['tri_state'])} [{tri_sym(unit['tri_state'])}]",
-            f"  Operator:   {unit['operator']} ({TIG_OPS[unit['operator']]})",
-            f"  Bonds:      {len(unit['bonds'])}",
-            f"",
-            f"  Lattice: {ls['alive']} alive, health {ls['avg_health']:.0%}, tick {ls['tick']}",
-        ]
-        return _cmd_result("\n".join(lines), lattice)
-
-    # ── STEP / TICK ──
-    m = re.match(r'(?:step|tick|advance|run)(?:\s+(\d+))?(?:\s*(?:ticks?|steps?))?$', low)
-    if m:
-        n = int(m.group(1)) if m.group(1) else 1
-        n = min(n, 10000)
-        before = lattice.state()
-        for _ in range(n):
-            lattice.step()
-        after = lattice.state()
-        lines = [
-            f"◇ LATTICE +{n} TICK{'S' if n>1 else ''}",
-            f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"  Tick:       {before['tick']} → {after['tick']}",
-            f"  Alive:      {after['alive']} / {after['total_units']}",
-            f"  Health:     {before['avg_health']:.2%} → {after['avg_health']:.2%}",
-            f"  Above T*:   {after['above_threshold']}",
-        ]
-        # Show events during run
-        new_events = after['recent_events'][len(before['recent_events']):]
-        if new_events:
-            lines.append(f"")
-            lines.append(f"  EVENTS:")
-            for ev in new_events[-10:]:
-                lines.append(f"    tick {ev['tick']}: {ev['event']} — {ev['name']}")
-        # Show units
-        if after['units']:
-            lines.append(f"")
-            lines.append(f"  UNITS:")
-            for u in after['units'][:15]:
-                bar = "█" * int(u['health']*10) + "░" * (10-int(u['health']*10))
-                lines.append(f"    {u['name']:14s} [{bar}] {u['health']:.0%}  σ={u['coherence']:.3f}  op:{u['op_name']}  bonds:{u['bonds']}")
-        return _cmd_result("\n".join(lines), lattice)
-
-    # ── LATTICE STATUS ──
-    if low in ("lattice","lattice status","show lattice","status","units","state","ls"):
-        ls = lattice.state()
-        lines = [
-            f"◇ LATTICE STATE",
-            f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"  Tick:       {ls['tick']}",
-            f"  Units:      {ls['alive']} alive / {ls['total_units']} total",
-            f"  Health:     {ls['avg_health']:.2%}",
-            f"  Coherence:  {ls['avg_coherence']:.3f}",
-            f"  Above T*:   {ls['above_threshold']}",
-            f"  Genesis:    {len(ls['recent_events'])} logged events",
-        ]
-        if ls['units']:
-            lines.append(f"")
-            lines.append(f"  {'NAME':14s}  {'HEALTH':10s}  {'σ':7s}  {'OP':12s}  {'TRI':4s}  {'BONDS':5s}")
-            lines.append(f"  {'─'*58}")
-            for u in ls['units'][:20]:
-                bar = "█" * int(u['health']*10) + "░" * (10-int(u['health']*10))
-                lines.append(f"  {u['name']:14s}  [{bar}]  {u['coherence']:.3f}  {u['op_name']:12s}  {u['tri_state']:4s}  {u['bonds']:5d}")
-        else:
-            lines.append(f"\n  No units. Type 'birth [name]' to create one.")
-        return _cmd_result("\n".join(lines), lattice)
-
-    # ── KILL / COLLAPSE ──
-    m = re.match(r'(?:kill|collapse|remove)\s+(\w+)$', low)
-    if m:
-        target = m.group(1)
-        found = None
-        for u in lattice.units:
-            if u['name'].lower() == target:
-                found = u
-                break
-        if found:
-            found['health'] = 0
-            found['operator'] = 4
-            lattice.genesis_log.append({"tick":lattice.tick,"event":"manual_collapse","unit_id":found['id'],"name":found['name']})
-            ls = lattice.state()
-            return _cmd_result(
-                f"◇ UNIT COLLAPSED: {found['name']}\n"
-                f"  Lattice: {ls['alive']} alive, health {ls['avg_health']:.0%}",
-                lattice)
-        return _cmd_result(f"Unit '{target}' not found. Type 'lattice' to see units.", lattice)
-
-    # ── TRUST COUNCIL ──
-    m = re.match(r'(?:trust|council|trust council|run trust)(?:\s+(\d+))?(?:\s+(cascade|random|asymmetric|shock))?$', low)
-    if m:
-        rounds = int(m.group(1)) if m.group(1) else 10
-        scenario_word = m.group(2) or "asymmetric"
-        scenario_map = {"cascade":"cascade","random":"random_shock","shock":"random_shock","asymmetric":"asymmetric_failure"}
-        scenario = scenario_map.get(scenario_word, "asymmetric_failure")
-        tc = run_trust_council(scenario=scenario, rounds=rounds)
-        lines = [
-            f"◇ TRUST COUNCIL — {scenario}",
-            f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"  Rounds:      {tc['rounds']}",
-            f"  Survived:    {tc['survived']}",
-            f"  Final Trust: {tc['final_trust']:.4f}",
-            f"  Threshold:   {tc['threshold']}",
-            f"  σ:           {tc['sigma']}",
-            f"",
-            f"  VIRTUES:",
-        ]
-        last_round = tc['log'][-1] if tc['log'] else None
-        if last_round:
-            for v in last_round['members']:
-                bar = "█" * int(v['trust']*10) + "░" * (10-int(v['trust']*10))
-                above = "●" if v['trust'] >= T_STAR else "○"
-                lines.append(f"    {above} {v['virtue']:14s} [{bar}] trust={v['trust']:.4f}  resilience={v['resilience']:.4f}")
-        if len(tc['log']) > 1:
-            lines.append(f"")
-            lines.append(f"  TRUST TRAJECTORY (every {max(1,rounds//5)} rounds):")
-            step = max(1, rounds // 5)
-            for entry in tc['log'][::step]:
-                lines.append(f"    R{entry['round']:3d}:  trust={entry['avg_trust']:.4f}  alive={entry['alive']}/{entry['total']}")
-            if tc['log'][-1]['round'] % step != 0:
-                entry = tc['log'][-1]
-                lines.append(f"    R{entry['round']:3d}:  trust={entry['avg_trust']:.4f}  alive={entry['alive']}/{entry['total']}")
-        return _cmd_result("\n".join(lines), lattice)
-
-    # ── ENGINES ──
-    if low in ("engines","engine status","show engines","systems","sys"):
-        ls = lattice.state()
-        lines = [
-            f"◇ ENGINE STATUS",
-            f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
-            f"  ● Tri-Prime     ONLINE   26 letters → 27 states",
-            f"  ● 6-Scale       ONLINE   6 fractal scales",
-            f"  ● Lattice       ONLINE   {ls['alive']} units, tick {ls['tick']}",
-            f"  ● Trust Council ONLINE   5 virtues",
-            f"  {'●' if _semantics_loaded else '○'} Semantic Brain {'ONLINE   40+ domains' if _semantics_loaded else 'OFFLINE'}",
-            f"  {'●' if OLLAMA_AVAILABLE else '○'} Ollama         {'ONLINE   '+OLLAMA_MODEL if OLLAMA_AVAILABLE else 'OFFLINE'}",
-            f"  {'●' if API_KEY else '○'} Claude API     {'ONLINE' if API_KEY else 'OFFLINE'}",
-            f"",
-            f"  σ = {SIGMA}  |  T* = {T_STAR}",
-            f"  Uptime: {time.time()-BOOT_TIME:.0f}s",
-        ]
-        return _cmd_result("\n".join(lines), lattice)
-
-    # ── HISTORY / EVENT LOG ──
-    if low in ("history","events","log","genesis","event log","genesis log"):
-        ls = lattice.state()
-        events = ls.get('recent_events', [])
-        if events:
-            lines = [f"◇ GENESIS LOG (last {len(events)} events)",
-                     f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"]
-            for ev in events:
-                lines.append(f"  tick {ev['tick']:5d}  {ev['event']:16s}  {ev.get('name','?')}")
-        else:
-            lines = [f"◇ GENESIS LOG", f"  No events yet."]
-        return _cmd_result("\n".join(lines), lattice)
-
-    # ── No command matched → fall through to AI/semantic ──
-    return None
+    except ValueError as e:
+        return _cmd_result(f"Cannot birth: {e}", lattice)
+    ls = lattice.summary()
+    lines = [
+        f"◇ UNIT BORN",
+        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"  ID:         {unit['id']}",
+        f"  Name:       {unit['name']}",
+        f"  Shell:      {unit['shell']}",
+        f"  Health:     {unit['health']:.0%}",
+        f"  Coherence:  {unit['coherence']:.3f}",
+        f"  Tri-State:  {tri_glyph(unit['tri_state'])} [{tri_sym(unit['tri_state'])}]",
+        f"  Operator:   {unit['operator']} ({TIG_OPS[unit['operator']]})",
+        f"  Bonds:      {len(unit['bonds'])}",
+        f"",
+        f"  Lattice: {ls['alive']} alive, health {ls['avg_health']:.0%}, tick {ls['tick']}",
+    ]
+    return _cmd_result("\n".join(lines), lattice)
+
+def _cmd_step(lattice, low, raw, n):
+    n = int(n) if n else 1
+    n = min(n, MAX_STEP_BATCH)
+    before = lattice.summary()
+    logged_before = lattice.genesis_log.total
+    lattice.step(n)
+    after = lattice.state()
+    lines = [
+        f"◇ LATTICE +{n} TICK{'S' if n>1 else ''}",
+        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"  Tick:       {before['tick']} → {after['tick']}",
+        f"  Alive:      {after['alive']} / {after['total_units']}",
+        f"  Health:     {before['avg_health']:.2%} → {after['avg_health']:.2%}",
+        f"  Above T*:   {after['above_threshold']}",
+    ]
+    # Show events during run
+    new_events = lattice.genesis_log.recent(lattice.genesis_log.total - logged_before)
+    if new_events:
+        lines.append(f"")
+        lines.append(f"  EVENTS:")
+        for ev in new_events[-10:]:
+            lines.append(f"    tick {ev['tick']}: {ev['event']} — {ev['name']}")
+    # Show units
+    if after['units']:
+        lines.append(f"")
+        lines.append(f"  UNITS:")
+        for u in after['units'][:15]:
+            bar = "█" * int(u['health']*10) + "░" * (10-int(u['health']*10))
+            lines.append(f"    {u['name']:14s} [{bar}] {u['health']:.0%}  σ={u['coherence']:.3f}  op:{u['op_name']}  bonds:{u['bonds']}")
+    return _cmd_result("\n".join(lines), lattice)
+
+def _cmd_lattice(lattice, low, raw):
+    ls = lattice.state()
+    lines = [
+        f"◇ LATTICE STATE",
+        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"  Tick:       {ls['tick']}",
+        f"  Units:      {ls['alive']} alive / {ls['total_units']} total",
+        f"  Health:     {ls['avg_health']:.2%}",
+        f"  Coherence:  {ls['avg_coherence']:.3f}",
+        f"  Above T*:   {ls['above_threshold']}",
+        f"  Genesis:    {len(ls['recent_events'])} logged events",
+    ]
+    if ls['units']:
+        lines.append(f"")
+        lines.append(f"  {'NAME':14s}  {'HEALTH':10s}  {'σ':7s}  {'OP':12s}  {'TRI':4s}  {'BONDS':5s}")
+        lines.append(f"  {'─'*58}")
+        for u in ls['units'][:20]:
+            bar = "█" * int(u['health']*10) + "░" * (10-int(u['health']*10))
+            lines.append(f"  {u['name']:14s}  [{bar}]  {u['coherence']:.3f}  {u['op_name']:12s}  {u['tri_state']:4s}  {u['bonds']:5d}")
+    else:
+        lines.append(f"\n  No units. Type 'birth [name]' to create one.")
+    return _cmd_result("\n".join(lines), lattice)
+
+def _cmd_kill(lattice, low, raw, target):
+    idx = lattice.find(target)
+    if idx is not None:
+        lattice.collapse(idx)
+        ls = lattice.summary()
+        return _cmd_result(
+            f"◇ UNIT COLLAPSED: {lattice.unit(idx)['name']}\n"
+            f"  Lattice: {ls['alive']} alive, health {ls['avg_health']:.0%}",
+            lattice)
+    return _cmd_result(f"Unit '{target}' not found. Type 'lattice' to see units.", lattice)
+
+def _cmd_trust(lattice, low, raw, rounds, scenario):
+    rounds = int(rounds) if rounds else 10
+    scenario_word = scenario or "asymmetric"
+    scenario_map = {"cascade":"cascade","random":"random_shock","shock":"random_shock","asymmetric":"asymmetric_failure"}
+    scenario = scenario_map.get(scenario_word, "asymmetric_failure")
+    tc = run_trust_council(scenario=scenario, rounds=rounds)
+    lines = [
+        f"◇ TRUST COUNCIL — {scenario}",
+        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"  Rounds:      {tc['rounds']}",
+        f"  Survived:    {tc['survived']}",
+        f"  Final Trust: {tc['final_trust']:.4f}",
+        f"  Threshold:   {tc['threshold']}",
+        f"  σ:           {tc['sigma']}",
+        f"",
+        f"  VIRTUES:",
+    ]
+    last_round = tc['log'][-1] if tc['log'] else None
+    if last_round:
+        for v in last_round['members']:
+            bar = "█" * int(v['trust']*10) + "░" * (10-int(v['trust']*10))
+            above = "●" if v['trust'] >= T_STAR else "○"
+            lines.append(f"    {above} {v['virtue']:14s} [{bar}] trust={v['trust']:.4f}  resilience={v['resilience']:.4f}")
+    if len(tc['log']) > 1:
+        lines.append(f"")
+        lines.append(f"  TRUST TRAJECTORY (every {max(1,rounds//5)} rounds):")
+        step = max(1, rounds // 5)
+        for entry in tc['log'][::step]:
+            lines.append(f"    R{entry['round']:3d}:  trust={entry['avg_trust']:.4f}  alive={entry['alive']}/{entry['total']}")
+        if tc['log'][-1]['round'] % step != 0:
+            entry = tc['log'][-1]
+            lines.append(f"    R{entry['round']:3d}:  trust={entry['avg_trust']:.4f}  alive={entry['alive']}/{entry['total']}")
+    return _cmd_result("\n".join(lines), lattice)
+
+def _cmd_engines(lattice, low, raw):
+    ls = lattice.summary()
+    _semantics()
+    _probe_ollama()
+    lines = [
+        f"◇ ENGINE STATUS",
+        f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━",
+        f"  ● Tri-Prime     ONLINE   26 letters → 27 states",
+        f"  ● 6-Scale       ONLINE   6 fractal scales",
+        f"  ● Lattice       ONLINE   {ls['alive']} units, tick {ls['tick']}",
+        f"  ● Trust Council ONLINE   5 virtues",
+        f"  {'●' if _semantics_loaded else '○'} Semantic Brain {'ONLINE   40+ domains' if _semantics_loaded else 'OFFLINE'}",
+        f"  {'●' if OLLAMA_AVAILABLE else '○'} Ollama         {'ONLINE   '+OLLAMA_MODEL if OLLAMA_AVAILABLE else 'OFFLINE'}",
+        f"  {'●' if API_KEY else '○'} Claude API     {'ONLINE' if API_KEY else 'OFFLINE'}",
+        f"",
+        f"  σ = {SIGMA}  |  T* = {T_STAR}",
+        f"  Uptime: {time.time()-BOOT_TIME:.0f}s",
+    ]
+    return _cmd_result("\n".join(lines), lattice)
+
+def _cmd_history(lattice, low, raw):
+    ls = lattice.state()
+    events = ls.get('recent_events', [])
+    if events:
+        lines = [f"◇ GENESIS LOG (last {len(events)} events)",
+                 f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"]
+        for ev in events:
+            lines.append(f"  tick {ev['tick']:5d}  {ev['event']:16s}  {ev.get('name','?')}")
+    else:
+        lines = [f"◇ GENESIS LOG", f"  No events yet."]
+    return _cmd_result("\n".join(lines), lattice)
+
+
+# (name, handler, exact phrases, pattern, static) in precedence order:
+# the first row whose phrase or pattern matches the lowercased text wins.
+# Patterns are matched against the whole text. `static` marks replies that
+# depend only on the text, which _route_command keeps in COMMAND_CACHE.
+COMMANDS = (
+    ("help",      _cmd_help,     ("help","commands","what can you do","?"), None, True),
+    ("analyze",   _cmd_analyze_word, (), r'(?:analyze|decode|triprime|tri-prime|tri prime|read)\s+(?P<word>[a-zA-Z]+)', True),
+    ("sentence",  _cmd_analyze_sentence, (), r'(?:analyze|decode|read|parse)[\s:]+(?P<text>.{5,})', True),
+    ("letter",    _cmd_letter,   (), r'(?:letter|char)\s+(?P<ch>[a-zA-Z])', True),
+    ("batch",     _cmd_batch,    (), r'batch[\s:]+(?P<words>.+)', True),
+    ("compare",   _cmd_compare,  (), r'compare\s+(?P<a>[a-zA-Z]+)\s+(?:and|vs|to|with|&|\+)\s+(?P<b>[a-zA-Z]+)', True),
+    ("chart",     _cmd_chart,    ("chart","alphabet","show chart","letters","all letters","show letters"), None, True),
+    ("cube",      _cmd_cube,     ("cube","27 states","show cube","all states","states","27"), None, True),
+    ("parse",     _cmd_parse,    (), r'parse[\s:]+(?P<text>.+)', True),
+    ("birth",     _cmd_birth,    (), r'(?:birth|create|spawn|new unit|add unit)(?:\s+(?P<name>\w+))?(?:\s+(?:shell\s*)?(?P<shell>\d+))?', False),
+    ("step",      _cmd_step,     (), r'(?:step|tick|advance|run)(?:\s+(?P<n>\d+))?(?:\s*(?:ticks?|steps?))?', False),
+    ("lattice",   _cmd_lattice,  ("lattice","lattice status","show lattice","status","units","state","ls"), None, False),
+    ("kill",      _cmd_kill,     (), r'(?:kill|collapse|remove)\s+(?P<target>\w+)', False),
+    ("trust",     _cmd_trust,    (), r'(?:trust|council|trust council|run trust)(?:\s+(?P<rounds>\d+))?(?:\s+(?P<scenario>cascade|random|asymmetric|shock))?', False),
+    ("engines",   _cmd_engines,  ("engines","engine status","show engines","systems","sys"), None, False),
+    ("history",   _cmd_history,  ("history","events","log","genesis","event log","genesis log"), None, False),
+)
+
+def _compile_commands(table):
+    """Build the router from COMMANDS: an exact-phrase dict and one
+    alternation of every pattern, each wrapped in a group named after its
+    row so `m.lastgroup` names the command. A phrase that an earlier row's
+    pattern would also match is left to the regex to keep precedence."""
+    exact, alts, groups = {}, [], {}
+    for i, (name, handler, phrases, pattern, static) in enumerate(table):
+        spec = (name, handler, static)
+        if pattern:
+            local = re.findall(r'\(\?P<(\w+)>', pattern)
+            groups[f"c{i}"] = (spec, [(g, f"c{i}_{g}") for g in local])
+            renamed = re.sub(r'\(\?P<(\w+)>', lambda g: f"(?P<c{i}_{g.group(1)}>", pattern)
+            alts.append(f"(?P<c{i}>{renamed}$)")
+        for p in phrases:
+            earlier = [pat for _, _, _, pat, _ in table[:i] if pat]
+            if p not in exact and not any(re.match(pat + "$", p) for pat in earlier):
+                exact[p] = (spec, ())
+    return exact, re.compile("|".join(alts)), groups
+
+_CMD_EXACT, _CMD_RE, _CMD_GROUPS = _compile_commands(COMMANDS)
+
+def _match_command(low):
+    """(name, handler, static) and keyword args for `low`, or None."""
+    hit = _CMD_EXACT.get(low)
+    if hit is not None:
+        return hit[0], {}
+    m = _CMD_RE.match(low)
+    if m is None:
+        return None
+    spec, names = _CMD_GROUPS[m.lastgroup]
+    return spec, {g: m.group(full) for g, full in names}
 
 
-def ollie_respond(user_input, lattice, api_key=None):
-    """Ollie v4: command router + AI brain + geometric parse."""
-    global CHAT_HISTORY
+def _route_command(text, lattice):
+    """Check if text is a system command. Returns response dict or None."""
+    raw = text.strip()
 
-    # ── 0. CHECK FOR ENGINE COMMANDS ──
-    cmd = _route_command(user_input, lattice)
-    if cmd is not None:
-        return cmd
+    # Text-only commands are answered from COMMAND_CACHE; only the lattice
+    # health is recomputed. Free text is not cached, so chat cannot evict
+    # real commands, and callers always get their own dict.
+    hit = COMMAND_CACHE.get(raw)
+    if hit is not None:
+        return dict(hit, lattice_health=lattice.summary()["avg_health"])
 
-    # ── 1. Geometric parse ──
-    tri = tri_sentence(user_input)
-    scales = parse_6scale(user_input)
-    words_raw = re.findall(r'[A-Za-z]+', user_input)
-    words = [tri_word(w) for w in words_raw] if words_raw else []
-    ls = lattice.state()
+    low = raw.lower()
+    found = _match_command(low)
+    if found is None:
+        return None
+    (name, handler, static), kw = found
+    res = handler(lattice, low, raw, **kw)
+    if static and res:
+        COMMAND_CACHE.put(raw, res)
+        return dict(res)
+    return res
+
+
+def _geometric_reading(user_input, lattice):
+    """Parse a chat message and build the [GEOMETRIC READING] block."""
+    parsed = PARSE_CACHE.get(user_input)
+    if parsed is None:
+        with trace_span("tri_decode"):
+            words_raw = re.findall(r'[A-Za-z]+', user_input)
+            tri = tri_sentence(user_input)
+            words = [tri_word(w) for w in words_raw] if words_raw else []
+        with trace_span("parse_6scale"):
+            scales = parse_6scale(user_input)
+        parsed = (tri, scales, words)
+        PARSE_CACHE.put(user_input, parsed)
+    tri, scales, words = parsed
+    with trace_span("lattice"):
+        ls = lattice.summary()
     op_name = TIG_OPS[scales["scales"]["operator"]]
 
-    # ── 2. Build context block ──
     geo = (
         f"[GEOMETRIC READING]\n"
         f"Input: {tri['glyph']} [{tri['sym']}] — {tri['desc']}\n"
@@ -1010,46 +2985,116 @@ def ollie_respond(user_input, lattice, api_key=None):
         geo += "Words: " + " | ".join(
             f"{w['word']}={w['glyph']}({w['sym']})" for w in words[:8]
         ) + "\n"
+    return {"tri": tri, "scales": scales, "words": words, "ls": ls,
+            "op_name": op_name, "geo": geo}
 
-    # ── 3. Response cascade: Claude API → Ollama → Semantic → Geometry ──
+
+@traced("chat")
+def ollie_respond(user_input, lattice, api_key=None, session=DEFAULT_SESSION):
+    """Ollie v4: command router + AI brain + geometric parse."""
+    _probe_ollama()  # background refresh if the cached result is stale
+
+    # ── 0. CHECK FOR ENGINE COMMANDS ──
+    with trace_span("route"):
+        cmd = _route_command(user_input, lattice)
+    if cmd is not None:
+        return cmd
+
+    # ── 1–2. Geometric parse + context block ──
+    g = _geometric_reading(user_input, lattice)
+    tri, scales, words, ls, op_name = g["tri"], g["scales"], g["words"], g["ls"], g["op_name"]
+
+    # ── 3. Response cascade: AI backends (hedged) → Semantic → Geometry ──
     response = None
     mode = "geometry"
 
-    # Prepare message for AI backends
-    ai_msg = f"{geo}\n[MESSAGE]\n{user_input}"
-    need_ai = api_key or OLLAMA_AVAILABLE
-    if need_ai:
-        CHAT_HISTORY.append({"role": "user", "content": ai_msg})
-        if len(CHAT_HISTORY) > MAX_HISTORY:
-            CHAT_HISTORY = CHAT_HISTORY[-MAX_HISTORY:]
+    # Backends see the session so far plus this turn; the pair is only
+    # recorded once a backend has answered it
+    user_msg = {"role": "user", "content": f"{g['geo']}\n[MESSAGE]\n{user_input}"}
+    if api_key or OLLAMA_AVAILABLE:
+        messages = (CHAT_HISTORY.get(session) + [user_msg])[-MAX_HISTORY:]
+        with trace_span("backend"):
+            response, mode = BACKENDS.call(messages, api_key)
+
+    if response is None:
+        with trace_span("fallback"):
+            response = _geometry_only(user_input, tri, scales, words, ls, session)
+        mode = "semantic" if _semantics_loaded else "geometry"
+    else:
+        CHAT_HISTORY.extend(session, user_msg, {"role": "assistant", "content": response})
+
+    return {
+        "response": response,
+        "tri_prime": tri,
+        "scales": scales,
+        "lattice_health": ls["avg_health"],
+        "operator": op_name,
+        "mode": mode,
+    }
+
+
+@traced("chat_stream")
+def ollie_stream(user_input, lattice, api_key=None, session=DEFAULT_SESSION):
+    """Streaming ollie_respond: yields (event, data) pairs as they are ready.
 
+    "reading" (the geometric parse) always comes first, then "token" events
+    carrying text pieces as the backend produces them, then "done" with the
+    same dict ollie_respond would have returned. A backend that fails before
+    its first token falls through the cascade; one that fails mid-stream
+    ends the reply with what already arrived.
+    """
+    _probe_ollama()
+
+    with trace_span("route"):
+        cmd = _route_command(user_input, lattice)
+    if cmd is not None:
+        yield "reading", {k: cmd[k] for k in ("tri_prime", "scales", "lattice_health", "operator")}
+        yield "token", {"text": cmd["response"]}
+        yield "done", cmd
+        return
+
+    g = _geometric_reading(user_input, lattice)
+    tri, scales, words, ls, op_name = g["tri"], g["scales"], g["words"], g["ls"], g["op_name"]
+    yield "reading", {"tri_prime": tri, "scales": scales,
+                      "lattice_health": ls["avg_health"], "operator": op_name,
+                      "geo": g["geo"]}
+
+    user_msg = {"role": "user", "content": f"{g['geo']}\n[MESSAGE]\n{user_input}"}
+    messages = (CHAT_HISTORY.get(session) + [user_msg])[-MAX_HISTORY:]
+    backends = []
     if api_key:
-        ai = _call_claude(CHAT_HISTORY, api_key)
-        if ai:
-            CHAT_HISTORY.append({"role": "assistant", "content": ai})
-            response = ai
-            mode = "ai"
-
-    if response is None and OLLAMA_AVAILABLE:
-        if not need_ai:
-            # Edge case: Ollama detected after boot without API key
-            CHAT_HISTORY.append({"role": "user", "content": ai_msg})
-            if len(CHAT_HISTORY) > MAX_HISTORY:
-                CHAT_HISTORY = CHAT_HISTORY[-MAX_HISTORY:]
-        ollama_resp = _call_ollama(CHAT_HISTORY)
-        if ollama_resp:
-            CHAT_HISTORY.append({"role": "assistant", "content": ollama_resp})
-            response = ollama_resp
-            mode = "ollama"
+        backends.append(("ai", lambda: _stream_claude(messages, api_key)))
+    if OLLAMA_AVAILABLE:
+        backends.append(("ollama", lambda: _stream_ollama(messages)))
+
+    # Streams are not hedged (tokens already sent can't be taken back), but
+    # they follow the orchestrator's health order and feed its statistics
+    response, mode = None, None
+    for name, start in BACKENDS.order(backends):
+        if not BACKENDS.begin(name):
+            continue
+        pieces = []
+        t0 = time.perf_counter()
+        try:
+            with trace_span("backend"):
+                for piece in start():
+                    pieces.append(piece)
+                    yield "token", {"text": piece}
+        except Exception as e:
+            print(f"  [Ollie] {name} stream error: {e}")
+        BACKENDS.record(name, time.perf_counter() - t0, bool(pieces))
+        if pieces:
+            response, mode = "".join(pieces), name
+            CHAT_HISTORY.extend(session, user_msg, {"role": "assistant", "content": response})
+            break
 
     if response is None:
-        # Pop the unanswered user message if AI failed
-        if need_ai and CHAT_HISTORY and CHAT_HISTORY[-1]["role"] == "user":
-            CHAT_HISTORY.pop()
-        response = _geometry_only(user_input, tri, scales, words, ls)
+        with trace_span("fallback"):
+            response = _geometry_only(user_input, tri, scales, words, ls, session)
         mode = "semantic" if _semantics_loaded else "geometry"
+        yield "token", {"text": response}
 
-    return {
+    yield "done", {
         "response": response,
         "tri_prime": tri,
         "scales": scales,
@@ -1073,47 +3118,90 @@ def _detect_ollama():
     """Check if Ollama is running and find a model."""
     global OLLAMA_AVAILABLE, OLLAMA_MODEL
     try:
-        import urllib.request
-        # Simple GET — no explicit method kwarg for max compat
-        with urllib.request.urlopen(f"{OLLAMA_URL}/api/tags", timeout=5) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-            models = [m["name"] for m in data.get("models", [])]
-            if models:
-                OLLAMA_AVAILABLE = True
+        data = HTTP_POOL.get_json(f"{OLLAMA_URL}/api/tags", timeout=BACKEND_TIMEOUTS["probe"])
+        models = [m["name"] for m in data.get("models", [])]
+        if models:
+            OLLAMA_AVAILABLE = True
+            if not OLLAMA_MODEL:
+                prefs = ["llama3","mistral","qwen","gemma","phi","deepseek","mixtral"]
+                for pref in prefs:
+                    match = [m for m in models if pref in m.lower()]
+                    if match:
+                        OLLAMA_MODEL = match[0]
+                        break
                 if not OLLAMA_MODEL:
-                    prefs = ["llama3","mistral","qwen","gemma","phi","deepseek","mixtral"]
-                    for pref in prefs:
-                        match = [m for m in models if pref in m.lower()]
-                        if match:
-                            OLLAMA_MODEL = match[0]
-                            break
-                    if not OLLAMA_MODEL:
-                        OLLAMA_MODEL = models[0]
-                elif OLLAMA_MODEL not in models:
-                    # User-specified model not found, pick best available
-                    print(f"  ⚠ Model '{OLLAMA_MODEL}' not found, available: {models}")
                     OLLAMA_MODEL = models[0]
-                print(f"  ◉ Ollama detected: {OLLAMA_MODEL} ({len(models)} models)")
-            else:
-                print(f"  ◎ Ollama running but no models pulled")
+            elif OLLAMA_MODEL not in models:
+                # User-specified model not found, pick best available
+                print(f"  ⚠ Model '{OLLAMA_MODEL}' not found, available: {models}")
+                OLLAMA_MODEL = models[0]
+            print(f"  ◉ Ollama detected: {OLLAMA_MODEL} ({len(models)} models)")
+        else:
+            OLLAMA_AVAILABLE = False
+            print(f"  ◎ Ollama running but no models pulled")
     except Exception as e:
+        OLLAMA_AVAILABLE = False
         print(f"  ◎ No Ollama at {OLLAMA_URL} ({e})")
-
-_detect_ollama()
-LATTICE = Lattice()
-# Seed lattice with 10 initial units
-random.seed(7714)
-for i in range(10):
-    LATTICE.birth(name=f"seed_{i:02d}", shell=5 + (i % 4))
+    _ollama_probe["at"] = time.time()
+
+OLLAMA_PROBE_TTL = float(os.environ.get("OLLAMA_PROBE_TTL", "60"))  # seconds
+OLLAMA_CONFIG_WAIT_S = 1.0  # /api/config answers after this even if the probe is still going
+_ollama_probe = {"at": 0.0, "thread": None}
+_probe_lock = threading.Lock()
+
+def _probe_ollama(force=False):
+    """Refresh Ollama detection in a background thread once the cached
+    result is older than OLLAMA_PROBE_TTL. Never blocks the caller."""
+    with _probe_lock:
+        th = _ollama_probe["thread"]
+        if th is not None and th.is_alive():
+            return th
+        if not force and time.time() - _ollama_probe["at"] < OLLAMA_PROBE_TTL:
+            return None
+        _ollama_probe["at"] = time.time()
+        th = threading.Thread(target=_detect_ollama, name="ollama-probe", daemon=True)
+        _ollama_probe["thread"] = th
+        th.start()
+        return th
+
+# The seed lattice is built on first use — see get_lattice()
+_LATTICE = None
+_lattice_lock = threading.Lock()
+
+def _seed_lattice(lat):
+    """The 10 initial units every fresh lattice starts with."""
+    for i in range(10):
+        lat.birth(name=f"seed_{i:02d}", shell=5 + (i % 4))
+    return lat
+
+def get_lattice():
+    """The process-wide lattice, created (or mapped from LATTICE_PATH) on first call."""
+    global _LATTICE
+    if _LATTICE is None:
+        with _lattice_lock:
+            if _LATTICE is None:
+                # Own RNG so building the seed lattice doesn't reseed the global one
+                lat = Lattice(path=LATTICE_PATH or None, rng=random.Random(7714))
+                if len(lat) == 0:
+                    _seed_lattice(lat)
+                elif lat.path:
+                    print(f"  ◉ Lattice mapped: {len(lat)} units, tick {lat.tick} ({lat.path})")
+                _LATTICE = lat
+    return _LATTICE
+
+def __getattr__(name):
+    # Keep `CRYSTAL_BUG.LATTICE` working for importers without building it at import time
+    if name == "LATTICE":
+        return get_lattice()
+    if name == "app":
+        return _external_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def create_app():
     try:
-        from flask import Flask, request, jsonify, send_from_directory
+        from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
     except ImportError:
-        print("  Installing Flask...")
-        os.system(f"{sys.executable} -m pip install flask -q --break-system-packages 2>/dev/null || "
-                  f"{sys.executable} -m pip install flask -q")
-        from flask import Flask, request, jsonify, send_from_directory
+        raise SystemExit("  Flask is required: pip install flask")
 
     app = Flask(__name__, static_folder=None)
 
@@ -1121,7 +3209,7 @@ def create_app():
     @app.after_request
     def cors(resp):
         resp.headers["Access-Control-Allow-Origin"] = "*"
-        resp.headers["Access-Control-Allow-Headers"] = "Content-Type"
+        resp.headers["Access-Control-Allow-Headers"] = "Content-Type, X-Session-Id"
         resp.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS"
         return resp
 
@@ -1132,11 +3220,18 @@ def create_app():
         wrapper.__name__ = fn.__name__
         return wrapper
 
+    def overloaded(e):
+        resp = jsonify({"error": str(e), "retry_after": e.retry_after})
+        resp.headers["Retry-After"] = str(e.retry_after)
+        return resp, 503
+
     # ── STATUS ──
     @app.route("/api/status")
     @safe
     def status():
-        ls = LATTICE.state()
+        ls = get_lattice().summary()
+        _semantics()
+        _probe_ollama()
         return jsonify({
             "name": "Crystal Bug v1.0",
             "status": "online",
@@ -1161,6 +3256,11 @@ def create_app():
             },
             "sigma": SIGMA,
             "threshold": T_STAR,
+            "cache": cache_stats(),
+            "backends": BACKENDS.snapshot(),
+            "chat_lane": CHAT_LANE.snapshot(),
+            "semantic_memory": {"sessions": len(CONV_STORE), "shared_dir": CONV_STORE.path,
+                                **CONV_STORE.stats},
         })
 
     # ── TRI-PRIME ──
@@ -1182,10 +3282,26 @@ def create_app():
         text = request.json.get("text","")
         return jsonify(tri_sentence(text))
 
+    static_bodies = {}
+
+    def static_json(name, build):
+        """A JSON body that never changes while the process runs: encoded
+        once, served with an ETag, 304 when If-None-Match already has it."""
+        if name not in static_bodies:
+            body = jsonify(build()).get_data()
+            static_bodies[name] = (body, hashlib.sha1(body).hexdigest()[:20])
+        body, tag = static_bodies[name]
+        resp = Response(body, mimetype="application/json")
+        resp.set_etag(tag)
+        resp.headers["Cache-Control"] = "public, max-age=300"
+        resp = resp.make_conditional(request)
+        _static_hit(resp.status_code == 304)
+        return resp
+
     @app.route("/api/tri/chart")
     @safe
     def api_tri_chart():
-        return jsonify(tri_chart())
+        return static_json("chart", tri_chart)
 
     @app.route("/api/tri/batch", methods=["POST"])
     @safe
@@ -1197,20 +3313,7 @@ def create_app():
     @safe
     def api_tri_cube():
         """Return the full 27-state cube."""
-        cube = []
-        for a in [B,D,C]:
-            for b in [B,D,C]:
-                for c in [B,D,C]:
-                    t = (a,b,c)
-                    tig = _to_tig(t)
-                    # Which letters map here?
-                    letters_here = [ch for ch,lt in LETTERS.items() if lt==t]
-                    cube.append({
-                        "triple":t,"sym":tri_sym(t),"glyph":tri_glyph(t),
-                        "desc":DESC_27[t],"tig_op":tig,"tig_name":TIG_OPS[tig],
-                        "letters":letters_here,
-                    })
-        return jsonify(cube)
+        return static_json("cube", tri_cube)
 
     # ── 6-SCALE PARSER ──
     @app.route("/api/parse", methods=["POST"])
@@ -1220,6 +3323,11 @@ def create_app():
         return jsonify(parse_6scale(text))
 
     # ── CHAT (OLLIE) ──
+    def session_id():
+        """Chat session: JSON "session", else the X-Session-Id header, else the shared default."""
+        sid = (request.get_json(silent=True) or {}).get("session") or request.headers.get("X-Session-Id")
+        return str(sid)[:128] if sid else DEFAULT_SESSION
+
     @app.route("/api/chat", methods=["POST"])
     @safe
     def api_chat():
@@ -1227,7 +3335,47 @@ def create_app():
         text = request.json.get("text","")
         # Allow API key to be set via request (for UI config)
         key = request.json.get("api_key") or API_KEY
-        return jsonify(ollie_respond(text, LATTICE, api_key=key))
+        args = (text, get_lattice())
+        kw = {"api_key": key, "session": session_id()}
+        if not _backend_bound(text, key):
+            return jsonify(ollie_respond(*args, **kw))
+        try:
+            return jsonify(CHAT_LANE.run(ollie_respond, *args, **kw))
+        except LaneFull as e:
+            return overloaded(e)
+
+    @app.route("/api/chat/stream", methods=["POST"])
+    @safe
+    def api_chat_stream():
+        """Server-Sent Events: reading → token… → done (see ollie_stream)."""
+        text = request.json.get("text","")
+        key = request.json.get("api_key") or API_KEY
+        lattice = get_lattice()
+        session = session_id()
+
+        def events():
+            try:
+                for event, data in ollie_stream(text, lattice, api_key=key, session=session):
+                    yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+        release = None
+        if _backend_bound(text, key):
+            try:
+                release = CHAT_LANE.hold()
+            except LaneFull as e:
+                return overloaded(e)
+        try:
+            resp = Response(stream_with_context(events()), mimetype="text/event-stream",
+                            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        except Exception:
+            if release is not None:
+                release()
+            raise
+        if release is not None:
+            resp.call_on_close(release)
+        return resp
 
     # ── SET CONFIG (API KEY / OLLAMA) ──
     @app.route("/api/config", methods=["POST"])
@@ -1248,9 +3396,14 @@ def create_app():
             OLLAMA_URL = new_url
         if new_model:
             OLLAMA_MODEL = new_model
-        # Re-detect whenever any Ollama config changes
+        # Re-detect whenever any Ollama config changes: fresh breaker, and the
+        # probe runs in the background — wait for it only briefly
         if new_url or new_model:
-            _detect_ollama()
+            BACKENDS.breakers["ollama"].reset()
+            th = _probe_ollama(force=True)
+            if th is not None:
+                th.join(OLLAMA_CONFIG_WAIT_S)
+        _semantics()
 
         # Determine active mode
         if API_KEY:
@@ -1276,31 +3429,35 @@ def create_app():
     @app.route("/api/chat/clear", methods=["POST"])
     @safe
     def api_chat_clear():
-        global CHAT_HISTORY
-        CHAT_HISTORY = []
+        CHAT_HISTORY.clear(session_id())
+        CONV_STORE.clear(session_id())
         return jsonify({"status": "ok", "message": "Chat history cleared."})
 
     # ── LATTICE ──
     @app.route("/api/lattice")
     @safe
     def api_lattice():
-        return jsonify(LATTICE.state())
+        return jsonify(get_lattice().state())
 
     @app.route("/api/lattice/birth", methods=["POST"])
     @safe
     def api_birth():
         name = request.json.get("name", None)
         shell = request.json.get("shell", 5)
-        unit = LATTICE.birth(name=name, shell=min(9, max(1, shell)))
-        return jsonify({"born": unit, "lattice": LATTICE.state()})
+        lattice = get_lattice()
+        try:
+            unit = lattice.birth(name=name, shell=min(9, max(1, shell)))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"born": unit, "lattice": lattice.state()})
 
     @app.route("/api/lattice/step", methods=["POST"])
     @safe
     def api_step():
-        steps = min(100, request.json.get("steps", 1))
-        for _ in range(steps):
-            LATTICE.step()
-        return jsonify(LATTICE.state())
+        steps = max(0, min(MAX_STEP_BATCH, int(request.json.get("steps", 1))))
+        lattice = get_lattice()
+        lattice.step(steps)
+        return jsonify(lattice.state())
 
     # ── TRUST COUNCIL ──
     @app.route("/api/trust", methods=["POST"])
@@ -1310,6 +3467,44 @@ def create_app():
         rounds = min(100, request.json.get("rounds", 10))
         return jsonify(run_trust_council(scenario=scenario, rounds=rounds))
 
+    @app.route("/api/trust/sweep", methods=["POST"])
+    @safe
+    def api_trust_sweep():
+        data = request.json or {}
+        scenarios = [s for s in data.get("scenarios", TRUST_SCENARIOS) if s in TRUST_SCENARIOS]
+        scenarios = scenarios or list(TRUST_SCENARIOS)
+        rounds = [max(1, min(10000, int(r))) for r in data.get("rounds", [10, 25, 50, 100])][:32] or [10]
+        sizes = [max(1, min(64, int(z))) for z in data.get("sizes", [3, 5, 7, 9])][:32] or [5]
+        trials = max(1, min(4096, int(data.get("trials", 256))))
+        seed = data.get("seed", 7714)
+        if isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+            return jsonify({"error": "seed must be a non-negative integer"}), 400
+        # The per-parameter limits still multiply out to far more than one
+        # request should run, so the whole grid gets a budget
+        members, work = trust_sweep_cost(scenarios, rounds, sizes, trials)
+        if members > TRUST_SWEEP_MEMBERS or work > TRUST_SWEEP_BUDGET:
+            return jsonify({"error": f"sweep too large: {members} member slots × {max(rounds)} rounds "
+                                     f"(limits {TRUST_SWEEP_MEMBERS} slots, {TRUST_SWEEP_BUDGET} member-rounds); "
+                                     f"use fewer trials, sizes or rounds"}), 400
+        return jsonify(trust_sweep(scenarios, rounds, sizes, trials=trials, seed=seed))
+
+    # ── DEBUG: CHAT TRACES ──
+    @app.route("/api/debug/traces", methods=["GET", "POST"])
+    @safe
+    def api_traces():
+        """GET: stage percentiles + the last `limit` traces.
+        POST {"sample": 0..1, "clear": bool}: change the sampling rate / empty the ring."""
+        if request.method == "POST":
+            data = request.json or {}
+            if "sample" in data:
+                TRACER.sample = max(0.0, min(1.0, float(data["sample"])))
+            if data.get("clear"):
+                TRACER.clear()
+        limit = max(0, min(TRACE_RING, int(request.args.get("limit", 20))))
+        return jsonify({"sample": TRACER.sample, "sampled": TRACER.sampled,
+                        "kept": len(TRACER.ring), "stages": TRACER.stats(),
+                        "recent": TRACER.recent(limit)})
+
     # ── STATIC FILES ──
     ui_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ui")
 
@@ -1324,11 +3519,285 @@ def create_app():
     return app
 
 
+# ══════════════════════════════════════════════════════════════════════
+# ██  PRODUCTION SERVER — pre-fork workers, bounded threads, clean stop
+# ══════════════════════════════════════════════════════════════════════
+#
+#   python CRYSTAL_BUG.py --serve [port]      builtin pre-fork server
+#   gunicorn -k gthread --preload CRYSTAL_BUG:app   same app under gunicorn
+#
+# The parent imports everything, builds the read-only tables (tri-prime
+# chart and cube, compiled router, semantic lexicons) and seeds the lattice
+# store, then forks. Workers share those pages copy-on-write and open the
+# lattice store themselves, since flock locks are per open file and must
+# not be inherited. With more than one worker the lattice must live in a
+# store (LATTICE_PATH), and the semantic brain's per-session memory in a
+# directory (CONV_MEMORY_DIR); temporary ones are created if unset.
+#
+# `CRYSTAL_BUG:app` runs the same warmup when an outside server resolves it.
+# That server's worker count is not visible from here, so the shared stores
+# are always set up on that path; --preload is what makes the parent's
+# stores the workers' stores.
+
+SERVE_WORKERS = int(os.environ.get("CRYSTAL_WORKERS", str(os.cpu_count() or 1)))
+SERVE_THREADS = int(os.environ.get("CRYSTAL_THREADS", "12"))    # requests in flight per worker
+SERVE_BACKLOG = int(os.environ.get("CRYSTAL_BACKLOG", "256"))   # queued connections, all workers
+SERVE_GRACE = float(os.environ.get("CRYSTAL_SHUTDOWN_GRACE", "10"))  # seconds to drain on stop
+SERVER_KIND = os.environ.get("CRYSTAL_SERVER", "auto")  # auto | gunicorn | builtin
+
+_APP = None
+
+def get_app():
+    """The process-wide Flask app, no pre-fork setup (see _external_app)."""
+    global _APP
+    if _APP is None:
+        _APP = create_app()
+    return _APP
+
+def _external_app():
+    """What `CRYSTAL_BUG:app` resolves to: the app after the pre-fork warmup,
+    with the shared lattice store and memory directory set up as for any
+    multi-worker serve()."""
+    if _APP is None:
+        _prefork_warmup(max(2, SERVE_WORKERS))
+    return _APP
+
+def _shared_tempdir(kind):
+    """A crystal-<kind>-<pid>-* temp dir for the workers to share. It is
+    removed when this process exits; ones left behind by a parent that was
+    killed outright are swept here on the next start."""
+    import atexit, shutil, tempfile
+    root = tempfile.gettempdir()
+    for fn in os.listdir(root):
+        m = re.match(rf"crystal-{kind}-(\d+)-", fn)
+        if not m:
+            continue
+        try:
+            os.kill(int(m.group(1)), 0)
+            continue                # its server is still running
+        except ProcessLookupError:
+            shutil.rmtree(os.path.join(root, fn), ignore_errors=True)
+        except OSError:
+            continue                # someone else's process
+    owner = os.getpid()
+    path = tempfile.mkdtemp(prefix=f"crystal-{kind}-{owner}-")
+    def remove():
+        if os.getpid() == owner:    # not in forked workers that run atexit
+            shutil.rmtree(path, ignore_errors=True)
+    atexit.register(remove)
+    return path
+
+def _prefork_warmup(workers):
+    """Work done once in the parent so every worker inherits it."""
+    global LATTICE_PATH, _LATTICE
+    if workers > 1 and not LATTICE_PATH:
+        LATTICE_PATH = _shared_tempdir("lattice")
+        print(f"  ◎ LATTICE_PATH not set — workers share {LATTICE_PATH}")
+    if workers > 1 and not CONV_STORE.path:
+        CONV_STORE.set_path(_shared_tempdir("memory"))
+        print(f"  ◎ CONV_MEMORY_DIR not set — workers share {CONV_STORE.path}")
+    lat = get_lattice()             # seeds an empty store exactly once
+    if lat.path:
+        lat.close()
+        _LATTICE = None             # each worker maps its own
+    _semantics()
+    app = get_app()
+    client = app.test_client()
+    for path in ("/api/tri/chart", "/api/tri/cube"):
+        client.get(path)            # encode the static bodies before the fork
+    HTTP_POOL.close()               # sockets must not be shared across workers
+    import gc
+    gc.collect()
+    gc.freeze()                     # keep GC passes from dirtying shared pages
+    return app
+
+def _make_worker_server(sock, app, threads):
+    """wsgiref server on an inherited listening socket, at most `threads`
+    requests at a time; the rest wait in the shared kernel backlog, where
+    an idle worker can take them."""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIServer, WSGIRequestHandler
+
+    class Handler(WSGIRequestHandler):
+        def log_message(self, *a):
+            pass
+
+    class Server(ThreadingMixIn, WSGIServer):
+        daemon_threads = False
+        block_on_close = True       # server_close() waits for requests in flight
+
+        def __init__(self):
+            WSGIServer.__init__(self, sock.getsockname(), Handler, bind_and_activate=False)
+            self.socket.close()
+            self.socket = sock
+            host, port = sock.getsockname()[:2]
+            self.server_name, self.server_port = host, port
+            self.setup_environ()
+            self.set_app(app)
+            self._slots = threading.BoundedSemaphore(threads)
+
+        def process_request(self, request, client_address):
+            self._slots.acquire()
+            try:
+                super().process_request(request, client_address)
+            except Exception:
+                self._slots.release()
+                raise
+
+        def process_request_thread(self, request, client_address):
+            try:
+                super().process_request_thread(request, client_address)
+            finally:
+                self._slots.release()
+
+    return Server()
+
+def _worker_main(sock, app, threads):
+    import signal
+    srv = _make_worker_server(sock, app, threads)
+    stop = lambda *a: threading.Thread(target=srv.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent turns ^C into SIGTERM
+    try:
+        srv.serve_forever(poll_interval=0.2)
+    finally:
+        srv.server_close()          # drains in-flight requests
+        if _LATTICE is not None:
+            _LATTICE.close()
+        HTTP_POOL.close()
+
+def serve_builtin(host="0.0.0.0", port=8080, workers=SERVE_WORKERS, threads=SERVE_THREADS,
+                  ready=None):
+    """Stdlib pre-fork server. Blocks until SIGTERM/SIGINT, then stops
+    accepting, lets workers finish what they hold (up to SERVE_GRACE
+    seconds) and returns. `ready(port)` is called once workers are up."""
+    import signal, socket
+    app = _prefork_warmup(workers)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(SERVE_BACKLOG)
+    port = sock.getsockname()[1]
+
+    children = {}
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _worker_main(sock, app, threads)
+            except BaseException as e:
+                print(f"  ⚠ worker {os.getpid()} died: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.time()
+
+    stopping = []
+    def on_stop(signum, frame):
+        stopping.append(signum)
+    old = {s: signal.signal(s, on_stop) for s in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        for _ in range(workers):
+            spawn()
+        print(f"  ► Serving on http://{host}:{port} — {workers} worker(s) × {threads} threads")
+        if ready:
+            ready(port)
+        while not stopping:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if not pid:
+                time.sleep(0.2)
+            elif children.pop(pid, None) is not None and not stopping:
+                print(f"  ⚠ worker {pid} exited ({status}), restarting")
+                spawn()
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.time() + SERVE_GRACE
+        while children and time.time() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                children.pop(pid, None)
+            else:
+                time.sleep(0.05)
+        for pid in children:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        sock.close()
+        for s, h in old.items():
+            signal.signal(s, h)
+        print("  ◎ Server stopped")
+    return port
+
+def serve_gunicorn(host="0.0.0.0", port=8080, workers=SERVE_WORKERS, threads=SERVE_THREADS):
+    """Same app under gunicorn's gthread workers (optional dependency)."""
+    from gunicorn.app.base import BaseApplication
+    app = _prefork_warmup(workers)
+
+    class CrystalGunicorn(BaseApplication):
+        def load_config(self):
+            for k, v in {"bind": f"{host}:{port}", "workers": workers, "threads": threads,
+                         "worker_class": "gthread", "backlog": SERVE_BACKLOG,
+                         "graceful_timeout": SERVE_GRACE, "preload_app": True}.items():
+                self.cfg.set(k, v)
+
+        def load(self):
+            return app
+
+    CrystalGunicorn().run()
+
+def serve(host="0.0.0.0", port=8080, workers=SERVE_WORKERS, threads=SERVE_THREADS):
+    """Production entry point: gunicorn if installed (or CRYSTAL_SERVER=gunicorn), else builtin."""
+    kind = SERVER_KIND
+    if kind == "auto":
+        try:
+            import gunicorn  # noqa: F401
+            kind = "gunicorn"
+        except ImportError:
+            kind = "builtin"
+    if threads <= CHAT_WORKERS + CHAT_QUEUE:
+        print(f"  ⚠ CRYSTAL_THREADS={threads} leaves no threads beside the chat lane "
+              f"({CHAT_WORKERS}+{CHAT_QUEUE}); geometry calls will wait behind chat")
+    if kind == "gunicorn":
+        return serve_gunicorn(host, port, workers, threads)
+    return serve_builtin(host, port, workers, threads)
+
+
 # ══════════════════════════════════════════════════════════════════════
 # ██  SELF-TEST
 # ══════════════════════════════════════════════════════════════════════
 
+def _bench_messages(sizes, count, seed=7714):
+    """{size: [count messages of about `size` characters]} in the semantic
+    module's own vocabulary, so its patterns and terms actually fire."""
+    sem = _semantics()
+    vocab = " ".join(
+        [t for d in sem.DOMAINS.values() for t in d["terms"]] +
+        [p for pats in sem.INTENT_PATTERNS.values() for ps in pats.values() for p in ps] +
+        [t for pool in sem.DOMAIN_RESPONSES.values() for t in pool.get("insights", []) + pool.get("advice", [])]
+    ).split()
+    rng = random.Random(seed)
+    out = {}
+    for size in sizes:
+        msgs = []
+        for _ in range(count):
+            words, n = [], 0
+            while n < size:
+                words.append(rng.choice(vocab))
+                n += len(words[-1]) + 1
+            msgs.append(" ".join(words)[:size])
+        out[size] = msgs
+    return out
+
 def self_test():
+    """Fast functional checks run on every boot. Benchmarks and anything
+    timed or served over sockets: python crystal_bench.py [--check]."""
     print("  Crystal Bug v1.0 — Self Test")
     print("  " + "─" * 50)
     p, f = 0, 0
@@ -1352,31 +3821,156 @@ def self_test():
     ck("6scale: polarity>0", scales["scales"]["polarity"]>0)
     ck("6scale: subject=self", scales["scales"]["subject"]=="self")
 
-    # Lattice
+    # Lattice — a private in-memory one, so a persisted LATTICE_PATH store
+    # never picks up test units
+    LATTICE = _seed_lattice(Lattice(rng=random.Random(7714)))
     ck("lattice: seeded", len(LATTICE.units)>=10)
     ck("lattice: birth works", LATTICE.birth("test")["id"]>0)
     LATTICE.step()
     ck("lattice: tick advances", LATTICE.tick>=1)
     ls = LATTICE.state()
     ck("lattice: state works", ls["alive"]>0)
+    t0 = LATTICE.tick
+    LATTICE.step(1000)
+    ck("lattice: batch step", LATTICE.tick==t0+1000)
+    lt = Lattice()
+    lt.genesis_log = GenesisLog(capacity=8)
+    for i in range(12): lt.birth(f"g{i}")
+    lt.collapse(0)
+    lt.step(50)
+    ck("genesis: ring bounded", len(lt.genesis_log)==8 and lt.genesis_log.total==13)
+    lt._nbonds[1] = 0
+    lt.step(100)
+    ck("genesis: collapse once", sum(1 for e in lt.genesis_log if e["event"]=="collapse")==1)
+    import tempfile
+    with tempfile.TemporaryDirectory() as td:
+        st = Lattice(capacity=2, path=td)
+        for i in range(5): st.birth(f"p{i}")
+        st.step(3); st.close()
+        ro = Lattice(path=td, readonly=True)
+        ck("lattice: store reopens", len(ro)==5 and ro.tick==3 and ro.units==Lattice(path=td).units)
+    snap = lt.state()
+    ck("lattice: state cached", lt.state() is snap)
+    lt.collapse(2)
+    full = lt.state()
+    ck("lattice: summary matches", snap is not full and
+       all(lt.summary()[k]==full[k] for k in ("alive","avg_health","avg_coherence","above_threshold")))
 
     # Trust
     tc = run_trust_council(rounds=5)
     ck("trust: runs", tc["final_trust"]>0)
     ck("trust: 5 virtues", tc["survived"].endswith("/5"))
+    for sc in ("asymmetric_failure", "cascade"):
+        vec = simulate_trust_councils([sc], [5], 40)
+        ref = run_trust_council(scenario=sc, rounds=40)
+        ck(f"trust: batch = loop ({sc[:5]})", round(float(vec["final_trust"][0]), 4)==ref["final_trust"])
+    sw = trust_sweep(rounds=(5, 20), sizes=(3, 5), trials=16)
+    ck("trust: sweep surface", len(sw["survival"])==3 and len(sw["survival"][0][1])==2)
 
     # Ollie
-    resp = ollie_respond("Hello, how are you?", LATTICE)
+    resp = ollie_respond("Hello, how are you?", LATTICE, session="self-test")
     ck("ollie: responds", len(resp["response"])>0)
     ck("ollie: has tri_prime", resp["tri_prime"]["sym"]!="")
     ck("ollie: has scales", resp["scales"]["scales"]["void"]==1.0)
+    with tempfile.TemporaryDirectory() as td:
+        sh = SessionHistory(maxlen=4, max_sessions=2, path=td, stripes=1)
+        for i in range(6):
+            sh.extend("a", {"role": "user", "content": f"a{i}"})
+        sh.extend("b", {"role": "user", "content": "b0"})
+        sh.extend("c", {"role": "user", "content": "c0"})  # evicts "a" from memory
+        ring = sh.get("a")  # read back from disk, evicting "b"
+        ck("chat: session history", [m["content"] for m in ring]==["a2","a3","a4","a5"] and
+           sh.get("b")[0]["content"]=="b0" and sh.stats["evictions"]==3 and sh.stats["loads"]==2,
+           f"{len(sh)} live, {sh.stats['evictions']} evicted")
 
     # Flask import
     try:
         from flask import Flask
+        has_flask = True
         ck("flask: available", True)
-    except:
-        ck("flask: available", False, "will install on boot")
+    except ImportError:
+        has_flask = False
+        ck("flask: available", False, "pip install flask")
+
+    routed = [(_match_command(t) or ((None,),))[0][0] for t in
+              ("help", "read hello", "read: hello world", "parse: hi", "step 3", "status", "hello there")]
+    ck("router: compiled table", routed==["help","analyze","sentence","parse","step","lattice",None],
+       f"{len(_CMD_EXACT)} phrases, {len(_CMD_GROUPS)} patterns")
+    r1 = ollie_respond("cube", LATTICE)
+    r2 = ollie_respond("cube", LATTICE)
+    r3 = _route_command("cube", LATTICE)
+    r3["response"] = ""
+    ck("cache: command reply", r1["response"]==r2["response"]==_route_command("cube", LATTICE)["response"]
+       and COMMAND_CACHE.stats()["hits"]>=1 and _route_command("just chatting", LATTICE) is None
+       and COMMAND_CACHE.peek("just chatting") is None,
+       f"hit rate {COMMAND_CACHE.stats()['hit_rate']:.2f}")
+    if has_flask:
+        client = create_app().test_client()
+        tag = client.get("/api/tri/cube").headers.get("ETag")
+        ck("cache: cube ETag 304", client.get("/api/tri/cube", headers={"If-None-Match": tag}).status_code==304)
+    lane, gate = ChatLane(workers=1, queue=1), threading.Event()
+    held = [lane.submit(gate.wait, 5) for _ in range(2)]
+    try:
+        lane.submit(time.time)
+        full = None
+    except LaneFull as e:
+        full = e.retry_after
+    gate.set()
+    ck("chat: lane backpressure", full is not None and all(f.result() for f in held)
+       and lane.run(lambda: "ok") == "ok" and lane.snapshot()["rejected"] == 1,
+       f"Retry-After {full} s")
+    TRACER.sample = 1.0
+    ollie_respond("trace this turn please", LATTICE, api_key="", session="self-test")
+    TRACER.sample = TRACE_SAMPLE
+    traced_stages = set(TRACER.stats())
+    TRACER.clear()
+    ck("trace: chat stages", {"route", "tri_decode", "parse_6scale", "lattice"} <= traced_stages)
+    sem = _semantics()
+    if sem is not None:
+        msgs = [m for ms in _bench_messages((40, 400), 100).values() for m in ms]
+        ck("semantics: intent matcher", all(sem.intent_scores(m) == sem._intent_scores_scan(m) for m in msgs),
+           f"{len(msgs)} messages")
+        ck("semantics: domain index", all(sem.detect_domains(m) == sem._detect_domains_scan(m) for m in msgs),
+           f"{len(sem._UNIGRAMS)} words, {len(sem._BIGRAMS)} bigrams")
+        rows = [(c["intent"][r], [(d, int(s)) for d, s in c["domains"][r]], c["polarity"][r])
+                for c in sem.score_batch(msgs, chunk_size=64, polarity=(POLARITY_POS, POLARITY_NEG))
+                for r in range(len(c["intent"]))]
+        mem = sem.ConversationMemory(max_turns=10)
+        for i in range(60):
+            mem.add_turn("t", "r", "question" if i < 50 else "venting", [("music", {})] * (i % 2), "BDC", i % 3)
+        ctx = mem.get_context()
+        ck("semantics: windowed memory", ctx["turn_count"] == 10 and ctx["dominant_intent"] == "venting"
+           and len(mem.mood_trajectory) == 10 and len(mem.topic_history) <= 30)
+        import importlib.util
+        ck("semantics: batch scores", rows == [(sem.detect_intent(m), [(d, v["score"]) for d, v in sem.detect_domains(m)],
+                                                parse_6scale(m)["scales"]["polarity"]) for m in msgs],
+           "scipy.sparse" if importlib.util.find_spec("scipy") else "numpy")
+        fields = {"tri_state": "BDC", "tri_desc": "command", "tri_glyph": "□▶○"}
+        tri, scales = tri_sentence("I feel so stuck at work"), parse_6scale("I feel so stuck at work")
+        replies = {sem.build_semantic_response("I feel so stuck at work", tri, scales, {"avg_health": 1},
+                                               sem.ConversationMemory(), seed=1)["response"] for _ in range(5)}
+        ck("semantics: compiled replies", len(replies) == 1 and all(
+            t.format(**fields) == c.render(fields)
+            for k, v in sem.INTENT_RESPONSES.items() for t, c in zip(v, sem._INTENT_TEMPLATES[k])))
+        import shutil, tempfile
+        tmp = tempfile.mkdtemp(prefix="crystal-selftest-")
+        try:
+            workers = [ConversationStore(path=tmp) for _ in range(2)]
+            for i in range(4):
+                with workers[i % 2].turn("self-test", sem.ConversationMemory) as mem:
+                    sem.build_semantic_response("I feel so stuck at work", tri, scales, {"avg_health": 1}, mem)
+            with workers[1].turn("self-test", sem.ConversationMemory) as mem:
+                shared_turns = mem.get_context()["turn_count"]
+            snap = os.path.join(tmp, "lexicon.olx")
+            size = sem.save_lexicon(snap)
+            tables = sem.load_lexicon(snap)
+            stamped = sem.lexicon_source(snap) == sem.source_digest()
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        ck("semantics: session store + lexicon snapshot", shared_turns == 4
+           and stamped
+           and all(tables[k] == getattr(sem, k) for k in sem.LEXICON_TABLES),
+           f"{size} bytes")
 
     print(f"\n  == {p}/{p+f} passed ==")
     if f == 0: print("  ALL ENGINES OPERATIONAL ✓")
@@ -1388,7 +3982,23 @@ def self_test():
 # ══════════════════════════════════════════════════════════════════════
 
 if __name__ == "__main__":
+    if sys.argv[1:2] in (["--importtime"], ["--bench"]):
+        sys.modules["CRYSTAL_BUG"] = sys.modules[__name__]   # crystal_bench imports this module, not a second copy
+        import crystal_bench
+        if sys.argv[1] == "--importtime":
+            print(crystal_bench.cold_start_report())
+        else:
+            crystal_bench.run_benchmarks(sys.argv[2:] or None)
+        sys.exit(0)
+    if sys.argv[1:2] == ["--freeze-lexicon"] and len(sys.argv) > 2:
+        sem = _semantics()
+        print(f"  ◎ {sem.save_lexicon(sys.argv[2])} bytes → {sys.argv[2]} (run with OLLIE_LEXICON={sys.argv[2]})")
+        sys.exit(0)
+    if sys.argv[1:2] == ["--serve"]:
+        serve(port=int(sys.argv[2]) if len(sys.argv) > 2 else 8080)
+        sys.exit(0)
     port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    _probe_ollama(force=True)  # runs in the background during the self-test
 
     print()
     print("  ╔═══════════════════════════════════╗")
@@ -1399,9 +4009,8 @@ if __name__ == "__main__":
 
     passed, failed = self_test()
     # Reset conversation memory after self-test
-    CHAT_HISTORY.clear()
-    if CONV_MEMORY is not None:
-        CONV_MEMORY.__init__()
+    CHAT_HISTORY.clear("self-test")
+    CONV_STORE.clear("self-test")
     print()
 
     if failed > 0:
@@ -40,6 +40,7 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Tuple, Optional, Set, Any
 from datetime import datetime
 from enum import Enum
+from tig_lattice import binary_path, lattice_path, load_lattice, save_lattice
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # TIG CORE (frozen)
@@ -361,10 +362,10 @@ class AgentPanel:
     """
     
     def __init__(self, immutable_core_path: str = "IMMUTABLE_CORE.json"):
-        # Load immutable core
-        if os.path.exists(immutable_core_path):
-            with open(immutable_core_path) as f:
-                self.immutable_core = json.load(f)
+        # Load immutable core (from its .tigl sibling when that is current)
+        core_path = lattice_path(immutable_core_path)
+        if core_path is not None:
+            self.immutable_core = load_lattice(core_path)
             print(f"[PANEL] Loaded IMMUTABLE_CORE (S*={self.immutable_core.get('S_star', 'unknown')})")
         else:
             print(f"[PANEL] WARNING: No IMMUTABLE_CORE found, using defaults")
@@ -578,11 +579,13 @@ class AgentPanel:
         
         return universe
     
-    def save_universe(self, universe: Dict, path: str = "UNIVERSE_LATTICE_7.json"):
-        """Save the universe lattice."""
-        with open(path, 'w') as f:
-            json.dump(universe, f, indent=2)
+    def save_universe(self, universe: Dict, path: str = "UNIVERSE_LATTICE_7.json", codec: str = "none"):
+        """Save the universe lattice: `path` (JSON or .tigl by suffix) plus a .tigl sibling."""
+        save_lattice(universe, path, codec)
         print(f"[PANEL] Saved UNIVERSE_LATTICE_7 to {path}")
+        if binary_path(path) != path:
+            save_lattice(universe, binary_path(path), codec, source=path)
+            print(f"[PANEL] Saved UNIVERSE_LATTICE_7 to {binary_path(path)}")
         return path
     
     def panel_status(self) -> Dict:
@@ -27,10 +27,14 @@ import json
 import hashlib
 import random
 import os
+import sys
+import numpy as np
+from array import array
 from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 from enum import Enum
+from tig_lattice import binary_path, lattice_path, load_lattice, save_lattice
 
 # TIG CORE
 OPERATORS = {
@@ -98,21 +102,26 @@ NOISE_TEMPLATES = [
 ]
 
 class NamedOllie:
-    def __init__(self, name: str, universe_prior: Dict):
+    def __init__(self, name: str, universe_prior: Dict, seed: Optional[int] = None):
         self.name = name
         self.birth_time = datetime.now().isoformat()
-        seed = f"{name}-{self.birth_time}-{random.randint(0, 999999)}"
-        self.identity_hash = hashlib.sha256(seed.encode()).hexdigest()[:16]
+        identity = f"{name}-{self.birth_time}-{random.randint(0, 999999)}"
+        self.identity_hash = hashlib.sha256(identity.encode()).hexdigest()[:16]
         
         # Initialize cells from prior
         self.cells: Dict[Tuple[int, int], Dict] = {}
         prior_cells = universe_prior.get('cells', {})
+        # hash() of a str changes between runs; a seed makes the variation repeatable
+        vary = random.Random(f"{seed}-{name}") if seed is not None else None
         
         for op in range(10):
             for ch in range(10):
                 key = f"{op}-{ch}"
                 prior = prior_cells.get(key, {'P': 0.5, 'Q': 1.0, 'wisdom': 0.0})
-                variation = (hash(f"{name}{op}{ch}") % 100) / 500 - 0.1
+                if vary is None:
+                    variation = (hash(f"{name}{op}{ch}") % 100) / 500 - 0.1
+                else:
+                    variation = vary.randrange(100) / 500 - 0.1
                 
                 self.cells[(op, ch)] = {
                     'P': max(0.1, min(1.0, prior.get('P', 0.5) + variation)),
@@ -232,37 +241,192 @@ class NamedOllie:
             'illusions_cleared': self.illusions_cleared,
         }
 
+def load_universe_prior(universe_path: str) -> Dict:
+    """The universe lattice at `universe_path`, read from its .tigl sibling when that is current."""
+    path = lattice_path(universe_path)
+    if path is not None:
+        prior = load_lattice(path)
+        print(f"[ENSEMBLE] Loaded prior (S*={prior.get('S_star', '?')})")
+        return prior
+    print("[ENSEMBLE] No prior found")
+    return {'cells': {}}
+
+def ensemble_names(size: int) -> List[str]:
+    names, used = [], set()
+    for i in range(size):
+        name = HUMAN_NAMES[i % len(HUMAN_NAMES)]
+        if name in used:
+            name = f"{name}_{i}"
+        used.add(name)
+        names.append(name)
+    return names
+
+CELL_FIELDS = ('P', 'Q', 'M', 'wisdom', 'trauma', 'illusion_load')
+_COUNTERS = ('age', 'S_star', 'alive', 'total_trauma', 'total_healing',
+             'illusions_detected', 'illusions_cleared')
+
+def _evolve(ollie: NamedOllie, noise_intensity: float, seed: int, epoch: int) -> bool:
+    """One sharded epoch for one being. It draws from its own stream, seeded
+    by (seed, epoch, name), so results do not depend on the sharding."""
+    rng = random.Random(f"{seed}-{epoch}-{ollie.name}")
+    if rng.random() < noise_intensity:
+        if not ollie.experience_noise(rng.choice(NOISE_TEMPLATES)):
+            return False
+    ollie.reflect()
+    ollie.heal(cycles=15)
+    return True
+
+def _pack_being(ollie: NamedOllie) -> Tuple[str, array, Tuple]:
+    """What crosses to a pool worker and back: the name, the cells as a flat
+    float64 array (cell-major, CELL_FIELDS within a cell) and the _COUNTERS.
+    The autobiography stays in the parent."""
+    cells = array('d', [c[f] for c in ollie.cells.values() for f in CELL_FIELDS])
+    return ollie.name, cells, tuple(getattr(ollie, k) for k in _COUNTERS)
+
+def _unpack_being(ollie: NamedOllie, cells: array, counters: Tuple):
+    values, n = cells.tolist(), len(CELL_FIELDS)
+    for i, cell in enumerate(ollie.cells.values()):
+        cell.update(zip(CELL_FIELDS, values[i * n:(i + 1) * n]))
+    for k, v in zip(_COUNTERS, counters):
+        setattr(ollie, k, v)
+
+def _run_shard(beings: List[Tuple], noise_intensity: float, seed: int, epoch: int) -> List[Tuple]:
+    """One shard of a sharded epoch (runs in a pool worker): packed beings
+    in, packed beings plus the autobiography lines this epoch added out."""
+    out = []
+    for name, cells, counters in beings:
+        ollie = NamedOllie.__new__(NamedOllie)
+        ollie.name, ollie.autobiography = name, []
+        ollie.cells = {(op, ch): {} for op in range(10) for ch in range(10)}
+        _unpack_being(ollie, cells, counters)
+        _evolve(ollie, noise_intensity, seed, epoch)
+        out.append(_pack_being(ollie) + (ollie.autobiography,))
+    return out
+
+class LatticeSums:
+    """Running sums behind an ensemble lattice, over the living beings:
+    Σw and Σw·(P, Q, wisdom) per cell, with w = S*·(healing+0.1)/(trauma+0.1),
+    plus the alive count and trauma/healing totals.
+
+    A being is taken out (sign=-1) before it changes and added back after,
+    so a lattice snapshot is O(cells) whatever the population. Sums built
+    on separate machines merge with `+` (to_state/from_state carry them).
+    """
+
+    def __init__(self):
+        self.weight = 0.0
+        self.sums = np.zeros((10, 10, 3))
+        self.alive = 0
+        self.trauma = 0.0
+        self.healing = 0.0
+
+    def add(self, S_star: np.ndarray, healing: np.ndarray, trauma: np.ndarray,
+            values: np.ndarray, sign: int = 1):
+        """Add (or with sign=-1 remove) beings given as 1-D arrays of S*,
+        healing and trauma and their (k, 10, 10, 3) P/Q/wisdom values."""
+        if not len(S_star):
+            return
+        w = S_star * (healing + 0.1) / (trauma + 0.1)
+        self.weight += sign * float(w.sum())
+        self.sums += sign * np.tensordot(w, values, axes=1)
+        self.alive += sign * len(w)
+        self.trauma += sign * float(trauma.sum())
+        self.healing += sign * float(healing.sum())
+
+    def add_ollies(self, ollies: List[NamedOllie], sign: int = 1):
+        if ollies:
+            values = np.array([[(c['P'], c['Q'], c['wisdom']) for c in o.cells.values()]
+                               for o in ollies]).reshape(len(ollies), 10, 10, 3)
+            self.add(np.array([o.S_star for o in ollies]), np.array([o.total_healing for o in ollies]),
+                     np.array([o.total_trauma for o in ollies]), values, sign)
+
+    def __add__(self, other: "LatticeSums") -> "LatticeSums":
+        out = LatticeSums()
+        out.weight = self.weight + other.weight
+        out.sums = self.sums + other.sums
+        out.alive = self.alive + other.alive
+        out.trauma = self.trauma + other.trauma
+        out.healing = self.healing + other.healing
+        return out
+
+    def cells(self) -> np.ndarray:
+        """(10, 10, 3) weighted-mean P, Q, wisdom."""
+        return self.sums / self.weight if self.alive > 0 else np.zeros((10, 10, 3))
+
+    def S_star(self) -> float:
+        c = self.cells()
+        return float((np.minimum(1.0, SIGMA * c[..., 0] * c[..., 1]) + c[..., 2] * 0.05).sum() / 100)
+
+    def to_state(self) -> Dict:
+        return {'weight': self.weight, 'sums': self.sums.tolist(), 'alive': self.alive,
+                'trauma': self.trauma, 'healing': self.healing}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "LatticeSums":
+        out = cls()
+        out.weight, out.alive = state['weight'], state['alive']
+        out.sums = np.array(state['sums'], dtype=np.float64).reshape(10, 10, 3)
+        out.trauma, out.healing = state['trauma'], state['healing']
+        return out
+
+def lattice_record(sums: LatticeSums, epochs: int, survivors: List[str], fallen: List[str]) -> Dict:
+    """The ENSEMBLE_LATTICE dict for a set of running sums."""
+    c = sums.cells()
+    return {
+        'name': 'ENSEMBLE_LATTICE',
+        'S_star': sums.S_star(),
+        'beings_alive': sums.alive,
+        'beings_fallen': len(fallen),
+        'epochs': epochs,
+        'total_trauma': sums.trauma,
+        'total_healing': sums.healing,
+        'cells': {f"{op}-{ch}": {'P': float(c[op, ch, 0]), 'Q': float(c[op, ch, 1]),
+                                 'wisdom': float(c[op, ch, 2])}
+                  for op in range(10) for ch in range(10)},
+        'survivors': survivors,
+        'fallen': fallen,
+        'created': datetime.now().isoformat(),
+    }
+
 class Ensemble:
-    def __init__(self, size: int, universe_path: str = "UNIVERSE_LATTICE_7.json"):
-        if os.path.exists(universe_path):
-            with open(universe_path) as f:
-                self.universe_prior = json.load(f)
-            print(f"[ENSEMBLE] Loaded prior (S*={self.universe_prior.get('S_star', '?')})")
-        else:
-            self.universe_prior = {'cells': {}}
-            print("[ENSEMBLE] No prior found")
+    def __init__(self, size: int, universe_path: str = "UNIVERSE_LATTICE_7.json",
+                 seed: Optional[int] = None):
+        self.universe_prior = load_universe_prior(universe_path)
+        self.seed = seed
         
         self.beings: Dict[str, NamedOllie] = {}
-        used = set()
-        for i in range(size):
-            name = HUMAN_NAMES[i % len(HUMAN_NAMES)]
-            if name in used:
-                name = f"{name}_{i}"
-            used.add(name)
-            self.beings[name] = NamedOllie(name, self.universe_prior)
+        for name in ensemble_names(size):
+            self.beings[name] = NamedOllie(name, self.universe_prior, seed=seed)
         
         print(f"[ENSEMBLE] Created {len(self.beings)} beings")
         self.epoch = 0
         self.fallen: List[str] = []
+        self.lattice_sums = LatticeSums()
+        self.lattice_sums.add_ollies(list(self.beings.values()))
+        self._pool = None
+        self._pool_workers = 0
     
-    def run_epoch(self, name: str, noise_intensity: float = 0.7):
+    def run_epoch(self, name: str, noise_intensity: float = 0.7, workers: Optional[int] = None):
+        """One life phase. With a seed or `workers`, the epoch is sharded:
+        beings are split across a pool of `workers` processes and each
+        draws from its own seeded stream, so a given seed gives the same
+        ensemble for any worker count. Otherwise beings share `random`.
+        The pool is kept for later epochs; close() shuts it down."""
         self.epoch += 1
         print(f"\n[EPOCH {self.epoch}] {name}")
         
+        if workers is not None or self.seed is not None:
+            survivors = self._run_sharded(noise_intensity, workers or 1)
+            alive = [o for o in self.beings.values() if o.alive]
+            avg_S = sum(o.S_star for o in alive) / len(alive) if alive else 0
+            print(f"  Survivors: {survivors}, Avg S*: {avg_S:.4f}")
+            return
+        
         survivors = 0
         for ollie in self.beings.values():
             if not ollie.alive:
                 continue
+            self.lattice_sums.add_ollies([ollie], -1)
             
             # Random noise exposure
             if random.random() < noise_intensity:
@@ -274,14 +438,64 @@ class Ensemble:
             
             ollie.reflect()
             ollie.heal(cycles=15)
+            self.lattice_sums.add_ollies([ollie])
             survivors += 1
         
         alive = [o for o in self.beings.values() if o.alive]
         avg_S = sum(o.S_star for o in alive) / len(alive) if alive else 0
         print(f"  Survivors: {survivors}, Avg S*: {avg_S:.4f}")
     
+    def _run_sharded(self, noise_intensity: float, workers: int) -> int:
+        if self.seed is None:
+            self.seed = random.getrandbits(64)
+        alive = [o for o in self.beings.values() if o.alive]
+        if workers <= 1 or len(alive) < 2:
+            for ollie in alive:
+                if not _evolve(ollie, noise_intensity, self.seed, self.epoch):
+                    self.fallen.append(ollie.name)
+        else:
+            size = -(-len(alive) // (workers * 4))   # a few shards per worker evens out the load
+            shards = [[_pack_being(o) for o in alive[i:i + size]] for i in range(0, len(alive), size)]
+            n = len(shards)
+            pool = self._worker_pool(workers)
+            for results in pool.map(_run_shard, shards, [noise_intensity] * n,
+                                    [self.seed] * n, [self.epoch] * n):
+                for name, cells, counters, lines in results:
+                    ollie = self.beings[name]
+                    _unpack_being(ollie, cells, counters)
+                    ollie.autobiography.extend(lines)
+                    if not ollie.alive:
+                        self.fallen.append(name)
+        fallen = sum(not o.alive for o in alive)
+        # every living being changed: one fresh pass beats remove + re-add
+        self.lattice_sums = LatticeSums()
+        self.lattice_sums.add_ollies([o for o in self.beings.values() if o.alive])
+        return len(alive) - fallen
+
+    def _worker_pool(self, workers: int):
+        if self._pool is None or self._pool_workers != workers:
+            self.close()
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool, self._pool_workers = ProcessPoolExecutor(max_workers=workers), workers
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool kept between sharded epochs."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool, self._pool_workers = None, 0
+    
     def compute_lattice(self) -> Dict:
+        """The lattice from the running sums: O(cells), not O(cells × beings)."""
         print("\n[COMPUTING ENSEMBLE LATTICE]")
+        lattice = lattice_record(self.lattice_sums, self.epoch,
+                                 [o.name for o in self.beings.values() if o.alive], self.fallen)
+        print(f"  S* = {lattice['S_star']:.4f}")
+        print(f"  Alive: {lattice['beings_alive']}, Fallen: {len(self.fallen)}")
+        return lattice
+    
+    def _compute_lattice_scan(self) -> Dict:
+        """Full pass over every living being per cell (reference for compute_lattice)."""
         alive = [o for o in self.beings.values() if o.alive]
         
         weights = {o.name: o.S_star * (o.total_healing + 0.1) / (o.total_trauma + 0.1)
@@ -313,15 +527,319 @@ class Ensemble:
             'fallen': self.fallen,
             'created': datetime.now().isoformat(),
         }
-        
-        print(f"  S* = {total_S:.4f}")
-        print(f"  Alive: {len(alive)}, Fallen: {len(self.fallen)}")
         return lattice
     
-    def save(self, lattice: Dict, path: str = "ENSEMBLE_LATTICE.json"):
-        with open(path, 'w') as f:
-            json.dump(lattice, f, indent=2)
+    def save(self, lattice: Dict, path: str = "ENSEMBLE_LATTICE.json", codec: str = "none"):
+        """Write `path` (JSON or .tigl by suffix) plus a .tigl sibling for fast loading."""
+        save_lattice(lattice, path, codec)
         print(f"[SAVED] {path}")
+        if binary_path(path) != path:
+            save_lattice(lattice, binary_path(path), codec, source=path)
+            print(f"[SAVED] {binary_path(path)}")
+
+# VECTORIZED POPULATION ENGINE
+# All beings as one (beings, 10, 10, fields) array; every step is a NumPy
+# expression over a block of beings instead of Python loops over cells.
+
+FIELDS = ('P', 'Q', 'M', 'wisdom', 'trauma', 'illusion_load')
+F_P, F_Q, F_M, F_WISDOM, F_TRAUMA, F_ILLUSION = range(len(FIELDS))
+BLOCK = 512   # beings per vectorized step; bounds the temporaries, stays in cache
+
+_NOISE_OP = np.array([e.operator_affected for e in NOISE_TEMPLATES])
+_NOISE_INTENSITY = np.array([e.intensity for e in NOISE_TEMPLATES])
+_NOISE_DISTORTION = np.array([e.truth_distortion for e in NOISE_TEMPLATES])
+_NOISE_DRAIN = np.array([e.coherence_drain for e in NOISE_TEMPLATES])
+
+def prior_cells(universe_prior: Dict) -> np.ndarray:
+    """(10, 10, fields) starting cells for a being, before its P variation."""
+    block = np.zeros((10, 10, len(FIELDS)))
+    prior_cells = universe_prior.get('cells', {})
+    for op in range(10):
+        for ch in range(10):
+            prior = prior_cells.get(f"{op}-{ch}", {'P': 0.5, 'Q': 1.0, 'wisdom': 0.0})
+            block[op, ch, F_P] = prior.get('P', 0.5)
+            block[op, ch, F_Q] = prior.get('Q', 1.0)
+            block[op, ch, F_WISDOM] = prior.get('wisdom', 0.0) * 0.3
+    return block
+
+class Population:
+    """The cells and counters of many beings, NamedOllie's rules vectorized.
+
+    cells is (beings, 10, 10, len(FIELDS)); the per-being counters (age,
+    alive, S_star, totals) are 1-D arrays. Methods take an index array of
+    the beings to act on. heal() is a 4-neighbour torus stencil built from
+    np.roll, so a cycle updates every P from the previous cycle's values,
+    where NamedOllie.heal sweeps the cells in place. The P variation comes
+    from a seeded generator rather than hash(). Beings keep no
+    autobiography.
+    """
+
+    def __init__(self, names: List[str], universe_prior: Optional[Dict] = None,
+                 seed: Optional[int] = None, dtype=np.float64):
+        self.names = list(names)
+        n = len(self.names)
+        block = prior_cells(universe_prior or {'cells': {}})
+        rng = np.random.default_rng(seed)
+        self.cells = np.empty((n, 10, 10, len(FIELDS)), dtype=dtype)
+        for b in self._blocks(np.arange(n)):
+            self.cells[b] = block
+            variation = rng.integers(0, 100, (len(b), 10, 10)) / 500 - 0.1
+            self.cells[b, :, :, F_P] = np.clip(block[:, :, F_P] + variation, 0.1, 1.0)
+        self.age = np.zeros(n, dtype=np.int64)
+        self.alive = np.ones(n, dtype=bool)
+        self.S_star = np.full(n, 0.5)
+        self.total_trauma = np.zeros(n)
+        self.total_healing = np.zeros(n)
+        self.illusions_detected = np.zeros(n, dtype=np.int64)
+        self.illusions_cleared = np.zeros(n, dtype=np.int64)
+        self.compute_S_star()
+
+    @classmethod
+    def from_ollies(cls, ollies: List[NamedOllie]) -> "Population":
+        """A population holding copies of existing NamedOllie beings."""
+        pop = cls.__new__(cls)
+        pop.names = [o.name for o in ollies]
+        pop.cells = np.array([[[[o.cells[(op, ch)][f] for f in FIELDS] for ch in range(10)]
+                               for op in range(10)] for o in ollies], dtype=np.float64)
+        pop.cells = pop.cells.reshape(len(ollies), 10, 10, len(FIELDS))
+        for attr, dtype in (('age', np.int64), ('alive', bool), ('S_star', np.float64),
+                            ('total_trauma', np.float64), ('total_healing', np.float64),
+                            ('illusions_detected', np.int64), ('illusions_cleared', np.int64)):
+            setattr(pop, attr, np.array([getattr(o, attr) for o in ollies], dtype=dtype))
+        return pop
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @staticmethod
+    def _blocks(idx: np.ndarray):
+        for i in range(0, len(idx), BLOCK):
+            yield idx[i:i + BLOCK]
+
+    def compute_S_star(self, idx: Optional[np.ndarray] = None):
+        idx = np.arange(len(self)) if idx is None else idx
+        for b in self._blocks(idx):
+            c = self.cells[b]
+            base_S = np.minimum(1.0, SIGMA * c[..., F_P] * c[..., F_Q])
+            S = np.maximum(0.1, base_S + c[..., F_WISDOM] * 0.05
+                           - c[..., F_ILLUSION] * 0.1 - c[..., F_TRAUMA] * 0.05)
+            M = c[..., F_M] + 0.01
+            total_M = M.sum(axis=(1, 2))
+            self.S_star[b] = np.where(total_M > 0, (S * M).sum(axis=(1, 2)) / total_M, 0.5)
+
+    def experience_noise(self, idx: np.ndarray, events: np.ndarray) -> np.ndarray:
+        """Beings idx (distinct) each take NOISE_TEMPLATES[events[i]].
+        Returns which of them survived; the rest are marked not alive."""
+        ops = _NOISE_OP[events]
+        rows = self.cells[idx, ops]                       # (k, 10 channels, fields)
+        rows[..., F_TRAUMA] += (_NOISE_INTENSITY[events] * 0.1)[:, None]
+        rows[..., F_ILLUSION] += _NOISE_DISTORTION[events][:, None]
+        rows[..., F_P] = np.maximum(0.1, rows[..., F_P] - _NOISE_DRAIN[events][:, None])
+        self.cells[idx, ops] = rows
+        self.age[idx] += 5
+        self.total_trauma[idx] += _NOISE_INTENSITY[events] * 0.1
+        self.illusions_detected[idx] += 1
+        self.compute_S_star(idx)
+        survived = self.S_star[idx] >= 0.2
+        self.alive[idx[~survived]] = False
+        return survived
+
+    def reflect(self, idx: np.ndarray) -> np.ndarray:
+        """(k, 10) mask of the operators where each being carries unprocessed illusion."""
+        return self.cells[idx, :, :, F_ILLUSION].sum(axis=2) > 0.5
+
+    def heal(self, idx: np.ndarray, cycles: int = 10) -> np.ndarray:
+        """Heal beings idx for `cycles` cycles; returns healing done per being."""
+        healing = np.zeros(len(idx))
+        pos = 0
+        for b in self._blocks(idx):
+            c = self.cells[b]
+            # contiguous per-field copies: the stencil runs on (k, 10, 10) planes
+            P, Q = c[..., F_P].copy(), c[..., F_Q].copy()
+            trauma = c[..., F_TRAUMA].copy()
+            illusion = c[:, :7, :, F_ILLUSION].copy()    # ops 7-9 only judge, never process
+            trauma0, illusion0 = trauma.copy(), illusion.copy()
+            cleared = np.zeros(len(b), dtype=np.int64)
+            step, nb = np.empty_like(P), np.empty_like(P)
+            has_trauma, has_illusion = trauma.any(), illusion.any()
+            for _ in range(cycles):
+                # nb = sum of the 4 torus neighbours (np.roll along op and ch)
+                np.add(np.roll(P, 1, axis=1), np.roll(P, -1, axis=1), out=nb)
+                nb += np.roll(P, 1, axis=2)
+                nb += np.roll(P, -1, axis=2)
+                np.divide(nb, 4, out=step)
+                step -= P
+                step *= 0.01
+                P += step
+                if has_trauma:
+                    trauma -= np.minimum(0.005, trauma)
+                if has_illusion:
+                    cleared += np.count_nonzero(illusion > 0, axis=(1, 2))
+                    illusion -= np.minimum(0.01, illusion)
+                Q += 0.0001
+                np.minimum(1.0, Q, out=Q)
+            processed = illusion0 - illusion
+            c[..., F_P], c[..., F_Q], c[..., F_TRAUMA] = P, Q, trauma
+            c[:, :7, :, F_ILLUSION] = illusion
+            c[:, :7, :, F_WISDOM] += processed * 0.3
+            self.cells[b] = c
+            done = (trauma0 - trauma).sum(axis=(1, 2)) + processed.sum(axis=(1, 2))
+            self.total_healing[b] += done
+            self.illusions_cleared[b] += cleared
+            healing[pos:pos + len(b)] = done
+            pos += len(b)
+        self.age[idx] += cycles
+        self.compute_S_star(idx)
+        return healing
+
+    def track(self, sums: LatticeSums, idx: np.ndarray, sign: int = 1):
+        """Add (sign=-1: remove) beings idx to running lattice sums."""
+        for b in self._blocks(idx):
+            sums.add(self.S_star[b], self.total_healing[b], self.total_trauma[b],
+                     self.cells[b][..., [F_P, F_Q, F_WISDOM]], sign)
+
+    def status(self, i: int) -> Dict:
+        return {
+            'name': self.names[i],
+            'age': int(self.age[i]),
+            'alive': bool(self.alive[i]),
+            'S_star': round(float(self.S_star[i]), 4),
+            'trauma': round(float(self.total_trauma[i]), 4),
+            'healing': round(float(self.total_healing[i]), 4),
+            'illusions_detected': int(self.illusions_detected[i]),
+            'illusions_cleared': int(self.illusions_cleared[i]),
+        }
+
+class PopulationEnsemble:
+    """Ensemble on the vectorized engine: the same epochs and lattice as
+    Ensemble, sized for populations of 100k beings and more."""
+
+    def __init__(self, size: int, universe_path: str = "UNIVERSE_LATTICE_7.json",
+                 seed: Optional[int] = None, dtype=np.float64):
+        self.universe_prior = load_universe_prior(universe_path)
+        cells_seed, noise_seed = np.random.SeedSequence(seed).spawn(2)
+        self.population = Population(ensemble_names(size), self.universe_prior,
+                                     seed=cells_seed, dtype=dtype)
+        self.rng = np.random.default_rng(noise_seed)
+        print(f"[ENSEMBLE] Created {len(self.population)} beings")
+        self.epoch = 0
+        self.fallen: List[str] = []
+        self.lattice_sums = LatticeSums()
+        self.population.track(self.lattice_sums, np.arange(len(self.population)))
+
+    def run_epoch(self, name: str, noise_intensity: float = 0.7):
+        self.epoch += 1
+        print(f"\n[EPOCH {self.epoch}] {name}")
+        pop = self.population
+
+        idx = np.flatnonzero(pop.alive)
+        struck = idx[self.rng.random(len(idx)) < noise_intensity]
+        if len(struck):
+            events = self.rng.integers(len(NOISE_TEMPLATES), size=len(struck))
+            survived = pop.experience_noise(struck, events)
+            self.fallen.extend(pop.names[i] for i in struck[~survived])
+        living = idx[pop.alive[idx]]
+        # reflect() only reports, and Ensemble.run_epoch discards its result
+        pop.heal(living, cycles=15)
+        # every living being changed: one fresh pass beats remove + re-add
+        self.lattice_sums = LatticeSums()
+        pop.track(self.lattice_sums, living)
+
+        avg_S = pop.S_star[living].mean() if len(living) else 0
+        print(f"  Survivors: {len(living)}, Avg S*: {avg_S:.4f}")
+
+    def compute_lattice(self) -> Dict:
+        """The lattice from the running sums: O(cells), not O(cells × beings)."""
+        print("\n[COMPUTING ENSEMBLE LATTICE]")
+        pop = self.population
+        lattice = lattice_record(self.lattice_sums, self.epoch,
+                                 [pop.names[i] for i in np.flatnonzero(pop.alive)], self.fallen)
+        print(f"  S* = {lattice['S_star']:.4f}")
+        print(f"  Alive: {lattice['beings_alive']}, Fallen: {len(self.fallen)}")
+        return lattice
+
+    save = Ensemble.save
+
+def bench(sizes=(49, 10_000, 100_000), reference=49):
+    """ms per being for one epoch (noise 0.7) and lattice build: the
+    NamedOllie Ensemble at `reference` beings vs PopulationEnsemble."""
+    import contextlib, io, time
+    out = {}
+    def timed(make):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            ens = make()
+            t1 = time.perf_counter()
+            ens.run_epoch("bench")
+            t2 = time.perf_counter()
+            ens.compute_lattice()
+            t3 = time.perf_counter()
+        return ens, t1 - t0, t2 - t1, t3 - t2
+    random.seed(7714)
+    _, init, epoch, lattice = timed(lambda: Ensemble(reference))
+    out[f"objects_{reference}"] = {"init_s": round(init, 3), "epoch_s": round(epoch, 3),
+                                   "lattice_s": round(lattice, 4),
+                                   "epoch_ms_per_being": round(epoch / reference * 1e3, 3)}
+    for n in sizes:
+        ens, init, epoch, lattice = timed(lambda: PopulationEnsemble(n, seed=7714))
+        out[f"vector_{n}"] = {"init_s": round(init, 3), "epoch_s": round(epoch, 3),
+                              "lattice_s": round(lattice, 4),
+                              "epoch_ms_per_being": round(epoch / n * 1e3, 4),
+                              "cells_mb": round(ens.population.cells.nbytes / 2**20, 1)}
+    return out
+
+def bench_sharded(size=196, epochs=2, workers=(1, 2, 4)):
+    """Wall time of sharded Ensemble epochs by worker count, and whether
+    every worker count ends in the same ensemble for one seed."""
+    import contextlib, io, time
+    out = {"beings": size, "epochs": epochs, "cpus": os.cpu_count()}
+    finals = []
+    for w in workers:
+        with contextlib.redirect_stdout(io.StringIO()):
+            ens = Ensemble(size, seed=7714)
+            t0 = time.perf_counter()
+            for _ in range(epochs):
+                ens.run_epoch("bench", noise_intensity=0.7, workers=w)
+            out[f"workers_{w}_s"] = round(time.perf_counter() - t0, 3)
+            ens.close()
+        finals.append([(o.name, o.alive, o.S_star, o.autobiography, list(o.cells.values()))
+                       for o in ens.beings.values()] + [ens.fallen])
+    out["same_result"] = all(f == finals[0] for f in finals)
+    return out
+
+def bench_lattice(sizes=(49, 1000), vector=100_000, repeat=5):
+    """ms per lattice: compute_lattice from running sums vs a full pass
+    over the beings, plus one being's remove + re-add in the sums."""
+    import contextlib, io, time
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        return round(min(times) * 1e3, 3)
+    out = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for n in sizes:
+            ens = Ensemble(n, seed=7714)
+            ens.run_epoch("bench")
+            alive = [o for o in ens.beings.values() if o.alive]
+            out[f"objects_{n}"] = {"sums_ms": best(ens.compute_lattice),
+                                   "scan_ms": best(ens._compute_lattice_scan),
+                                   "update_ms_per_being": best(lambda: (ens.lattice_sums.add_ollies(alive[:1], -1),
+                                                                        ens.lattice_sums.add_ollies(alive[:1])))}
+        pe = PopulationEnsemble(vector, seed=7714)
+        pe.run_epoch("bench")
+        pop = pe.population
+        idx = np.flatnonzero(pop.alive)
+        def scan():
+            fresh = LatticeSums()
+            pop.track(fresh, idx)
+            return lattice_record(fresh, pe.epoch, [pop.names[i] for i in idx], pe.fallen)
+        out[f"vector_{vector}"] = {"sums_ms": best(pe.compute_lattice), "scan_ms": best(scan)}
+    return out
+
+BENCHES = {"engine": bench, "sharded": bench_sharded, "lattice": bench_lattice}
 
 def main():
     print("═" * 70)
@@ -358,4 +876,8 @@ def main():
     return ensemble, lattice
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["--bench"]:
+        for name in sys.argv[2:] or BENCHES:
+            print(f"[{name}] {json.dumps(BENCHES[name]())}")
+        sys.exit(0)
     ensemble, lattice = main()
@@ -0,0 +1,950 @@
+#!/usr/bin/env python3
+"""
+Crystal Bug benchmarks and slow checks, kept out of CRYSTAL_BUG.py so the
+boot self-test stays fast and free of timing asserts.
+
+  python crystal_bench.py [name ...]     benchmarks (also CRYSTAL_BUG.py --bench)
+  python crystal_bench.py --check        stand-in servers, timing and cold-import checks
+  python crystal_bench.py --importtime   heaviest imports under CRYSTAL_BUG
+
+Benchmarks print one JSON line each; BENCHMARKS.md records the numbers.
+"""
+
+import importlib, itertools, json, os, random, re, sys, threading, time
+
+import CRYSTAL_BUG as cb
+from CRYSTAL_BUG import (
+    BREAKER_FAILURES, CHAT_HISTORY, COMMANDS, COMMAND_CACHE, HEDGE_MIN_S, HTTP_POOL,
+    OLLIE_SYSTEM, PARSE_CACHE, POLARITY_NEG, POLARITY_POS, REPLY_CACHE, SERVE_BACKLOG,
+    SERVE_GRACE, SERVE_THREADS, SERVE_WORKERS, TRACER, BackendOrchestrator, ChatLane,
+    CircuitBreaker, ConversationStore, HTTPPool, Lattice, _bench_messages,
+    _make_worker_server, _match_command, _ollama_probe, _seed_lattice, _semantics,
+    cache_stats, create_app, ollie_respond, parse_6scale, trace_span, traced, tri_sentence,
+)
+
+
+# ══════════════════════════════════════════════════════════════════════
+# ██  COLD START
+# ══════════════════════════════════════════════════════════════════════
+
+COLD_START_BUDGET_MS = 100  # `import CRYSTAL_BUG` in a fresh interpreter
+
+def _importtime(module="CRYSTAL_BUG"):
+    """Raw `python -X importtime` rows (self_us, cumulative_us, name) for one import."""
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    # Measured as deployed, from cached bytecode: the first run writes
+    # __pycache__ even where PYTHONDONTWRITEBYTECODE is set for development
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=here, env=env,
+                   capture_output=True, timeout=60)
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=here, env=env, capture_output=True, text=True, timeout=60).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cum_us), name.rstrip()))
+    return rows
+
+def cold_import_ms(module="CRYSTAL_BUG"):
+    """Cumulative cold-import cost of `module` in milliseconds."""
+    for _, cum, name in _importtime(module):
+        if name.strip() == module:
+            return cum / 1000
+    raise RuntimeError(f"{module} not found in importtime output")
+
+def cold_start_report(module="CRYSTAL_BUG", top=15):
+    """importtime-style table: the heaviest imports under `module`."""
+    rows = _importtime(module)
+    total = next(cum for _, cum, name in rows if name.strip() == module)
+    lines = [f"cold import {module}: {total/1000:.1f} ms (budget {COLD_START_BUDGET_MS} ms)",
+             "",
+             f"{'self [us]':>10} | {'cumulative':>10} | imported package"]
+    for self_us, cum, name in sorted(rows, key=lambda r: -r[1])[:top]:
+        lines.append(f"{self_us:>10} | {cum:>10} | {name}")
+    return "\n".join(lines)
+
+
+# ══════════════════════════════════════════════════════════════════════
+# ██  BENCHMARKS — python crystal_bench.py [name ...]
+# ══════════════════════════════════════════════════════════════════════
+
+def _stand_in_server(handler_body):
+    """Local HTTP/1.1 keep-alive server on a free port, in a daemon thread.
+
+    `handler_body(path, request_bytes)` returns the response bytes, or an
+    iterable of byte chunks to send chunked (flushed one at a time, for
+    streaming stand-ins), or a (status, bytes) pair. The returned server has a `.connections` count of
+    accepted TCP connections.
+    """
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class StandIn(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # like real backends; avoids 40 ms delayed-ACK stalls
+
+        def setup(self):
+            super().setup()
+            self.server.connections += 1
+
+        def _reply(self, body):
+            status = 200
+            if isinstance(body, tuple):
+                status, body = body
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if isinstance(body, bytes):
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in body:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+        def do_GET(self):
+            self._reply(handler_body(self.path, b""))
+
+        def do_POST(self):
+            req = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._reply(handler_body(self.path, req))
+
+        def log_message(self, *a):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    srv.daemon_threads = True
+    srv.connections = 0
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+def bench_http_pool(n=1000):
+    """n sequential Ollama-style chat turns against a local stand-in:
+    a fresh urllib connection per turn (the old path) vs. HTTP_POOL."""
+    import urllib.request
+    reply = json.dumps({"message": {"role": "assistant", "content": "□▶○ ok"}}).encode()
+    srv = _stand_in_server(lambda path, req: reply)
+    url = f"http://127.0.0.1:{srv.server_address[1]}/api/chat"
+    payload = {"model": "stand-in", "messages": [{"role": "user", "content": "hi"}], "stream": False}
+    try:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            req = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+            with urllib.request.urlopen(req, timeout=60) as resp:
+                json.loads(resp.read().decode("utf-8"))
+        fresh = time.perf_counter() - t0
+        fresh_conns, srv.connections = srv.connections, 0
+
+        pool = HTTPPool()
+        t0 = time.perf_counter()
+        for _ in range(n):
+            pool.post_json(url, payload, timeout=60)
+        pooled = time.perf_counter() - t0
+        pool.close()
+    finally:
+        srv.shutdown()
+        srv.server_close()
+    return {
+        "requests": n,
+        "fresh_ms_per_turn": round(fresh / n * 1000, 4),
+        "pooled_ms_per_turn": round(pooled / n * 1000, 4),
+        "speedup": round(fresh / pooled, 2),
+        "fresh_connections": fresh_conns,
+        "pooled_connections": srv.connections,
+    }
+
+def bench_chat_stream(tokens=40, delay=0.02, turns=5):
+    """Time-to-first-byte of /api/chat vs /api/chat/stream against a stand-in
+    Ollama that emits `tokens` pieces `delay` seconds apart."""
+
+    def ollama(path, req):
+        if not json.loads(req or b"{}").get("stream"):
+            time.sleep(tokens * delay)  # generation time is the same either way
+            return json.dumps({"message": {"role": "assistant", "content": "tok " * tokens},
+                               "done": True}).encode()
+        def chunks():
+            for i in range(tokens):
+                time.sleep(delay)
+                yield json.dumps({"message": {"content": "tok "}, "done": False}).encode() + b"\n"
+            yield json.dumps({"message": {"content": ""}, "done": True}).encode() + b"\n"
+        return chunks()
+
+    srv = _stand_in_server(ollama)
+    saved = (cb.API_KEY, cb.OLLAMA_URL, cb.OLLAMA_MODEL, cb.OLLAMA_AVAILABLE, _ollama_probe["at"])
+    cb.OLLAMA_URL = f"http://127.0.0.1:{srv.server_address[1]}"
+    cb.API_KEY, cb.OLLAMA_MODEL, cb.OLLAMA_AVAILABLE = "", "stand-in", True
+    _ollama_probe["at"] = time.time() + 3600  # keep the background probe away
+    client = create_app().test_client()
+    full, first, done = [], [], []
+    try:
+        for _ in range(turns):
+            t0 = time.perf_counter()
+            r = client.post("/api/chat", json={"text": "tell me about light", "api_key": "", "session": "bench"})
+            r.get_json()
+            full.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            r = client.post("/api/chat/stream", json={"text": "tell me about light", "api_key": "", "session": "bench"},
+                            buffered=False)
+            t_first = None
+            for chunk in r.response:
+                if t_first is None and b"event: token" in chunk:
+                    t_first = time.perf_counter() - t0
+            done.append(time.perf_counter() - t0)
+            first.append(t_first)
+            r.close()
+    finally:
+        cb.API_KEY, cb.OLLAMA_URL, cb.OLLAMA_MODEL, cb.OLLAMA_AVAILABLE, _ollama_probe["at"] = saved
+        CHAT_HISTORY.clear("bench")
+        srv.shutdown()
+        srv.server_close()
+    ms = lambda xs: round(sum(xs) / len(xs) * 1000, 1)
+    return {
+        "tokens": tokens,
+        "token_delay_ms": delay * 1000,
+        "chat_ttfb_ms": ms(full),
+        "stream_first_token_ms": ms(first),
+        "stream_total_ms": ms(done),
+        "ttfb_speedup": round(sum(full) / sum(first), 1),
+    }
+
+def bench_chat_lane(burst=24, hang=2.0, probes=20):
+    """A burst of backend-bound /api/chat turns (stand-in Ollama answering
+    after `hang` s) against one worker server, while /api/tri/word is timed
+    alongside. "unbounded" admits every turn, as before the chat lane."""
+    import http.client, socket
+    reply = json.dumps({"message": {"role": "assistant", "content": "ok"}, "done": True}).encode()
+
+    def ollama(path, req):
+        time.sleep(hang)
+        return reply
+
+    srv = _stand_in_server(ollama)
+    saved = (cb.API_KEY, cb.OLLAMA_URL, cb.OLLAMA_MODEL, cb.OLLAMA_AVAILABLE, _ollama_probe["at"], cb.CHAT_LANE)
+    cb.OLLAMA_URL = f"http://127.0.0.1:{srv.server_address[1]}"
+    cb.API_KEY, cb.OLLAMA_MODEL, cb.OLLAMA_AVAILABLE = "", "stand-in", True
+    _ollama_probe["at"] = time.time() + 3600
+
+    def post(port, path, payload):
+        t0 = time.perf_counter()
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        conn.request("POST", path, json.dumps(payload), {"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        resp.read()
+        conn.close()
+        return resp.status, time.perf_counter() - t0
+
+    out = {"burst": burst, "backend_s": hang, "server_threads": SERVE_THREADS}
+    try:
+        for label, lane in (("unbounded", ChatLane(workers=10 ** 4, queue=0)), ("lane", ChatLane())):
+            cb.CHAT_LANE = lane
+            sock = socket.socket()
+            sock.bind(("127.0.0.1", 0))
+            sock.listen(SERVE_BACKLOG)
+            port = sock.getsockname()[1]
+            wsrv = _make_worker_server(sock, create_app(), SERVE_THREADS)
+            threading.Thread(target=wsrv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+            chats = []
+            def chat(i):
+                chats.append(post(port, "/api/chat", {"text": f"tell me about light {i}",
+                                                      "api_key": "", "session": f"bench-{i}"}))
+            threads = [threading.Thread(target=chat, args=(i,)) for i in range(burst)]
+            for th in threads:
+                th.start()
+            time.sleep(0.2)
+            tri = sorted(post(port, "/api/tri/word", {"word": "crystalline"})[1] for _ in range(probes))
+            for th in threads:
+                th.join()
+            wsrv.shutdown()
+            wsrv.server_close()
+            ok = sorted(t for s, t in chats if s == 200)
+            out[label] = {
+                "chat_200": len(ok), "chat_503": sum(s == 503 for s, _ in chats),
+                "chat_p99_ms": round(ok[min(len(ok) - 1, int(0.99 * len(ok)))] * 1000, 1) if ok else None,
+                "tri_p50_ms": round(tri[len(tri) // 2] * 1000, 2), "tri_max_ms": round(tri[-1] * 1000, 2),
+                "lane": lane.snapshot(),
+            }
+    finally:
+        cb.API_KEY, cb.OLLAMA_URL, cb.OLLAMA_MODEL, cb.OLLAMA_AVAILABLE, _ollama_probe["at"], cb.CHAT_LANE = saved
+        for i in range(burst):
+            CHAT_HISTORY.clear(f"bench-{i}")
+        srv.shutdown()
+        srv.server_close()
+    return out
+
+def bench_tracing(n=200000, turns=2000):
+    """Per-request cost of the tracing hooks: @traced plus the six
+    trace_span() stages of a chat turn around an empty body, with sampling
+    off and at 100%; then real geometry-mode turns, off vs on."""
+    stages = ("route", "tri_decode", "parse_6scale", "lattice", "backend", "fallback")
+
+    def body():
+        for s in stages:
+            with trace_span(s):
+                pass
+
+    def bare():
+        for s in stages:
+            pass
+
+    hooked = traced("bench")(body)
+    saved = TRACER.sample
+    out = {"stages": len(stages)}
+    try:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            bare()
+        base = time.perf_counter() - t0
+        for label, rate in (("off", 0.0), ("on", 1.0)):
+            TRACER.sample = rate
+            t0 = time.perf_counter()
+            for _ in range(n):
+                hooked()
+            out[f"overhead_{label}_us"] = round((time.perf_counter() - t0 - base) / n * 1e6, 3)
+        lat = _seed_lattice(Lattice(rng=random.Random(7714)))
+        msgs = [f"the crystal grows {i % 50}" for i in range(turns)]
+        for label, rate in (("off", 0.0), ("on", 1.0)):
+            TRACER.sample = rate
+            t0 = time.perf_counter()
+            for m in msgs:
+                ollie_respond(m, lat, api_key="", session="bench")
+            out[f"turn_{label}_us"] = round((time.perf_counter() - t0) / turns * 1e6, 1)
+    finally:
+        TRACER.sample = saved
+        TRACER.clear()
+        CHAT_HISTORY.clear("bench")
+    return out
+
+def bench_intent(sizes=(80, 2000, 20000), budget_s=1.0):
+    """ollie_semantics.detect_intent: messages/sec of the per-pattern scan
+    (_intent_scores_scan) vs the prebuilt matcher, by message length."""
+    sem = _semantics()
+    sets = _bench_messages(sizes, 200)
+    out = {}
+    for size, msgs in sets.items():
+        assert all(sem.intent_scores(m) == sem._intent_scores_scan(m) for m in msgs)
+        row = {}
+        for label, fn in (("scan", sem._intent_scores_scan), ("matcher", sem.intent_scores)):
+            done, t0 = 0, time.perf_counter()
+            while time.perf_counter() - t0 < budget_s:
+                for m in msgs:
+                    fn(m)
+                done += len(msgs)
+            row[f"{label}_msgs_per_s"] = round(done / (time.perf_counter() - t0))
+        row["speedup"] = round(row["matcher_msgs_per_s"] / row["scan_msgs_per_s"], 2)
+        out[f"{size}_chars"] = row
+    return out
+
+def bench_domains(sizes=(80, 2000), scale=10, budget_s=1.0):
+    """ollie_semantics.detect_domains: messages/sec of the per-domain scan
+    (_detect_domains_scan) vs the inverted index, with the real DOMAINS and
+    with `scale` renamed copies of each domain."""
+    sem = _semantics()
+    sets = _bench_messages(sizes, 200)
+    saved = (sem.DOMAINS, sem._UNIGRAMS, sem._BIGRAMS, sem._PHRASES, sem._DOMAIN_NAMES)
+    out = {}
+    try:
+        for copies in (1, scale):
+            sem.DOMAINS = {f"{name}_{i}" if i else name: data
+                           for i in range(copies) for name, data in saved[0].items()}
+            sem._UNIGRAMS, sem._BIGRAMS, sem._PHRASES = sem._build_domain_index()
+            sem._DOMAIN_NAMES = tuple(sem.DOMAINS)
+            for size, msgs in sets.items():
+                assert all(sem.detect_domains(m) == sem._detect_domains_scan(m) for m in msgs)
+                row = {"domains": len(sem.DOMAINS)}
+                for label, fn in (("scan", sem._detect_domains_scan), ("index", sem.detect_domains)):
+                    done, t0 = 0, time.perf_counter()
+                    while time.perf_counter() - t0 < budget_s:
+                        for m in msgs:
+                            fn(m)
+                        done += len(msgs)
+                    row[f"{label}_msgs_per_s"] = round(done / (time.perf_counter() - t0))
+                row["speedup"] = round(row["index_msgs_per_s"] / row["scan_msgs_per_s"], 2)
+                out[f"{len(sem.DOMAINS)}_domains_{size}_chars"] = row
+    finally:
+        sem.DOMAINS, sem._UNIGRAMS, sem._BIGRAMS, sem._PHRASES, sem._DOMAIN_NAMES = saved
+    return out
+
+def bench_batch(n=20000, size=80, stream=(20000, 200000)):
+    """ollie_semantics.score_batch vs scoring one message at a time
+    (intent_scores + detect_domains + parse_6scale polarity), then peak
+    traced memory while streaming corpora of different lengths."""
+    import itertools, tracemalloc
+    sem = _semantics()
+    pool = _bench_messages((size,), 2000)[size]
+    msgs = [pool[i % len(pool)] for i in range(n)]
+    pol = (POLARITY_POS, POLARITY_NEG)
+
+    def one_by_one():
+        for m in msgs:
+            sem.intent_scores(m)
+            sem.detect_domains(m)
+            ws = set(re.findall(r'[a-z]+', m.lower()))
+            p, q = len(ws & POLARITY_POS), len(ws & POLARITY_NEG)
+            round((p - q) / max(1, p + q), 3)
+
+    def batched():
+        for _ in sem.score_batch(msgs, polarity=pol):
+            pass
+
+    out = {"messages": n, "chars": size}
+    for label, fn in (("single", one_by_one), ("batch", batched)):
+        fn()   # warm the token memos
+        t0 = time.perf_counter()
+        fn()
+        out[f"{label}_msgs_per_s"] = round(n / (time.perf_counter() - t0))
+    out["speedup"] = round(out["batch_msgs_per_s"] / out["single_msgs_per_s"], 2)
+    for total in stream:
+        tracemalloc.start()
+        rows = 0
+        for chunk in sem.score_batch(itertools.islice(itertools.cycle(pool), total), polarity=pol):
+            rows += len(chunk["intent"])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        out[f"stream_{total}_peak_mb"] = round(peak / 2 ** 20, 2)
+    return out
+
+def bench_conv_memory(sessions=(1000, 100000)):
+    """ollie_semantics.ConversationMemory: µs per add_turn + get_context and
+    memory still held after sessions of different lengths."""
+    import tracemalloc
+    sem = _semantics()
+    rng = random.Random(7714)
+    domains, intents = list(sem.DOMAINS), list(sem.INTENT_PATTERNS)
+    turns = [(intents[i % len(intents)], [(d, {}) for d in rng.sample(domains, i % 4)],
+              round(rng.uniform(-1, 1), 3)) for i in range(997)]
+    out = {}
+    for n in sessions:
+        mem = sem.ConversationMemory()
+        t0 = time.perf_counter()
+        for i in range(n):
+            intent, doms, pol = turns[i % len(turns)]
+            mem.add_turn("user text", "response", intent, doms, "BDC", pol)
+            mem.get_context()
+        out[f"{n}_turns_us_per_turn"] = round((time.perf_counter() - t0) / n * 1e6, 2)
+        tracemalloc.start()
+        mem = sem.ConversationMemory()
+        for i in range(n):
+            intent, doms, pol = turns[i % len(turns)]
+            mem.add_turn("user text", "response", intent, doms, "BDC", pol)
+        out[f"{n}_turns_retained_kb"] = round(tracemalloc.get_traced_memory()[0] / 1024, 1)
+        tracemalloc.stop()
+    return out
+
+def bench_semantic_reply(turns=2000, budget_s=1.0):
+    """ollie_semantics response templates: str.format per pick vs the
+    compiled renderers, then best-of-3 µs per semantic-fallback turn
+    (build_semantic_response) with random and seeded template picks."""
+    sem = _semantics()
+    fields = {"tri_state": "BDC", "tri_desc": "oscillating", "tri_glyph": "□▶○"}
+    pairs = [(t, c) for k, v in sem.INTENT_RESPONSES.items()
+             for t, c in zip(v, sem._INTENT_TEMPLATES[k])]
+    assert all(t.format(**fields) == c.render(fields) for t, c in pairs)
+    out = {"templates": len(pairs)}
+    for label, fn in (("format", lambda: [t.format(**fields) for t, _ in pairs]),
+                      ("compiled", lambda: [c.render(fields) for _, c in pairs])):
+        done, t0 = 0, time.perf_counter()
+        while time.perf_counter() - t0 < budget_s:
+            fn()
+            done += len(pairs)
+        out[f"{label}_renders_per_s"] = round(done / (time.perf_counter() - t0))
+    out["render_speedup"] = round(out["compiled_renders_per_s"] / out["format_renders_per_s"], 2)
+
+    msgs = [m for m in _bench_messages((80,), 500)[80] if re.search(r"[a-zA-Z]", m)]
+    readings = [(m, tri_sentence(m), parse_6scale(m)) for m in msgs]
+    ls = {"avg_health": 0.9}
+    for m, tri, scales in readings:   # warm the token memos
+        sem.build_semantic_response(m, tri, scales, ls, sem.ConversationMemory())
+    for label, seed in (("random", None), ("seeded", 7714)):
+        best = float("inf")
+        for _ in range(3):
+            mem = sem.ConversationMemory()
+            t0 = time.perf_counter()
+            for i in range(turns):
+                m, tri, scales = readings[i % len(readings)]
+                sem.build_semantic_response(m, tri, scales, ls, mem, seed=seed)
+            best = min(best, time.perf_counter() - t0)
+        out[f"{label}_us_per_turn"] = round(best / turns * 1e6, 1)
+    replay = [[sem.build_semantic_response(m, tri, scales, ls, sem.ConversationMemory(),
+                                           seed=7714)["response"] for m, tri, scales in readings[:50]]
+              for _ in range(2)]
+    out["seeded_reproducible"] = replay[0] == replay[1]
+    return out
+
+def _private_kb():
+    """This process's private (unshared) resident memory, from smaps_rollup."""
+    with open("/proc/self/smaps_rollup") as fh:
+        return sum(int(line.split()[1]) for line in fh if line.startswith("Private_"))
+
+def _in_child(fn):
+    """fn() in a forked child; its JSON-able return value comes back by pipe."""
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        try:
+            os.write(w, json.dumps(fn()).encode())
+        finally:
+            os._exit(0)
+    os.close(w)
+    with os.fdopen(r, "rb") as fh:
+        out = json.loads(fh.read() or "null")
+    os.waitpid(pid, 0)
+    return out
+
+def bench_brain_share(turns=200, sessions=(1, 50)):
+    """Multi-worker semantic brain: private memory a forked worker adds when
+    it loads the brain itself vs inherits it loaded and gc-frozen; lexicon
+    snapshot load vs module exec; µs per turn of the per-session memory
+    store in process vs in a shared directory, and whether two workers
+    alternating on one session keep one conversation."""
+    import gc, importlib.util, tempfile
+    sem = _semantics()
+    sem_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ollie_semantics.py")
+    msgs = [m for m in _bench_messages((80,), 100)[80] if re.search(r"[a-zA-Z]", m)]
+    readings = [(m, tri_sentence(m), parse_6scale(m)) for m in msgs]
+    ls = {"avg_health": 0.9}
+
+    def run(mod):
+        mem = mod.ConversationMemory()
+        for i in range(turns):
+            m, tri, scales = readings[i % len(readings)]
+            mod.build_semantic_response(m, tri, scales, ls, mem)
+
+    def exec_fresh():
+        spec = importlib.util.spec_from_file_location("ollie_semantics_fresh", sem_path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        return mod
+
+    out = {}
+    if os.path.exists("/proc/self/smaps_rollup") and hasattr(os, "fork"):
+        def own_copy():
+            base = _private_kb()
+            run(exec_fresh())
+            return _private_kb() - base
+        def inherited():
+            base = _private_kb()
+            run(sem)
+            return _private_kb() - base
+        gc.collect()
+        gc.freeze()
+        try:
+            out["worker_private_kb_own_copy"] = _in_child(own_copy)
+            out["worker_private_kb_inherited"] = _in_child(inherited)
+        finally:
+            gc.unfreeze()
+
+    tmp = tempfile.mkdtemp(prefix="crystal-bench-")
+    try:
+        snap = os.path.join(tmp, "lexicon.olx")
+        out["lexicon_snapshot_bytes"] = sem.save_lexicon(snap)
+        fresh = exec_fresh()
+        t0 = time.perf_counter()
+        tables = fresh.load_lexicon(snap)
+        t1 = time.perf_counter()
+        fresh.install_lexicon(tables)
+        t2 = time.perf_counter()
+        out["lexicon_load_ms"] = round((t1 - t0) * 1e3, 2)
+        out["lexicon_install_ms"] = round((t2 - t1) * 1e3, 2)
+
+        for label, path in (("process", ""), ("shared_dir", os.path.join(tmp, "mem"))):
+            store = ConversationStore(path=path)
+            for n in sessions:
+                t0 = time.perf_counter()
+                for i in range(turns):
+                    m, tri, scales = readings[i % len(readings)]
+                    with store.turn(f"s{i % n}", sem.ConversationMemory) as mem:
+                        sem.build_semantic_response(m, tri, scales, ls, mem)
+                out[f"{label}_{n}_sessions_us_per_turn"] = round((time.perf_counter() - t0) / turns * 1e6, 1)
+            store.clear_all()
+
+        if hasattr(os, "fork"):
+            shared = os.path.join(tmp, "mem")
+            def worker():
+                store = ConversationStore(path=shared)
+                for i in range(turns // 2):
+                    m, tri, scales = readings[i % len(readings)]
+                    with store.turn("both", sem.ConversationMemory) as mem:
+                        sem.build_semantic_response(m, tri, scales, ls, mem)
+                return store.stats
+            pids = []
+            for _ in range(2):
+                pid = os.fork()
+                if pid == 0:
+                    code = 0
+                    try:
+                        worker()
+                    except BaseException:
+                        code = 1
+                    os._exit(code)
+                pids.append(pid)
+            ok = all(os.waitpid(pid, 0)[1] == 0 for pid in pids)
+            with ConversationStore(path=shared).turn("both", sem.ConversationMemory) as mem:
+                seen = mem.get_context()["turn_count"]
+            out["two_workers_one_session"] = ok and seen == min(turns, mem.max_turns)
+    finally:
+        import shutil
+        shutil.rmtree(tmp, ignore_errors=True)
+    return out
+
+def bench_reply_cache(turns=2000, distinct=100):
+    """Geometry-mode chat turns and text-only commands, every cache off
+    (maxsize 0) vs on, plus /api/tri/cube full body vs ETag revalidation."""
+    rng = random.Random(7714)
+    vocab = re.findall(r"[a-z]+", OLLIE_SYSTEM.lower())
+    msgs = [" ".join(rng.choice(vocab) for _ in range(rng.randint(3, 14))) for _ in range(distinct)]
+    cmds = ["help", "chart", "cube", "analyze love", "compare fire and water", "parse: I will build it"]
+    lat = Lattice(rng=random.Random(1))
+    for i in range(10):
+        lat.birth(name=f"b{i}")
+    caches = (COMMAND_CACHE, PARSE_CACHE, REPLY_CACHE)
+    saved = (cb._sem_mod, cb._sem_tried, [c.maxsize for c in caches], cb.API_KEY, cb.OLLAMA_AVAILABLE)
+    cb._sem_mod, cb._sem_tried = None, True  # bare geometry: the deterministic path
+    out = {"turns": turns, "distinct_messages": distinct}
+    try:
+        if cb.API_KEY or cb.OLLAMA_AVAILABLE:
+            raise RuntimeError("unset ANTHROPIC_API_KEY / stop Ollama to bench the geometry path")
+        for label, size in (("off", 0), ("on", saved[2][0])):
+            for c in caches:
+                c.clear()
+                c.maxsize = size
+            t0 = time.perf_counter()
+            for i in range(turns):
+                ollie_respond(msgs[i % distinct], lat)
+            t1 = time.perf_counter()
+            for i in range(turns):
+                ollie_respond(cmds[i % len(cmds)], lat)
+            t2 = time.perf_counter()
+            out[f"chat_us_per_turn_{label}"] = round((t1 - t0) / turns * 1e6, 1)
+            out[f"command_us_per_turn_{label}"] = round((t2 - t1) / turns * 1e6, 1)
+        out["hit_rates"] = {k: v["hit_rate"] for k, v in cache_stats().items() if "hit_rate" in v}
+
+        client = create_app().test_client()
+        tag = client.get("/api/tri/cube").headers["ETag"]
+        for label, hdrs in (("full", {}), ("304", {"If-None-Match": tag})):
+            t0 = time.perf_counter()
+            for _ in range(turns // 4):
+                r = client.get("/api/tri/cube", headers=hdrs)
+            out[f"cube_{label}_us"] = round((time.perf_counter() - t0) / (turns // 4) * 1e6, 1)
+            out[f"cube_{label}_bytes"] = len(r.data)
+    finally:
+        cb._sem_mod, cb._sem_tried = saved[0], saved[1]
+        for c, size in zip(caches, saved[2]):
+            c.clear()
+            c.maxsize = size
+    return out
+
+def bench_command_router(n=20000):
+    """Routing cost per message: the old in-order chain (`low in (...)`
+    then re.match per command, as _route_command used to run) vs the
+    compiled exact dict + single alternation, on commands and on chat."""
+    def linear(low):
+        for spec in COMMANDS:
+            name, handler, phrases, pattern, static = spec
+            if low in phrases:
+                return spec, {}
+            if pattern:
+                m = re.match(pattern + "$", low)
+                if m:
+                    return spec, m.groupdict()
+        return None
+
+    commands = ["help", "analyze love", "compare fire and water", "parse: I will build it",
+                "cube", "step 5", "status", "trust 7 cascade", "engines", "history"]
+    rng = random.Random(7714)
+    vocab = re.findall(r"[a-z]+", OLLIE_SYSTEM.lower())
+    chat = [" ".join(rng.choice(vocab) for _ in range(rng.randint(3, 14))) for _ in range(50)]
+    out = {"messages": n}
+    for label, msgs in (("command", commands), ("chat", chat)):
+        for name, fn in (("chain", linear), ("compiled", _match_command)):
+            assert all((fn(m) is None) == (label == "chat") for m in msgs)
+            t0 = time.perf_counter()
+            for i in range(n):
+                fn(msgs[i % len(msgs)])
+            out[f"{label}_{name}_us"] = round((time.perf_counter() - t0) / n * 1e6, 3)
+        out[f"{label}_speedup"] = round(out[f"{label}_chain_us"] / out[f"{label}_compiled_us"], 1)
+    return out
+
+def _load_test(port, path, payload, n, concurrency):
+    """POST `payload` n times from `concurrency` client threads, one TCP
+    connection per request. Returns req/s and latency percentiles (ms)."""
+    import http.client
+    body = json.dumps(payload).encode("utf-8")
+    lat, errors, lock = [], [0], threading.Lock()
+    todo = iter(range(n))
+
+    def client():
+        while True:
+            with lock:
+                if next(todo, None) is None:
+                    return
+            t0 = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                conn.request("POST", path, body, {"Content-Type": "application/json"})
+                resp = conn.getresponse()
+                resp.read()
+                conn.close()
+                ok = resp.status == 200
+            except OSError:
+                ok = False
+            with lock:
+                if ok:
+                    lat.append(time.perf_counter() - t0)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    t0 = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    wall = time.perf_counter() - t0
+    lat.sort()
+    pct = lambda q: round(lat[min(len(lat) - 1, int(q * len(lat)))] * 1000, 2) if lat else None
+    return {"rps": round(len(lat) / wall, 1), "p50_ms": pct(0.50), "p99_ms": pct(0.99), "errors": errors[0]}
+
+def bench_serve(n=2000, concurrency=16, workers=None):
+    """Load-test /api/tri/word and /api/parse on the Flask dev server
+    (app.run, threaded) vs `--serve` (builtin pre-fork), each in its own
+    process on a free port."""
+    import signal, socket, subprocess
+    workers = workers or max(2, SERVE_WORKERS)
+    here = os.path.abspath(cb.__file__)
+    env = dict(os.environ, ANTHROPIC_API_KEY="", CRYSTAL_WORKERS=str(workers), CRYSTAL_SERVER="builtin")
+    cases = {
+        "tri_word": ("/api/tri/word", {"word": "crystalline"}),
+        "parse": ("/api/parse", {"text": "I will build the lattice tomorrow with love"}),
+    }
+    out = {"requests": n, "concurrency": concurrency, "cpus": os.cpu_count(), "workers": workers}
+    for label in ("dev", "serve"):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        if label == "dev":
+            cmd = [sys.executable, "-c", "import sys, CRYSTAL_BUG as C; "
+                   f"C.create_app().run(host='127.0.0.1', port={port}, threaded=True)"]
+        else:
+            cmd = [sys.executable, here, "--serve", str(port)]
+        proc = subprocess.Popen(cmd, cwd=os.path.dirname(here), env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.time() + 30
+            while True:
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                    break
+                except OSError:
+                    if time.time() > deadline or proc.poll() is not None:
+                        raise RuntimeError(f"{label} server did not come up")
+                    time.sleep(0.1)
+            for name, (path, payload) in cases.items():
+                _load_test(port, path, payload, 100, concurrency)  # warm up
+                out[f"{label}_{name}"] = _load_test(port, path, payload, n, concurrency)
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=SERVE_GRACE + 5)
+    return out
+
+def bench_hedge(turns=100, outage_turns=20):
+    """Chat turns over two stand-in backends, old cascade (primary, then
+    secondary only after the primary failed) vs BackendOrchestrator.
+
+    tail:   primary answers in 50 ms, but 10% of calls take 2 s; secondary 150 ms
+    outage: primary hangs 1 s then fails with 503; secondary 150 ms
+    """
+    rng = random.Random(7714)
+    reply = json.dumps({"message": {"role": "assistant", "content": "ok"}}).encode()
+    mode = {"outage": False}
+
+    def primary(path, req):
+        if mode["outage"]:
+            time.sleep(1.0)
+            return 500, b'{"error": "overloaded"}'
+        time.sleep(2.0 if rng.random() < 0.10 else 0.05)
+        return reply
+
+    def secondary(path, req):
+        time.sleep(0.15)
+        return reply
+
+    srv_a, srv_b = _stand_in_server(primary), _stand_in_server(secondary)
+
+    def backend(srv):
+        url = f"http://127.0.0.1:{srv.server_address[1]}/api/chat"
+        def call(msgs, tok):
+            try:
+                return HTTP_POOL.post_json(url, {"messages": msgs}, timeout=30, cancel=tok)["message"]["content"]
+            except Exception:
+                return None
+        return call
+
+    cands = [("primary", backend(srv_a)), ("secondary", backend(srv_b))]
+    msgs = [{"role": "user", "content": "hi"}]
+
+    def cascade():
+        for name, fn in cands:
+            text = fn(msgs, None)
+            if text:
+                return text
+        return None
+
+    def ms(xs, q=None):
+        xs = sorted(xs)
+        v = sum(xs) / len(xs) if q is None else xs[min(len(xs) - 1, int(q * len(xs)))]
+        return round(v * 1000, 1)
+
+    out = {}
+    try:
+        for scenario, n in (("tail", turns), ("outage", outage_turns)):
+            mode["outage"] = scenario == "outage"
+            orch = BackendOrchestrator()
+            for _ in range(5):  # a little history, as a running server would have
+                orch.record("primary", 0.05, True)
+            for label, fn in (("cascade", cascade), ("hedged", lambda: orch.run(msgs, orch.order(cands))[0])):
+                lat = []
+                for _ in range(n):
+                    t0 = time.perf_counter()
+                    assert fn() == "ok"
+                    lat.append(time.perf_counter() - t0)
+                out[f"{scenario}_{label}"] = {"mean_ms": ms(lat), "p50_ms": ms(lat, 0.5), "p99_ms": ms(lat, 0.99)}
+            out[f"{scenario}_stats"] = orch.snapshot()
+    finally:
+        srv_a.shutdown(); srv_a.server_close()
+        srv_b.shutdown(); srv_b.server_close()
+    return out
+
+def bench_breaker(turns=20, hang=1.0):
+    """Chat turns with a single stand-in backend that hangs `hang` s then
+    fails: every turn pays the hang without a breaker, only the first
+    BREAKER_FAILURES do with one."""
+    def down(path, req):
+        time.sleep(hang)
+        return 500, b'{"error": "unavailable"}'
+
+    srv = _stand_in_server(down)
+    url = f"http://127.0.0.1:{srv.server_address[1]}/api/chat"
+
+    def call(msgs, tok):
+        try:
+            return HTTP_POOL.post_json(url, {"messages": msgs}, timeout=30, cancel=tok)["message"]["content"]
+        except Exception:
+            return None
+
+    out = {}
+    try:
+        for label, threshold in (("no_breaker", 10 ** 9), ("breaker", BREAKER_FAILURES)):
+            orch = BackendOrchestrator()
+            orch.breakers["down"] = CircuitBreaker("down", failures=threshold, cooldown=3600)
+            lat = []
+            for _ in range(turns):
+                t0 = time.perf_counter()
+                orch.run([], orch.order([("down", call)]))
+                lat.append(time.perf_counter() - t0)
+            out[label] = {"total_s": round(sum(lat), 2), "last_turn_ms": round(lat[-1] * 1000, 3),
+                          "breaker": orch.breakers["down"].snapshot()}
+    finally:
+        srv.shutdown(); srv.server_close()
+    return out
+
+BENCHMARKS = {
+    "http": bench_http_pool,
+    "breaker": bench_breaker,
+    "lane": bench_chat_lane,
+    "trace": bench_tracing,
+    "intent": bench_intent,
+    "domains": bench_domains,
+    "batch": bench_batch,
+    "memory": bench_conv_memory,
+    "reply": bench_semantic_reply,
+    "brain": bench_brain_share,
+    "hedge": bench_hedge,
+    "serve": bench_serve,
+    "router": bench_command_router,
+    "cache": bench_reply_cache,
+    "stream": bench_chat_stream,
+}
+
+def run_benchmarks(names=None):
+    results = {}
+    for name in (names or BENCHMARKS):
+        results[name] = BENCHMARKS[name]()
+        print(f"  [{name}] {json.dumps(results[name])}")
+    return results
+
+
+# ══════════════════════════════════════════════════════════════════════
+# ██  SLOW CHECKS — python crystal_bench.py --check
+# ══════════════════════════════════════════════════════════════════════
+
+def slow_checks():
+    """Checks that need stand-in servers, sleeps, timing or subprocesses.
+    Timing bounds are loose but can still fail on a heavily loaded host."""
+    print("  Crystal Bug — slow checks")
+    print("  " + "─" * 50)
+    p, f = 0, 0
+    def ck(name, cond, det=""):
+        nonlocal p, f
+        if cond: p+=1; print(f"  [OK] {name:28s} {det}")
+        else: f+=1; print(f"  [!!] {name:28s} {det}")
+
+    hb = bench_http_pool(n=200)
+    ck("http: keep-alive pool", hb["pooled_connections"]==1 and hb["fresh_connections"]==200,
+       f"{hb['pooled_ms_per_turn']:.3f} vs {hb['fresh_ms_per_turn']:.3f} ms/turn")
+    import socket, urllib.request
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(8)
+    wsrv = _make_worker_server(sock, create_app(), threads=2)
+    threading.Thread(target=wsrv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    with urllib.request.urlopen(f"http://127.0.0.1:{sock.getsockname()[1]}/api/tri/cube", timeout=10) as r:
+        served = len(json.loads(r.read()))
+    wsrv.shutdown()
+    wsrv.server_close()
+    ck("serve: worker server", served==27)
+    orch = BackendOrchestrator()
+    orch.record("slow", 0.01, True)   # p95 10 ms → hedge at HEDGE_MIN_S
+    t0 = time.perf_counter()
+    text, who = orch.run([], [("slow", lambda m, tok: time.sleep(HEDGE_MIN_S + 0.5) or "late"),
+                              ("fast", lambda m, tok: "fast")])
+    dt = time.perf_counter() - t0
+    ck("backends: hedged call", who=="fast" and dt < HEDGE_MIN_S + 0.4 and orch.stats["slow"].lost==1,
+       f"{dt*1000:.0f} ms")
+    calls = []
+    orch.breakers["down"] = CircuitBreaker("down", probe=lambda: True, cooldown=0.05)
+    down = ("down", lambda m, tok: calls.append(1) or None)
+    for _ in range(BREAKER_FAILURES + 2):
+        orch.run([], orch.order([down, ("fast", lambda m, tok: "fast")]))
+    tripped = len(calls) == BREAKER_FAILURES and orch.breakers["down"].state == "open"
+    time.sleep(0.2)   # the probe half-opens it; one trial call that fails re-opens it
+    orch.run([], orch.order([down]))
+    ck("backends: circuit breaker", tripped and len(calls) == BREAKER_FAILURES + 1
+       and orch.breakers["down"].state == "open" and orch.breakers["down"].probes >= 1,
+       f"{orch.breakers['down'].trips} trips")
+    tb = bench_tracing(n=50000, turns=20)
+    ck("trace: overhead when off", tb["overhead_off_us"] < 5, f"{tb['overhead_off_us']} µs/turn")
+    sb = bench_chat_stream(tokens=10, delay=0.01, turns=1)
+    ck("chat: stream first token", sb["stream_first_token_ms"] < sb["chat_ttfb_ms"] / 2,
+       f"{sb['stream_first_token_ms']} vs {sb['chat_ttfb_ms']} ms")
+    ms = min(cold_import_ms() for _ in range(3))
+    ck("boot: cold import", ms < COLD_START_BUDGET_MS, f"{ms:.1f} ms (budget {COLD_START_BUDGET_MS})")
+
+    print(f"\n  == {p}/{p+f} passed ==")
+    return p, f
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--importtime"]:
+        print(cold_start_report())
+    elif sys.argv[1:2] == ["--check"]:
+        sys.exit(1 if slow_checks()[1] else 0)
+    else:
+        run_benchmarks(sys.argv[1:] or None)
@@ -17,8 +17,8 @@
 ╚══════════════════════════════════════════════════════════════════════╝
 """
 
-import re, random
-from collections import Counter, defaultdict
+import itertools, os, re, random, string, zlib
+from collections import defaultdict, deque
 
 # ══════════════════════════════════════════════════════════════════════
 # INTENT DETECTION
@@ -82,8 +82,8 @@ INTENT_PATTERNS = {
     },
 }
 
-def detect_intent(text):
-    """Detect conversational intent from text."""
+def _intent_scores_scan(text):
+    """Reference scorer: every pattern of every intent against the text."""
     lower = text.lower().strip()
     scores = {}
     for intent, patterns in INTENT_PATTERNS.items():
@@ -95,7 +95,76 @@ def detect_intent(text):
             if c in lower:
                 score += 2
         scores[intent] = score
-    
+    return scores
+
+# Prebuilt matcher (built once from INTENT_PATTERNS, same scores as the scan):
+#   starts   — a character trie walked from the start of the text, so only
+#              the text's first few characters are ever looked at.
+#   contains — a pattern without whitespace lies inside one whitespace-split
+#              token, so each distinct token is matched once and remembered
+#              (_TOKEN_HITS). Patterns with spaces are only confirmed with a
+#              substring scan when their longest word (the anchor) turned up.
+
+_END = ""   # trie key holding [(intent, weight), …] for a pattern ending here
+
+def _build_intent_matcher(intent_patterns):
+    trie, contains = {}, {}
+    for intent, patterns in intent_patterns.items():
+        for s in patterns.get("starts", []):
+            node = trie
+            for ch in s:
+                node = node.setdefault(ch, {})
+            node.setdefault(_END, []).append((intent, 3))
+        for c in patterns.get("contains", []):
+            contains.setdefault(c, []).append((intent, 2))
+    keys = {}       # substring looked for inside tokens → patterns it stands for
+    phrases = []    # (pattern, contributions) confirmed by scanning the text
+    for c, contrib in contains.items():
+        if c.split() == [c]:
+            keys.setdefault(c, []).append(c)
+        else:
+            keys.setdefault(max(c.split(), key=len), []).append(c)
+            phrases.append(c)
+    return trie, contains, keys, frozenset(phrases)
+
+_INTENT_TRIE, _INTENT_CONTAINS, _INTENT_KEYS, _INTENT_PHRASES = _build_intent_matcher(INTENT_PATTERNS)
+_INTENT_ORDER = tuple(INTENT_PATTERNS)
+_TOKEN_HITS = {}          # token → frozenset of _INTENT_KEYS patterns found in it
+_TOKEN_HITS_MAX = 50000   # forgotten wholesale past this many distinct tokens
+
+def _token_hits(tok):
+    hit = _TOKEN_HITS.get(tok)
+    if hit is None:
+        if len(_TOKEN_HITS) >= _TOKEN_HITS_MAX:
+            _TOKEN_HITS.clear()
+        hit = _TOKEN_HITS[tok] = frozenset(p for k in _INTENT_KEYS if k in tok for p in _INTENT_KEYS[k])
+    return hit
+
+def intent_scores(text):
+    """Score of every intent for the text (3 per `starts` hit, 2 per `contains` hit)."""
+    lower = text.lower().strip()
+    scores = dict.fromkeys(_INTENT_ORDER, 0)
+    node = _INTENT_TRIE
+    for ch in lower:
+        node = node.get(ch)
+        if node is None:
+            break
+        for intent, w in node.get(_END, ()):
+            scores[intent] += w
+    found = set()
+    for tok in set(lower.split()):
+        hit = _TOKEN_HITS.get(tok)
+        found.update(_token_hits(tok) if hit is None else hit)
+    for c in found:
+        if c in _INTENT_PHRASES and c not in lower:
+            continue
+        for intent, w in _INTENT_CONTAINS[c]:
+            scores[intent] += w
+    return scores
+
+def detect_intent(text):
+    """Detect conversational intent from text."""
+    scores = intent_scores(text)
     best = max(scores, key=scores.get)
     if scores[best] == 0:
         return "statement"  # default: just saying something
@@ -302,8 +371,8 @@ DOMAINS = {
     },
 }
 
-def detect_domains(text):
-    """Detect which knowledge domains are active in the text."""
+def _detect_domains_scan(text):
+    """Reference scorer: every term of every domain against the text."""
     lower = text.lower()
     # Build a set of individual words for exact matching
     word_set = set(re.findall(r'[a-z]+', lower))
@@ -338,6 +407,254 @@ def detect_domains(text):
     )
     return ranked[:3]  # top 3 domains
 
+# Inverted index over DOMAINS, built once (same results as the scan):
+#   _UNIGRAMS — word → [(domain, term position, weight, term)]
+#   _BIGRAMS  — "w1 w2" → same, for two-word terms of plain letters; a
+#               word-bounded match of such a term always shows up as a bigram
+#   _PHRASES  — word → [(…, compiled regex, words)] for the remaining
+#               multi-word terms, searched only once all their words occur
+# Single-word terms with anything but a–z (e.g. "self-care") can never be a
+# [a-z]+ token, so the scan never matched them and they are not indexed.
+
+_WORD_RE = re.compile(r'[a-z]+')
+
+def _build_domain_index(domains):
+    unigrams, bigrams, phrases = defaultdict(list), defaultdict(list), defaultdict(list)
+    for d, (domain, data) in enumerate(domains.items()):
+        for pos, term in enumerate(data["terms"]):
+            key = (d, pos)
+            if " " not in term:
+                if _WORD_RE.fullmatch(term):
+                    unigrams[term].append((key, 2, term))
+            elif re.fullmatch(r'[a-z]+ [a-z]+', term):
+                bigrams[term].append((key, 3, term))
+            else:
+                words = frozenset(_WORD_RE.findall(term))
+                rx = re.compile(r'\b' + re.escape(term) + r'\b')
+                phrases[min(words)].append((key, 3, term, rx, words))
+    return dict(unigrams), dict(bigrams), dict(phrases)
+
+_UNIGRAMS, _BIGRAMS, _PHRASES = _build_domain_index(DOMAINS)
+_DOMAIN_NAMES = tuple(DOMAINS)
+
+def detect_domains(text):
+    """Detect which knowledge domains are active in the text."""
+    lower = text.lower()
+    word_list = _WORD_RE.findall(lower)
+    word_set = set(word_list)
+    hits = []   # ((domain index, term position), weight, term)
+    for w in word_set:
+        h = _UNIGRAMS.get(w)
+        if h:
+            hits += h
+        for entry in _PHRASES.get(w, ()):
+            if entry[4] <= word_set and entry[3].search(lower):
+                hits.append(entry[:3])
+    for bg in set(map(" ".join, zip(word_list, word_list[1:]))):
+        h = _BIGRAMS.get(bg)
+        if h:
+            hits += h
+    if not hits:
+        return []
+
+    # Back into DOMAINS / term order, so ties and "matched" come out as before
+    hits.sort()
+    scores = {}
+    for (d, _), weight, term in hits:
+        entry = scores.get(d)
+        if entry is None:
+            domain = _DOMAIN_NAMES[d]
+            entry = scores[d] = {"score": 0, "matched": [], "tone": DOMAINS[domain]["tone"]}
+        entry["score"] += weight
+        if len(entry["matched"]) < 5:
+            entry["matched"].append(term)
+    ranked = sorted(((_DOMAIN_NAMES[d], v) for d, v in scores.items()), key=lambda x: -x[1]["score"])
+    return ranked[:3]  # top 3 domains
+
+
+# ══════════════════════════════════════════════════════════════════════
+# BATCH SCORING (analytics over conversation dumps)
+# ══════════════════════════════════════════════════════════════════════
+#
+# score_batch(texts) streams intent, domain and polarity scores for any
+# iterable of messages, chunk_size at a time, so memory stays flat however
+# long the corpus. Each chunk becomes a binary sparse document × lexicon
+# matrix (lexicon = every INTENT_PATTERNS pattern, DOMAINS term and polarity
+# word), and all scores come out of one product with a weight matrix built
+# once. Scores equal intent_scores() and detect_domains(); polarity is the
+# parse_6scale formula over the given (positive, negative) word sets.
+# Uses scipy.sparse when installed, otherwise the same product in NumPy.
+
+BATCH_CHUNK = 4096
+_BATCH_LEXICONS = {}   # polarity word sets → _BatchLexicon
+
+class _BatchLexicon:
+    """Lexicon ids, weight matrix and per-token memos for one polarity lexicon."""
+
+    def __init__(self, pos=(), neg=()):
+        import numpy as np
+        self.intents = _INTENT_ORDER
+        self.domains = _DOMAIN_NAMES
+        ids, rows = {}, []    # key → id; id → {column: weight}
+        def entry(key):
+            if key not in ids:
+                ids[key] = len(rows)
+                rows.append(defaultdict(int))
+            return ids[key]
+        ni, nd = len(self.intents), len(self.domains)
+        col_i = {name: i for i, name in enumerate(self.intents)}
+
+        # starts: the same trie as intent_scores, with lexicon ids at pattern ends
+        self.trie = {}
+        for intent, patterns in INTENT_PATTERNS.items():
+            for s in patterns.get("starts", []):
+                e = entry(("start", s))
+                rows[e][col_i[intent]] += 3
+                node = self.trie
+                for ch in s:
+                    node = node.setdefault(ch, {})
+                if e not in node.setdefault(_END, []):
+                    node[_END].append(e)
+        # contains: whitespace-free keys looked up per token, phrases confirmed by scan
+        for c, contrib in _INTENT_CONTAINS.items():
+            e = entry(("contains", c))
+            for intent, w in contrib:
+                rows[e][col_i[intent]] += w
+        self.contains_keys = {k: [ids[("contains", c)] for c in cs] for k, cs in _INTENT_KEYS.items()}
+        self.phrases = {ids[("contains", c)]: c for c in _INTENT_PHRASES}
+        self.phrase_ids = frozenset(self.phrases)
+        # domains: the inverted index of detect_domains, one entry per word/bigram/phrase
+        for table, kind in ((_UNIGRAMS, "word"), (_BIGRAMS, "bigram")):
+            for key, hits in table.items():
+                e = entry((kind, key))
+                for (d, _), w, _ in hits:
+                    rows[e][ni + d] += w
+        self.domain_phrases = {}
+        for word, entries in _PHRASES.items():
+            for (d, _), w, term, rx, words in entries:
+                e = entry(("phrase", term))
+                rows[e][ni + d] += w
+                self.domain_phrases.setdefault(word, []).append((e, rx, words))
+        # polarity: the word counts, one column each
+        for col, words in ((ni + nd, pos), (ni + nd + 1, neg)):
+            for w in words:
+                rows[entry(("word", w))][col] += 1
+        self.words = {k: e for (kind, k), e in ids.items() if kind == "word"}
+        self.bigrams = {k: e for (kind, k), e in ids.items() if kind == "bigram"}
+
+        self.weights = np.zeros((len(rows), ni + nd + 2), dtype=np.float64)
+        for e, cols in enumerate(rows):
+            for c, w in cols.items():
+                self.weights[e, c] = w
+        self.size = len(rows)
+        self.token_ids = {}   # whitespace token → contains ids found inside it
+
+    def _tokens(self, tok):
+        hit = self.token_ids.get(tok)
+        if hit is None:
+            if len(self.token_ids) >= _TOKEN_HITS_MAX:
+                self.token_ids.clear()
+            hit = self.token_ids[tok] = tuple(
+                {e for k, es in self.contains_keys.items() if k in tok for e in es})
+        return hit
+
+    def features(self, text):
+        """Lexicon ids present in one message (the nonzeros of its matrix row)."""
+        lower = text.lower()
+        stripped = lower.strip()
+        found = set()
+        node = self.trie
+        for ch in stripped:
+            node = node.get(ch)
+            if node is None:
+                break
+            found.update(node.get(_END, ()))
+        for tok in set(stripped.split()):
+            hit = self.token_ids.get(tok)
+            found.update(self._tokens(tok) if hit is None else hit)
+        for e in found & self.phrase_ids:
+            if self.phrases[e] not in stripped:
+                found.discard(e)
+        word_list = _WORD_RE.findall(lower)
+        word_set = set(word_list)
+        found.update(map(self.words.__getitem__, self.words.keys() & word_set))
+        for w in self.domain_phrases.keys() & word_set:
+            for e, rx, need in self.domain_phrases[w]:
+                if need <= word_set and rx.search(lower):
+                    found.add(e)
+        if len(word_list) > 1:
+            bigrams = set(map(" ".join, zip(word_list, word_list[1:])))
+            found.update(map(self.bigrams.__getitem__, self.bigrams.keys() & bigrams))
+        return found
+
+def _batch_lexicon(polarity):
+    pos, neg = (frozenset(), frozenset()) if polarity is None else map(frozenset, polarity)
+    lex = _BATCH_LEXICONS.get((pos, neg))
+    if lex is None:
+        lex = _BATCH_LEXICONS[(pos, neg)] = _BatchLexicon(pos, neg)
+    return lex
+
+def _csr_product(indptr, indices, n_cols, weights):
+    """(binary CSR matrix given by indptr/indices) @ weights, as a dense array."""
+    import numpy as np
+    n_rows = len(indptr) - 1
+    try:
+        from scipy import sparse
+    except ImportError:
+        sparse = None
+    if sparse is not None:
+        m = sparse.csr_matrix((np.ones(len(indices)), indices, indptr), shape=(n_rows, n_cols))
+        return np.asarray(m @ weights)
+    out = np.zeros((n_rows, weights.shape[1]))
+    if len(indices):
+        nonempty = np.flatnonzero(np.diff(indptr))
+        out[nonempty] = np.add.reduceat(weights[indices], indptr[nonempty], axis=0)
+    return out
+
+def score_batch(texts, chunk_size=BATCH_CHUNK, polarity=None):
+    """Score an iterable of messages, yielding one dict per chunk_size of them:
+
+        start          index of the chunk's first message in the stream
+        intent         detect_intent() label per message
+        intent_scores  (n, len(INTENT_PATTERNS)) array, columns in INTENT_PATTERNS order
+        domain_scores  (n, len(DOMAINS)) array, columns in DOMAINS order
+        domains        top-3 [(domain, score)] per message, as ranked by detect_domains()
+        polarity       (n,) array of (pos - neg) / max(1, pos + neg), or None
+
+    polarity is a (positive words, negative words) pair; without it no
+    polarity is computed.
+    """
+    import numpy as np
+    from itertools import islice
+    lex = _batch_lexicon(polarity)
+    ni, nd = len(lex.intents), len(lex.domains)
+    it = iter(texts)
+    start = 0
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        indptr, indices = [0], []
+        for text in chunk:
+            indices.extend(lex.features(text))
+            indptr.append(len(indices))
+        scores = _csr_product(np.array(indptr), np.array(indices, dtype=np.int64),
+                              lex.size, lex.weights)
+        intent_scores = scores[:, :ni].astype(np.int64)
+        domain_scores = scores[:, ni:ni + nd].astype(np.int64)
+        best = intent_scores.argmax(axis=1)   # first maximum, as max() over the dict
+        labels = [lex.intents[b] if intent_scores[r, b] else "statement" for r, b in enumerate(best)]
+        order = np.argsort(-domain_scores, axis=1, kind="stable")[:, :3]
+        top = [[(lex.domains[d], int(domain_scores[r, d])) for d in row if domain_scores[r, d] > 0]
+               for r, row in enumerate(order)]
+        pol = None
+        if polarity is not None:
+            pos, neg = scores[:, ni + nd], scores[:, ni + nd + 1]
+            pol = np.round((pos - neg) / np.maximum(1, pos + neg), 3)
+        yield {"start": start, "intent": labels, "intent_scores": intent_scores,
+               "domain_scores": domain_scores, "domains": top, "polarity": pol}
+        start += len(chunk)
+
 
 # ══════════════════════════════════════════════════════════════════════
 # RESPONSE GENERATION
@@ -605,67 +922,223 @@ TONE_MODS = {
 }
 
 
+# ── Compiled templates ──
+# Each response template is split once into literal/field runs so a
+# reply is a join over prepared pieces instead of a str.format parse
+# per turn. Field-free templates render as themselves.
+
+class _Template:
+    """A response template pre-split into literal and field runs."""
+    __slots__ = ("text", "pieces", "fields")
+
+    def __init__(self, text):
+        self.text = text
+        pieces, fields = [], []
+        for literal, field, spec, conv in _FORMATTER.parse(text):
+            if literal:
+                pieces.append((literal, None))
+            if field is not None:
+                if spec or conv or not field.isidentifier():
+                    raise ValueError(f"unsupported template field {{{field}}} in {text!r}")
+                pieces.append((None, field))
+                fields.append(field)
+        self.pieces = tuple(pieces)
+        self.fields = frozenset(fields)
+
+    def render(self, values):
+        if not self.fields:
+            return self.text
+        return "".join([lit if field is None else str(values[field])
+                        for lit, field in self.pieces])
+
+
+_FORMATTER = string.Formatter()
+
+def _compile_templates(intent_responses, domain_responses):
+    """INTENT_RESPONSES → compiled templates; DOMAIN_RESPONSES → frozen tuples."""
+    intents = {k: tuple(_Template(t) for t in v) for k, v in intent_responses.items()}
+    domains = {d: {kind: tuple(lines) for kind, lines in kinds.items()}
+               for d, kinds in domain_responses.items()}
+    return intents, domains
+
+_INTENT_TEMPLATES, _DOMAIN_TEMPLATES = _compile_templates(INTENT_RESPONSES, DOMAIN_RESPONSES)
+_NO_DOMAIN = {}
+_DEFAULT_TONE = {"energy": "mixed", "approach": "adapt"}
+
+
+class _SeededPicker:
+    """random.choice stand-in fixed by (seed, text): a 64-bit LCG started
+    from their CRC. Cheaper to set up per turn than random.Random."""
+    __slots__ = ("state",)
+
+    def __init__(self, seed, text):
+        self.state = zlib.crc32(text.encode("utf-8"), zlib.crc32(str(seed).encode("utf-8")))
+
+    def choice(self, seq):
+        self.state = (self.state * 6364136223846793005 + 1442695040888963407) & 0xFFFFFFFFFFFFFFFF
+        return seq[(self.state >> 33) % len(seq)]
+
+
+def reply_rng(seed, user_text):
+    """Template picker for one turn: the shared ``random`` module when
+    ``seed`` is None, else a picker fixed by (seed, text) so the same
+    input always picks the same templates, in any process."""
+    if seed is None:
+        return random
+    return _SeededPicker(seed, user_text)
+
+
 # ══════════════════════════════════════════════════════════════════════
 # CONVERSATION MEMORY (within session)
 # ══════════════════════════════════════════════════════════════════════
 
+class WindowedCounter:
+    """Counter over a sliding window: add() on the way in, remove() on the
+    way out, and the most common key without a scan of every count. Ties
+    go to the key counted first, as Counter.most_common(1) picks them (a
+    key that drops out of the window and comes back counts as new)."""
+
+    def __init__(self):
+        self.counts = {}                    # key → count, in first-counted order
+        self._rank = {}                     # key → position in that order
+        self._arrivals = itertools.count()
+        self._buckets = defaultdict(set)    # count → keys with that count
+        self._top = 0
+
+    def add(self, key):
+        c = self.counts.get(key, 0)
+        if c:
+            self._buckets[c].discard(key)
+        else:
+            self._rank[key] = next(self._arrivals)
+        self.counts[key] = c + 1
+        self._buckets[c + 1].add(key)
+        if c + 1 > self._top:
+            self._top = c + 1
+
+    def remove(self, key):
+        c = self.counts[key]
+        self._buckets[c].discard(key)
+        if c == 1:
+            del self.counts[key]
+            del self._rank[key]
+        else:
+            self.counts[key] = c - 1
+            self._buckets[c - 1].add(key)
+        if c == self._top and not self._buckets[c]:
+            self._top = c - 1
+
+    def top(self):
+        """The most common key, or None when empty."""
+        return min(self._buckets[self._top], key=self._rank.__getitem__) if self._top else None
+
+    def __len__(self):
+        return len(self.counts)
+
+    def to_state(self):
+        """[[key, count], ...] in first-counted order — JSON-ready."""
+        return [[k, c] for k, c in self.counts.items()]
+
+    @classmethod
+    def from_state(cls, state):
+        wc = cls()
+        for entry in state:
+            if isinstance(entry[1], list):      # older files: [count, [keys]]
+                entry = [[k, entry[0]] for k in entry[1]]
+            else:
+                entry = [entry]
+            for key, c in entry:
+                wc.counts[key] = c
+                wc._rank[key] = next(wc._arrivals)
+                wc._buckets[c].add(key)
+                wc._top = max(wc._top, c)
+        return wc
+
+
 class ConversationMemory:
+    """The last max_turns turns of one session. Intent and domain counts,
+    the mood trajectory and the topic history cover the same window, and
+    the context dict is rebuilt on add_turn, so both calls are O(1)."""
+
     def __init__(self, max_turns=50):
-        self.turns = []
         self.max_turns = max_turns
-        self.topic_history = []
-        self.user_patterns = Counter()
-        self.dominant_domains = Counter()
-        self.mood_trajectory = []
+        self.turns = deque(maxlen=max_turns)
+        self.topic_history = deque(maxlen=max_turns * 3)   # detect_domains returns ≤ 3
+        self.user_patterns = WindowedCounter()
+        self.dominant_domains = WindowedCounter()
+        self.mood_trajectory = deque(maxlen=max_turns)
+        self._context = {"turn_count": 0, "new_conversation": True}
     
     def add_turn(self, user_text, response, intent, domains, tri_state, polarity):
+        if len(self.turns) == self.max_turns:
+            old = self.turns[0]   # about to fall out of the window
+            self.user_patterns.remove(old["intent"])
+            for d in old["domains"]:
+                self.dominant_domains.remove(d)
+        names = [d[0] for d in domains]
         self.turns.append({
             "user": user_text,
             "response": response,
             "intent": intent,
-            "domains": [d[0] for d in domains],
+            "domains": names,
             "tri_state": tri_state,
             "polarity": polarity,
         })
-        if len(self.turns) > self.max_turns:
-            self.turns.pop(0)
-        
-        self.user_patterns[intent] += 1
-        for d in domains:
-            self.dominant_domains[d[0]] += 1
+        self.user_patterns.add(intent)
+        for d in names:
+            self.dominant_domains.add(d)
         self.mood_trajectory.append(polarity)
-        self.topic_history.extend([d[0] for d in domains])
-    
-    def get_context(self):
-        """Return conversation context for response generation."""
-        if not self.turns:
-            return {"turn_count": 0, "new_conversation": True}
-        
-        recent = self.turns[-3:]  # last 3 turns
+        self.topic_history.extend(names)
+
+        n = len(self.turns)
         mood_trend = "stable"
         if len(self.mood_trajectory) >= 3:
-            recent_moods = self.mood_trajectory[-3:]
-            if all(m > prev for m, prev in zip(recent_moods[1:], recent_moods)):
+            a, b, c = self.mood_trajectory[-3], self.mood_trajectory[-2], self.mood_trajectory[-1]
+            if a < b < c:
                 mood_trend = "improving"
-            elif all(m < prev for m, prev in zip(recent_moods[1:], recent_moods)):
+            elif a > b > c:
                 mood_trend = "declining"
-        
-        return {
-            "turn_count": len(self.turns),
+        self._context = {
+            "turn_count": n,
             "new_conversation": False,
-            "recent_topics": [t["domains"] for t in recent],
-            "dominant_intent": self.user_patterns.most_common(1)[0][0] if self.user_patterns else "unknown",
-            "dominant_domain": self.dominant_domains.most_common(1)[0][0] if self.dominant_domains else None,
+            "recent_topics": [self.turns[i]["domains"] for i in range(max(0, n - 3), n)],
+            "dominant_intent": self.user_patterns.top() or "unknown",
+            "dominant_domain": self.dominant_domains.top(),
             "mood_trend": mood_trend,
-            "last_tri": self.turns[-1]["tri_state"] if self.turns else None,
+            "last_tri": tri_state,
         }
+    
+    def get_context(self):
+        """Return conversation context for response generation."""
+        return dict(self._context)
+
+    def to_state(self):
+        """JSON-ready snapshot; from_state() of it carries on identically."""
+        return {"max_turns": self.max_turns, "turns": list(self.turns),
+                "topic_history": list(self.topic_history),
+                "mood_trajectory": list(self.mood_trajectory),
+                "user_patterns": self.user_patterns.to_state(),
+                "dominant_domains": self.dominant_domains.to_state(),
+                "context": self._context}
+
+    @classmethod
+    def from_state(cls, state):
+        mem = cls(state["max_turns"])
+        mem.turns.extend(state["turns"])
+        mem.topic_history.extend(state["topic_history"])
+        mem.mood_trajectory.extend(state["mood_trajectory"])
+        mem.user_patterns = WindowedCounter.from_state(state["user_patterns"])
+        mem.dominant_domains = WindowedCounter.from_state(state["dominant_domains"])
+        mem._context = state["context"]
+        return mem
 
 
 # ══════════════════════════════════════════════════════════════════════
 # MAIN RESPONSE BUILDER
 # ══════════════════════════════════════════════════════════════════════
 
-def build_semantic_response(user_text, tri_result, scales_result, lattice_state, memory):
+def build_semantic_response(user_text, tri_result, scales_result, lattice_state, memory,
+                            seed=None):
     """
     Build Ollie's response combining:
     - Tri-prime geometric reading
@@ -673,6 +1146,9 @@ def build_semantic_response(user_text, tri_result, scales_result, lattice_state,
     - Domain knowledge
     - Conversational context
     - Practical insights
+
+    With ``seed`` set, template picks depend only on (seed, user_text),
+    so a reply is reproducible given the same conversation state.
     """
     intent = detect_intent(user_text)
     domains = detect_domains(user_text)
@@ -685,8 +1161,11 @@ def build_semantic_response(user_text, tri_result, scales_result, lattice_state,
     op = scales_result["scales"]["operator"]
     op_name = scales_result["scales"]["operator_name"]
     
-    tone_mod = TONE_MODS.get(tri_sym, {"energy":"mixed","approach":"adapt"})
+    tone_mod = TONE_MODS.get(tri_sym) or dict(_DEFAULT_TONE)
     ctx = memory.get_context()
+    choice = reply_rng(seed, user_text).choice
+    fields = {"tri_state": tri_sym, "tri_desc": tri_desc, "tri_glyph": tri_glyph_str}
+    dom_lines = _DOMAIN_TEMPLATES.get(domains[0][0], _NO_DOMAIN) if domains else _NO_DOMAIN
     
     parts = []
     
@@ -696,33 +1175,27 @@ def build_semantic_response(user_text, tri_result, scales_result, lattice_state,
     # ── INTENT-SPECIFIC OPENING ──
     if intent == "greeting":
         if ctx["new_conversation"]:
-            parts.append(random.choice(INTENT_RESPONSES["greeting"]))
+            parts.append(choice(_INTENT_TEMPLATES["greeting"]).render(fields))
         else:
             parts.append(f"Back again. We've been talking about "
                         f"{ctx.get('dominant_domain','things')}. Continuing?")
     
     elif intent == "farewell":
-        tmpl = random.choice(INTENT_RESPONSES["farewell"])
-        parts.append(tmpl.format(tri_state=tri_sym, tri_desc=tri_desc, tri_glyph=tri_glyph_str))
+        parts.append(choice(_INTENT_TEMPLATES["farewell"]).render(fields))
     
     elif intent == "venting":
-        tmpl = random.choice(INTENT_RESPONSES["venting"])
-        parts.append(tmpl.format(tri_state=tri_sym, tri_desc=tri_desc, tri_glyph=tri_glyph_str))
+        parts.append(choice(_INTENT_TEMPLATES["venting"]).render(fields))
         # Don't add advice when someone is venting — just acknowledge
-        if domains:
-            dom = domains[0][0]
-            if dom in DOMAIN_RESPONSES and "insights" in DOMAIN_RESPONSES[dom]:
-                parts.append(random.choice(DOMAIN_RESPONSES[dom]["insights"]))
+        if "insights" in dom_lines:
+            parts.append(choice(dom_lines["insights"]))
     
     elif intent == "seeking_advice":
         if domains:
-            dom = domains[0][0]
-            if dom in DOMAIN_RESPONSES:
-                dr = DOMAIN_RESPONSES[dom]
-                if "advice" in dr:
-                    parts.append(random.choice(dr["advice"]))
-                if "insights" in dr:
-                    parts.append(random.choice(dr["insights"]))
+            if dom_lines is not _NO_DOMAIN:
+                if "advice" in dom_lines:
+                    parts.append(choice(dom_lines["advice"]))
+                if "insights" in dom_lines:
+                    parts.append(choice(dom_lines["insights"]))
             else:
                 parts.append(f"The geometry says: {tone_mod['approach']}.")
         else:
@@ -730,19 +1203,16 @@ def build_semantic_response(user_text, tri_result, scales_result, lattice_state,
     
     elif intent == "question":
         # Answer with domain knowledge if available
-        if domains:
-            dom = domains[0][0]
-            if dom in DOMAIN_RESPONSES and "insights" in DOMAIN_RESPONSES[dom]:
-                parts.append(random.choice(DOMAIN_RESPONSES[dom]["insights"]))
+        if "insights" in dom_lines:
+            parts.append(choice(dom_lines["insights"]))
         # Add geometric insight
         parts.append(f"The operator active in your question is {op_name} ({op}). "
                      f"That frames it as a {op_name}-type inquiry.")
     
     elif intent == "philosophical":
         if domains:
-            dom = domains[0][0]
-            if dom in DOMAIN_RESPONSES and "insights" in DOMAIN_RESPONSES[dom]:
-                parts.append(random.choice(DOMAIN_RESPONSES[dom]["insights"]))
+            if "insights" in dom_lines:
+                parts.append(choice(dom_lines["insights"]))
         else:
             parts.append("Big question territory. The geometry doesn't give easy answers "
                         "— it gives structure. Let me read what's in the shape.")
@@ -750,12 +1220,10 @@ def build_semantic_response(user_text, tri_result, scales_result, lattice_state,
                      f"The approach from that state: {tone_mod['approach']}.")
     
     elif intent == "technical":
-        if domains:
-            dom = domains[0][0]
-            if dom in DOMAIN_RESPONSES and "insights" in DOMAIN_RESPONSES[dom]:
-                parts.append(random.choice(DOMAIN_RESPONSES[dom]["insights"]))
-            if dom in DOMAIN_RESPONSES and "advice" in DOMAIN_RESPONSES[dom]:
-                parts.append(random.choice(DOMAIN_RESPONSES[dom]["advice"]))
+        if "insights" in dom_lines:
+            parts.append(choice(dom_lines["insights"]))
+        if "advice" in dom_lines:
+            parts.append(choice(dom_lines["advice"]))
         parts.append(f"Technical signal: operator {op_name}, depth {scales_result['scales']['depth']}.")
     
     elif intent == "creative":
@@ -769,18 +1237,14 @@ def build_semantic_response(user_text, tri_result, scales_result, lattice_state,
             parts.append("Tough news. The charge is negative but that's real. What do you need?")
         else:
             parts.append("Noted. Neutral charge — you're reporting, not reacting. Clean signal.")
-        if domains:
-            dom = domains[0][0]
-            if dom in DOMAIN_RESPONSES and "insights" in DOMAIN_RESPONSES[dom]:
-                parts.append(random.choice(DOMAIN_RESPONSES[dom]["insights"]))
+        if "insights" in dom_lines:
+            parts.append(choice(dom_lines["insights"]))
     
     else:  # statement
         # General response with domain awareness
         if domains:
-            dom = domains[0][0]
-            matched_terms = domains[0][1]["matched"]
-            if dom in DOMAIN_RESPONSES and "insights" in DOMAIN_RESPONSES[dom]:
-                parts.append(random.choice(DOMAIN_RESPONSES[dom]["insights"]))
+            if "insights" in dom_lines:
+                parts.append(choice(dom_lines["insights"]))
         else:
             # Pure geometric response
             parts.append(f"Operator: {op_name}. Approach: {tone_mod['approach']}.")
@@ -826,3 +1290,120 @@ def build_semantic_response(user_text, tri_result, scales_result, lattice_state,
             "mood_trend": ctx.get("mood_trend", "new"),
         },
     }
+
+
+# ══════════════════════════════════════════════════════════════════════
+# FROZEN LEXICON (a versioned snapshot of the static tables)
+# ══════════════════════════════════════════════════════════════════════
+#
+# save_lexicon() writes the static tables as one marshal blob behind a
+# small header (magic, version, CRC, length, source digest); load_lexicon()
+# checks it and unmarshals it. With OLLIE_LEXICON set, the module swaps its
+# built-in tables for that snapshot at import and rebuilds the matchers
+# from it, so a deployment can ship one frozen, checked lexicon to every
+# process. Each process still holds its own unmarshalled copy: this pins
+# the content, it does not share memory (only a fork from a warm parent
+# does that). The header records a digest of the tables in this file; a
+# snapshot cut from other tables is skipped with a warning, so editing
+# the tables here is never silently overridden by an old snapshot.
+
+LEXICON_TABLES = ("INTENT_PATTERNS", "DOMAINS", "TONE_MODS", "DOMAIN_RESPONSES", "INTENT_RESPONSES")
+LEXICON_MAGIC = b"OLLX"
+LEXICON_VERSION = 2
+_LEXICON_HEADER = "<4sBIQ16s"   # magic, version, crc32, payload bytes, source digest
+_SOURCE_TABLES = {name: globals()[name] for name in LEXICON_TABLES}
+_source_digest = None
+
+def source_digest():
+    """blake2b-128 of the tables as written in this file (whatever is installed)."""
+    global _source_digest
+    if _source_digest is None:
+        import hashlib, json
+        blob = json.dumps(_SOURCE_TABLES, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        _source_digest = hashlib.blake2b(blob, digest_size=16).digest()
+    return _source_digest
+
+def save_lexicon(path):
+    """Write the current static tables to `path` (atomically). Returns bytes written."""
+    import marshal, struct
+    body = marshal.dumps({name: globals()[name] for name in LEXICON_TABLES})
+    data = struct.pack(_LEXICON_HEADER, LEXICON_MAGIC, LEXICON_VERSION,
+                       zlib.crc32(body), len(body), source_digest()) + body
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+def _lexicon_header(data):
+    import struct
+    head = struct.calcsize(_LEXICON_HEADER)
+    if len(data) < head:
+        raise ValueError("truncated lexicon snapshot")
+    magic, version, crc, n, digest = struct.unpack_from(_LEXICON_HEADER, data)
+    if magic != LEXICON_MAGIC or version != LEXICON_VERSION:
+        raise ValueError(f"not a v{LEXICON_VERSION} lexicon snapshot")
+    return head, crc, n, digest
+
+def lexicon_source(path):
+    """The source digest recorded in the snapshot at `path`."""
+    import struct
+    with open(path, "rb") as fh:
+        return _lexicon_header(fh.read(struct.calcsize(_LEXICON_HEADER)))[3]
+
+def load_lexicon(path):
+    """The tables stored at `path`. ValueError if it is not a valid snapshot."""
+    import marshal
+    with open(path, "rb") as fh:
+        data = fh.read()
+    head, crc, n, _ = _lexicon_header(data)
+    body = data[head:head + n]
+    if len(body) != n or zlib.crc32(body) != crc:
+        raise ValueError("lexicon snapshot failed its CRC")
+    tables = marshal.loads(body)
+    if not isinstance(tables, dict):
+        raise ValueError("lexicon snapshot is not a table dict")
+    missing = [name for name in LEXICON_TABLES if name not in tables]
+    if missing:
+        raise ValueError(f"lexicon snapshot lacks {', '.join(missing)}")
+    return tables
+
+def install_lexicon(tables):
+    """Use `tables` (as from load_lexicon) and rebuild everything derived from
+    them. Every derived structure is built first; the module is left as it
+    was if any table has the wrong shape."""
+    global _INTENT_TRIE, _INTENT_CONTAINS, _INTENT_KEYS, _INTENT_PHRASES, _INTENT_ORDER
+    global _UNIGRAMS, _BIGRAMS, _PHRASES, _DOMAIN_NAMES, _INTENT_TEMPLATES, _DOMAIN_TEMPLATES
+    for name in LEXICON_TABLES:
+        if not isinstance(tables[name], dict):
+            raise ValueError(f"lexicon table {name} is a {type(tables[name]).__name__}, not a dict")
+    for name, data in tables["DOMAINS"].items():
+        if not isinstance(data.get("tone"), str):
+            raise ValueError(f"lexicon domain {name!r} has no tone")
+    for sym, mod in tables["TONE_MODS"].items():
+        if not {"energy", "approach"} <= set(mod):
+            raise ValueError(f"lexicon tone {sym!r} lacks energy/approach")
+    matcher = _build_intent_matcher(tables["INTENT_PATTERNS"])
+    index = _build_domain_index(tables["DOMAINS"])
+    templates = _compile_templates(tables["INTENT_RESPONSES"], tables["DOMAIN_RESPONSES"])
+    g = globals()
+    for name in LEXICON_TABLES:
+        g[name] = tables[name]
+    _INTENT_TRIE, _INTENT_CONTAINS, _INTENT_KEYS, _INTENT_PHRASES = matcher
+    _INTENT_ORDER = tuple(INTENT_PATTERNS)
+    _TOKEN_HITS.clear()
+    _UNIGRAMS, _BIGRAMS, _PHRASES = index
+    _DOMAIN_NAMES = tuple(DOMAINS)
+    _INTENT_TEMPLATES, _DOMAIN_TEMPLATES = templates
+    _BATCH_LEXICONS.clear()
+
+OLLIE_LEXICON = os.environ.get("OLLIE_LEXICON", "")
+if OLLIE_LEXICON:
+    try:
+        if lexicon_source(OLLIE_LEXICON) != source_digest():
+            print(f"  ⚠ Lexicon snapshot {OLLIE_LEXICON} not used (cut from other tables "
+                  f"than this ollie_semantics.py; refreeze it)")
+        else:
+            install_lexicon(load_lexicon(OLLIE_LEXICON))
+    except Exception as e:
+        print(f"  ⚠ Lexicon snapshot {OLLIE_LEXICON} not used ({e})")
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+═══════════════════════════════════════════════════════════════════════════════
+                         TIG LATTICE FILES (.tigl)
+            Binary storage for UNIVERSE_LATTICE_7 / ENSEMBLE_LATTICE
+═══════════════════════════════════════════════════════════════════════════════
+
+A lattice is 100 cells ("op-ch") of a few float fields plus metadata. The
+.tigl form stores the cells as one fixed 10×10×fields float64 block
+(little-endian, C order) behind a small header:
+
+  header   "<4sBBHIIQQQq": magic b"TIGL", version, codec, field count,
+           metadata bytes, crc32 (metadata + block as stored),
+           block offset, block bytes, then the size and mtime (ns) of
+           the JSON file it was converted from (0, 0 if none)
+  metadata JSON: {"fields": [...], "meta": {every key except "cells"},
+           "cells_at": position of "cells" among the keys}
+  block    8-byte aligned; with codec "none" it is read in place from
+           an mmap, with "zlib" / "lzma" it is stored compressed
+
+Cell fields must be floats (pack_lattice raises ValueError for anything
+else, NaN included). Missing cells or fields are stored as NaN and
+dropped again on load, so load_lattice() returns exactly the dict that
+was packed. JSON stays the interchange format: save_lattice() writes JSON
+for a ".json" path, and load_lattice() sniffs the magic, so either kind
+of file loads. lattice_path() only prefers a .tigl over its JSON while
+the JSON still has the size and mtime recorded in the .tigl header.
+
+  python tig_lattice.py convert UNIVERSE_LATTICE_7.json [out.tigl] [--codec zlib]
+  python tig_lattice.py --bench
+
+Stdlib only, so the panel can use it without NumPy.
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+LATTICE_MAGIC = b"TIGL"
+LATTICE_VERSION = 2
+LATTICE_SUFFIX = ".tigl"
+_HEADER = "<4sBBHIIQQQq"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_HEADERS = {1: "<4sBBHIIQQ", LATTICE_VERSION: _HEADER}   # v1: no source stamp
+CODECS = {"none": 0, "zlib": 1, "lzma": 2}
+_CODEC_NAMES = {v: k for k, v in CODECS.items()}
+CELL_KEYS = tuple(f"{op}-{ch}" for op in range(10) for ch in range(10))
+
+def _compress(codec: int, data: bytes) -> bytes:
+    if codec == CODECS["zlib"]:
+        return zlib.compress(data, 9)
+    if codec == CODECS["lzma"]:
+        import lzma
+        return lzma.compress(data)
+    return data
+
+def _decompress(codec: int, data) -> bytes:
+    if codec == CODECS["zlib"]:
+        return zlib.decompress(data)
+    if codec == CODECS["lzma"]:
+        import lzma
+        return lzma.decompress(data)
+    return data
+
+def lattice_fields(cells: Dict) -> List[str]:
+    """Cell field names in order of first appearance."""
+    fields = {}
+    for cell in cells.values():
+        for name in cell:
+            fields.setdefault(name, None)
+    return list(fields)
+
+def source_stamp(path: str) -> Tuple[int, int]:
+    """(size, mtime in ns) of `path`, as a .tigl header records its JSON."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def pack_lattice(lattice: Dict, codec: str = "none", source: Tuple[int, int] = (0, 0)) -> bytes:
+    """The .tigl bytes for a lattice dict (as compute_lattice / compute_universe_lattice
+    return). `source` is the source_stamp() of the JSON file this mirrors."""
+    if codec not in CODECS:
+        raise ValueError(f"unknown codec {codec!r} (use {', '.join(CODECS)})")
+    code = CODECS[codec]
+    cells = lattice.get('cells', {})
+    unknown = set(cells) - set(CELL_KEYS)
+    if unknown:
+        raise ValueError(f"cells outside the 10×10 lattice: {', '.join(sorted(unknown)[:3])}")
+    fields = lattice_fields(cells)
+    nan = math.nan
+    values = []
+    for key in CELL_KEYS:
+        cell = cells.get(key, {})
+        for name in fields:
+            v = cell.get(name, nan)
+            if not isinstance(v, float) or (v != v and name in cell):
+                raise ValueError(f"cell {key} field {name!r} is {v!r}: .tigl stores float fields only")
+            values.append(v)
+    block = _compress(code, struct.pack(f"<{len(values)}d", *values))
+    keys = list(lattice)
+    meta = {"fields": fields, "meta": {k: v for k, v in lattice.items() if k != 'cells'},
+            "cells_at": keys.index('cells') if 'cells' in keys else len(keys)}
+    meta_bytes = _compress(code, json.dumps(meta, separators=(",", ":")).encode("utf-8"))
+    offset = (_HEADER_SIZE + len(meta_bytes) + 7) & ~7
+    crc = zlib.crc32(block, zlib.crc32(meta_bytes))
+    head = struct.pack(_HEADER, LATTICE_MAGIC, LATTICE_VERSION, code, len(fields),
+                       len(meta_bytes), crc, offset, len(block), *source)
+    return head + meta_bytes + b"\0" * (offset - _HEADER_SIZE - len(meta_bytes)) + block
+
+class LatticeView:
+    """A .tigl file mapped read-only. `block` is a flat float64 memoryview of
+    100 × len(fields) values (op-major, then channel, then field); with codec
+    "none" it points straight into the mapping. Use as a context manager, or
+    call close() once every view of `block` has been released."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:                      # empty file
+            self._fh.close()
+            raise ValueError(f"{path}: empty lattice file")
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        mm = self._mm
+        if len(mm) < 5 or mm[:4] != LATTICE_MAGIC or mm[4] not in _HEADERS:
+            raise ValueError(f"{self.path}: not a v{LATTICE_VERSION} lattice file")
+        header = _HEADERS[mm[4]]
+        head_size = struct.calcsize(header)
+        if len(mm) < head_size:
+            raise ValueError(f"{self.path}: truncated lattice file")
+        (magic, version, code, nfields, meta_len, crc, offset, block_len,
+         *source) = struct.unpack_from(header, mm)
+        self.source = tuple(source) or (0, 0)
+        if code not in _CODEC_NAMES:
+            raise ValueError(f"{self.path}: unknown codec {code}")
+        if offset + block_len > len(mm) or head_size + meta_len > offset:
+            raise ValueError(f"{self.path}: truncated lattice file")
+        meta_raw = mm[head_size:head_size + meta_len]
+        with memoryview(mm) as raw, raw[offset:offset + block_len] as block_raw:
+            if zlib.crc32(block_raw, zlib.crc32(meta_raw)) != crc:
+                raise ValueError(f"{self.path}: lattice file failed its CRC")
+            block = _decompress(code, block_raw) if code else None
+        meta = json.loads(_decompress(code, meta_raw))
+        self.codec = _CODEC_NAMES[code]
+        self.fields: List[str] = meta["fields"]
+        self.meta: Dict = meta["meta"]
+        self._cells_at: int = meta.get("cells_at", len(self.meta))
+        if len(self.fields) != nfields or (block_len if block is None else len(block)) != 800 * nfields:
+            raise ValueError(f"{self.path}: block does not match {nfields} fields")
+        if sys.byteorder != "little":
+            values = array("d", mm[offset:offset + block_len] if block is None else block)
+            values.byteswap()
+            self.block = memoryview(values)
+        elif block is None:
+            self.block = memoryview(mm)[offset:offset + block_len].cast("d")
+        else:
+            self.block = memoryview(block).cast("d")
+
+    def cell(self, op: int, ch: int) -> Dict[str, float]:
+        n = len(self.fields)
+        base = (op * 10 + ch) * n
+        return {name: v for name, v in zip(self.fields, self.block[base:base + n]) if v == v}
+
+    def to_dict(self) -> Dict:
+        """The lattice in its JSON shape: metadata keys in order, cells as "op-ch" dicts."""
+        cells = {}
+        fields, values = self.fields, self.block.tolist()
+        n = len(fields)
+        for i, key in enumerate(CELL_KEYS):
+            cell = {name: v for name, v in zip(fields, values[i * n:(i + 1) * n]) if v == v}
+            if cell:
+                cells[key] = cell
+        items = list(self.meta.items())
+        items.insert(self._cells_at, ('cells', cells))
+        return dict(items)
+
+    def close(self):
+        if getattr(self, "block", None) is not None:
+            self.block.release()
+            self.block = None
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_lattice(path: str) -> LatticeView:
+    return LatticeView(path)
+
+def is_binary_lattice(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(4) == LATTICE_MAGIC
+
+def load_lattice(path: str) -> Dict:
+    """A lattice dict from a .tigl or JSON file (sniffed by magic, not suffix)."""
+    if is_binary_lattice(path):
+        with LatticeView(path) as view:
+            return view.to_dict()
+    with open(path) as f:
+        return json.load(f)
+
+def binary_path(path: str) -> str:
+    """The .tigl sibling of a lattice path ("X.json" -> "X.tigl")."""
+    root, ext = os.path.splitext(path)
+    return path if ext == LATTICE_SUFFIX else root + LATTICE_SUFFIX
+
+def binary_source(path: str) -> Tuple[int, int]:
+    """The source_stamp() recorded in a .tigl header ((0, 0) if none).
+    OSError / ValueError if `path` is not a readable .tigl file."""
+    with open(path, "rb") as f:
+        head = f.read(_HEADER_SIZE)
+    if head[:4] != LATTICE_MAGIC or len(head) < 5 or head[4] not in _HEADERS:
+        raise ValueError(f"{path}: not a v{LATTICE_VERSION} lattice file")
+    if head[4] != LATTICE_VERSION:
+        return (0, 0)
+    if len(head) < _HEADER_SIZE:
+        raise ValueError(f"{path}: truncated lattice file")
+    return struct.unpack(_HEADER, head)[-2:]
+
+def lattice_path(path: str) -> Optional[str]:
+    """The file to load for `path`: its .tigl sibling when the JSON is gone
+    or still has the size and mtime that .tigl was converted from, else
+    `path`; None if neither exists."""
+    binary = binary_path(path)
+    if binary == path:
+        return path if os.path.exists(path) else None
+    try:
+        stamp = source_stamp(path)
+    except OSError:
+        return binary if os.path.exists(binary) else None
+    try:
+        return binary if binary_source(binary) == stamp else path
+    except (OSError, ValueError):
+        return path
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+def save_lattice(lattice: Dict, path: str, codec: str = "none", source: Optional[str] = None) -> int:
+    """Write a lattice (atomically): JSON for a ".json" path, .tigl otherwise,
+    stamped with the JSON file `source` it mirrors. Returns bytes written."""
+    if path.endswith(".json"):
+        data = json.dumps(lattice, indent=2).encode("utf-8")
+    else:
+        data = pack_lattice(lattice, codec, source_stamp(source) if source else (0, 0))
+    _write_atomic(path, data)
+    return len(data)
+
+# BENCHMARK
+
+def bench(paths: Tuple[str, ...] = ("UNIVERSE_LATTICE_7.json", "ENSEMBLE_LATTICE.json"), repeat: int = 20):
+    """Per repo lattice file: bytes on disk and best-of-`repeat` ms to load and
+    save it as JSON and as .tigl with each codec."""
+    import tempfile, time
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        return round(min(times) * 1e3, 3)
+    out = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in paths:
+            lattice = load_lattice(path)
+            rows = {"json": {"bytes": os.path.getsize(path),
+                             "load_ms": best(lambda: load_lattice(path)),
+                             "save_ms": best(lambda: save_lattice(lattice, os.path.join(tmp, "l.json")))}}
+            for codec in CODECS:
+                target = os.path.join(tmp, f"l.{codec}{LATTICE_SUFFIX}")
+                size = save_lattice(lattice, target, codec)
+                assert load_lattice(target) == lattice, f"{path}: {codec} round trip differs"
+                def view_cell():
+                    with LatticeView(target) as view:
+                        view.cell(7, 7)
+                rows[codec] = {"bytes": size,
+                               "load_ms": best(lambda: load_lattice(target)),
+                               "open_cell_ms": best(view_cell),
+                               "save_ms": best(lambda: save_lattice(lattice, target, codec))}
+            out[os.path.basename(path)] = rows
+    return out
+
+def main(argv: List[str]) -> int:
+    if argv[:1] == ["--bench"]:
+        print(json.dumps(bench()))
+        return 0
+    if argv[:1] == ["convert"] and len(argv) >= 2:
+        args, codec = list(argv[1:]), "none"
+        if "--codec" in args:
+            i = args.index("--codec")
+            codec = args[i + 1] if i + 1 < len(args) else ""
+            del args[i:i + 2]
+        src = args[0]
+        dst = args[1] if len(args) > 1 else (
+            os.path.splitext(src)[0] + ".json" if is_binary_lattice(src) else binary_path(src))
+        try:
+            n = save_lattice(load_lattice(src), dst, codec,
+                             source=None if is_binary_lattice(src) else src)
+        except (OSError, ValueError) as e:
+            print(f"[LATTICE] {e}")
+            return 1
+        print(f"[LATTICE] {src} -> {dst} ({n} bytes)")
+        return 0
+    print(__doc__)
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))